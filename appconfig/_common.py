@@ -6,6 +6,7 @@ from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import QStyleFactory, QApplication
 
 import utils
+from logger import LOGGER, LoggerSettings
 
 
 def setDPIAwareness():
@@ -45,6 +46,10 @@ def exception_hook(exctype, value, tb):
     traceback_formated = traceback.format_exception(exctype, value, tb)
     traceback_string = "".join(traceback_formated)
     print(traceback_string, file=sys.stderr)
+    # write recent events and pending log messages, they may explain what happened
+    LOGGER.write(LoggerSettings.LogLevels.fatal, "Main", traceback_string)
+    LOGGER.dumpFlightRecorder("Unhandled exception: " + traceback_formated[-1].strip())
+    LOGGER.flush()
     sys.exit(1)
 
 
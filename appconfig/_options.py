@@ -22,6 +22,7 @@ class Options:
     theme = "-theme"
     externalPlayerType = "-player_type"
     incognitoMode = "--incognito"
+    recordRequests = "-record_requests"
 
 
 class OptionsParser:
@@ -43,6 +44,7 @@ class OptionsParser:
         self.theme = self._getTheme(args, Options.theme)
         self.externalPlayerType = self._getPlayerType(args, Options.externalPlayerType)
         self.incognitoMode = True if Options.incognitoMode in args else None
+        self.recordRequests = self._getStr(args, Options.recordRequests)
 
     def _getValue(self, args, option):
         try:
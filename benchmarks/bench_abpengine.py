@@ -0,0 +1,128 @@
+# Throughput benchmark: built-in AbpEngine vs. braveblock (if installed), replaying a corpus of requests
+# Run from the application folder:  python -m benchmarks.bench_abpengine [path/to/.filterlists] [path/to/corpus.jsonl]
+# Corpus is a JSON-lines file with "url", "source_url" and "request_type" keys (one request per line)
+# If no filter lists folder is given, synthetic lists are generated; if no corpus is given, a synthetic one is generated
+# Known tricky cases (rules, request, expected verdict) are checked first, against braveblock too if installed
+import json
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+from settings import DefaultSettings
+from webprofile import AbpEngine
+from webprofile._rulescache import RulesCache
+from benchmarks.bench_adblock_startup import syntheticLists
+
+try:
+    from braveblock import Adblocker
+except:
+    Adblocker = None
+
+
+# (rules, url, source_url, request_type, expected verdict)
+CASES = [
+    # $important wins over exceptions, even when a non-important filter matches first
+    (["||ads.example^", "||ads.example/banner$important", "@@||ads.example^"],
+     "https://ads.example/banner.png", "https://site.example/", "image", True),
+    (["/banner.", "||ads.example^$important,script", "@@||ads.example^"],
+     "https://ads.example/banner.js", "https://site.example/", "script", True),
+    (["||ads.example^", "||ads.example/banner$important", "@@||ads.example^"],
+     "https://ads.example/other.png", "https://site.example/", "image", False),
+    (["||ads.example^$important,script", "@@||ads.example^"],
+     "https://ads.example/banner.png", "https://site.example/", "image", False),
+]
+
+
+def checkCases():
+    checks = failed = 0
+    for rules, url, source_url, request_type, expected in CASES:
+        engines = [("AbpEngine", AbpEngine(rules))]
+        if Adblocker is not None:
+            engines.append(("braveblock", Adblocker(rules=rules, include_easylist=False, include_easyprivacy=False)))
+        for name, engine in engines:
+            verdict = engine.check_network_urls(url, source_url, request_type)
+            checks += 1
+            if verdict != expected:
+                failed += 1
+                print(f"FAIL {name}: {url} ({request_type}) with {rules}: {verdict}, expected {expected}")
+    print(f"cases: {checks - failed}/{checks} passed")
+    return failed == 0
+
+
+def loadRules(folder):
+    easylistPath = os.path.join(folder, DefaultSettings.AdBlocker.easylistFile)
+    easyprivacyPath = os.path.join(folder, DefaultSettings.AdBlocker.easyprivacytFile)
+    rulesCache = RulesCache(os.path.join(tempfile.mkdtemp(), DefaultSettings.AdBlocker.rulesCacheFile), [easylistPath, easyprivacyPath])
+    rules, _ = rulesCache.load()
+    return rules
+
+
+def loadCorpus(path):
+    corpus = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                corpus.append((item["url"], item.get("source_url", ""), item.get("request_type", "")))
+    return corpus
+
+
+def syntheticCorpus(rules, count=20000):
+    rnd = random.Random(4321)
+    hosts = [rule[2:-1] for rule in rules if rule.startswith("||") and rule.endswith("^")]
+    pages = ["https://www." + "".join(rnd.choice(string.ascii_lowercase) for _ in range(8)) + ".com/" for _ in range(50)]
+    types = ["script", "image", "stylesheet", "xmlhttprequest", "subdocument", "ping", ""]
+    corpus = []
+    for _ in range(count):
+        page = rnd.choice(pages)
+        if hosts and rnd.random() < 0.2:
+            host = rnd.choice(hosts)
+        else:
+            host = "cdn." + page[12:-1]
+        path = "/".join("".join(rnd.choice(string.ascii_lowercase + string.digits) for _ in range(rnd.randint(3, 12)))
+                        for _ in range(rnd.randint(1, 4)))
+        corpus.append(("https://" + host + "/" + path + rnd.choice([".js", ".png", ".css", "?id=123&v=2", ""]),
+                       page, rnd.choice(types)))
+    return corpus
+
+
+def replay(engine, corpus):
+    verdicts = []
+    startTime = time.perf_counter()
+    for url, source_url, request_type in corpus:
+        verdicts.append(engine.check_network_urls(url, source_url, request_type))
+    elapsed = time.perf_counter() - startTime
+    return verdicts, elapsed
+
+
+def main(args):
+    checkCases()
+    folder = args[0] if args else tempfile.mkdtemp()
+    if not args:
+        syntheticLists(folder)
+    rules = loadRules(folder)
+    corpus = loadCorpus(args[1]) if len(args) > 1 else syntheticCorpus(rules)
+
+    startTime = time.perf_counter()
+    engine = AbpEngine(rules)
+    buildTime = time.perf_counter() - startTime
+    print(f"rules: {len(rules)}   filters: {engine.filtersCount}   ignored: {engine.ignoredCount}   "
+          f"build: {buildTime * 1000:.0f} ms   requests: {len(corpus)}")
+
+    verdicts, elapsed = replay(engine, corpus)
+    print(f"AbpEngine:  {len(corpus) / elapsed:10.0f} req/s   {elapsed / len(corpus) * 1e6:7.2f} us/req   "
+          f"blocked: {sum(verdicts) / len(corpus):.1%}")
+
+    if Adblocker is not None:
+        braveEngine = Adblocker(rules=rules, include_easylist=False, include_easyprivacy=False)
+        braveVerdicts, elapsed = replay(braveEngine, corpus)
+        agreement = sum(a == b for a, b in zip(verdicts, braveVerdicts)) / len(corpus)
+        print(f"braveblock: {len(corpus) / elapsed:10.0f} req/s   {elapsed / len(corpus) * 1e6:7.2f} us/req   "
+              f"blocked: {sum(braveVerdicts) / len(corpus):.1%}   agreement: {agreement:.2%}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,85 @@
+# Startup benchmark: time to a ready adblocker, legacy loading (readlines + set + Adblocker) vs. filtered rules cache
+# (the engine is built from the rules in both cases: only reading and filtering the lists is skipped)
+# Run from the application folder:  python -m benchmarks.bench_adblock_startup [path/to/.filterlists]
+# If no folder is given, synthetic lists of a similar size to easylist + easyprivacy are generated in a temp folder
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+from braveblock import Adblocker
+
+from settings import DefaultSettings
+from webprofile._rulescache import RulesCache
+
+
+def syntheticLists(folder, networkRules=60000, cosmeticRules=40000):
+    rnd = random.Random(1234)
+
+    def word():
+        return "".join(rnd.choice(string.ascii_lowercase) for _ in range(rnd.randint(4, 10)))
+
+    for fileName, share in ((DefaultSettings.AdBlocker.easylistFile, 0.6), (DefaultSettings.AdBlocker.easyprivacytFile, 0.4)):
+        lines = ["[Adblock Plus 2.0]", "! Title: synthetic " + fileName]
+        for _ in range(int(networkRules * share)):
+            kind = rnd.random()
+            if kind < 0.5:
+                lines.append("||" + word() + "." + rnd.choice(["com", "net", "io"]) + "^")
+            elif kind < 0.8:
+                lines.append("/" + word() + "/" + word() + ".js$script,third-party")
+            else:
+                lines.append("@@||" + word() + ".com/" + word() + "$image")
+        for _ in range(int(cosmeticRules * share)):
+            lines.append(word() + ".com##." + word())
+        with open(os.path.join(folder, fileName), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+
+
+def legacyLoad(easylistPath, easyprivacyPath):
+    with open(easylistPath, "r", encoding="utf-8") as f:
+        easylistrules = f.readlines()
+    with open(easyprivacyPath, "r", encoding="utf-8") as f:
+        easyprivacyrules = f.readlines()
+    return Adblocker(rules=list(set(easylistrules + easyprivacyrules)), include_easylist=False, include_easyprivacy=False)
+
+
+def cachedLoad(rulesCache):
+    rules, fromCache = rulesCache.load()
+    return Adblocker(rules=rules, include_easylist=False, include_easyprivacy=False), fromCache
+
+
+def timed(func, *args):
+    startTime = time.perf_counter()
+    result = func(*args)
+    return (time.perf_counter() - startTime) * 1000, result
+
+
+def main(args):
+    folder = args[0] if args else tempfile.mkdtemp()
+    if not args:
+        syntheticLists(folder)
+
+    easylistPath = os.path.join(folder, DefaultSettings.AdBlocker.easylistFile)
+    easyprivacyPath = os.path.join(folder, DefaultSettings.AdBlocker.easyprivacytFile)
+    cachePath = os.path.join(tempfile.mkdtemp(), DefaultSettings.AdBlocker.rulesCacheFile)
+    rulesCache = RulesCache(cachePath, [easylistPath, easyprivacyPath])
+
+    legacyTime, _ = timed(legacyLoad, easylistPath, easyprivacyPath)
+    coldTime, (_, fromCache) = timed(cachedLoad, rulesCache)
+    assert not fromCache
+    warmTime, (_, fromCache) = timed(cachedLoad, rulesCache)
+    assert fromCache
+    os.utime(easylistPath)
+    touchedTime, (_, fromCache) = timed(cachedLoad, rulesCache)
+    assert fromCache
+
+    print(f"legacy (readlines + set):               {legacyTime:8.1f} ms")
+    print(f"rules cache, first run (filter + save): {coldTime:8.1f} ms")
+    print(f"rules cache, lists unchanged:           {warmTime:8.1f} ms")
+    print(f"rules cache, lists touched (rehash):    {touchedTime:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
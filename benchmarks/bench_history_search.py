@@ -0,0 +1,82 @@
+# History search benchmark: latency of as-you-type queries (one per keystroke) over a synthetic history,
+# full-text index (FTS5) vs. LIKE fallback, and urlbar suggestions walking the frecency index
+# Run from the application folder:  python -m benchmarks.bench_history_search [entries]
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+from historymanager import HistoryStore
+
+# words used by the queries below, mixed with a bigger vocabulary of random words with Zipf-like frequencies
+# (as in real titles, a few words are very common and most are rare)
+_words = ["news", "github", "python", "weather", "recipe", "football", "music", "video", "docs", "review",
+          "travel", "linux", "release", "notes", "forum", "issue", "market", "science", "cinema", "garden"]
+
+
+def syntheticHistory(count, vocabularySize=5000, seed=0):
+    rnd = random.Random(seed)
+    vocabulary = _words + ["".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(3, 10))) for _ in range(vocabularySize)]
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    values = {}
+    now = time.time()
+    while len(values) < count:
+        host = "".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(4, 10))) + rnd.choice([".com", ".org", ".net", ".io"])
+        path = "/".join(rnd.choices(vocabulary, weights, k=rnd.randint(1, 3)))
+        title = " ".join(rnd.choices(vocabulary, weights, k=rnd.randint(2, 8))).capitalize()
+        values[f"https://www.{host}/{path}?id={len(values)}"] = {"date": now - rnd.random() * 365 * 86400, "title": title, "icon": ""}
+    return values
+
+
+def keystrokes(queries):
+    # every prefix of every query, as typed
+    return [query[:i] for query in queries for i in range(1, len(query) + 1)]
+
+
+def measure(store, typed, query=None):
+    query = query or store.search
+    latencies = []
+    results = 0
+    for text in typed:
+        startTime = time.perf_counter_ns()
+        results += len(query(text))
+        latencies.append(time.perf_counter_ns() - startTime)
+    latencies.sort()
+    return {
+        "p50": latencies[len(latencies) // 2] / 1e6,
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] / 1e6,
+        "max": latencies[-1] / 1e6,
+        "results": results / len(typed)
+    }
+
+
+def main(args):
+    count = int(args[0]) if args else 50000
+    path = os.path.join(tempfile.mkdtemp(), "history.sqlite")
+    store = HistoryStore(path)
+
+    values = syntheticHistory(count)
+    startTime = time.perf_counter()
+    store.importEntries(values)
+    importTime = time.perf_counter() - startTime
+
+    typed = keystrokes(["github python", "weather", "recipe garden", "linux release notes", "zz", "cin"])
+    print(f"entries: {len(store)}   import: {importTime * 1000:.0f} ms   queries: {len(typed)}   full-text index: {store.fullTextSearch}")
+
+    modes = [("full-text (FTS5)", True)] if store.fullTextSearch else []
+    modes.append(("LIKE fallback", False))
+    results = []
+    for name, fullText in modes:
+        store.fullTextSearch = fullText
+        results.append((name, measure(store, typed)))
+    results.append(("urlbar (frecency)", measure(store, typed, store.suggest)))
+    for name, result in results:
+        print(f"{name:<18} p50: {result['p50']:7.3f} ms   p99: {result['p99']:7.3f} ms   max: {result['max']:7.3f} ms   "
+              f"avg results: {result['results']:.1f}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,94 @@
+# Logger benchmark: per-message cost of writing log messages to file, legacy (open / append / close per call) vs. async sink,
+# cost of discarded messages (debug disabled), legacy eager formatting vs. lazy, level-gated formatting,
+# and cost of recording events in the in-memory flight recorder
+# Run from the application folder:  python -m benchmarks.bench_logger [messages]
+import os
+import sys
+import tempfile
+import time
+
+from logger import AsyncLogSink, FlightRecorder, LoggerSettings
+from logger._logmanager import LoggerManager
+
+
+def legacyWrite(logFile, error_level, origin, message):
+    msg = error_level.value + time.strftime(" %Y/%m/%d-%H:%M:%S ") + origin + " --- " + message
+    with open(logFile, 'a', encoding="utf-8") as file:
+        file.write(msg + "\n")
+
+
+def legacyDiscarded(debugEnabled, error_level, origin, message):
+    msg = error_level.value + time.strftime(" %Y/%m/%d-%H:%M:%S ") + origin + " --- " + message
+    if debugEnabled:
+        print(msg)
+
+
+def messages(count):
+    return [f"AD Blocked: https://ads.example{i % 97}.com/track/pixel.gif?id={i}&ref=https%3A%2F%2Fwww.example.com%2F" for i in range(count)]
+
+
+def main(args):
+    count = int(args[0]) if args else 20000
+    folder = tempfile.mkdtemp()
+    level = LoggerSettings.LogLevels.info
+    texts = messages(count)
+
+    logFile = os.path.join(folder, "legacy")
+    startTime = time.perf_counter()
+    for text in texts:
+        legacyWrite(logFile, level, "RequestInterceptor", text)
+    legacyTime = time.perf_counter() - startTime
+
+    sink = AsyncLogSink(os.path.join(folder, "sink"))
+    startTime = time.perf_counter()
+    for text in texts:
+        sink.write(level, "RequestInterceptor", text)
+    callerTime = time.perf_counter() - startTime
+    sink.close(timeout=60)
+    drainedTime = time.perf_counter() - startTime
+
+    with open(os.path.join(folder, "sink"), "r", encoding="utf-8") as f:
+        written = sum(1 for _ in f)
+    assert written == count, f"{written} of {count} messages written"
+
+    print(f"messages: {count}")
+    print(f"legacy (open / append / close): {legacyTime / count * 1e6:8.2f} us/msg   total: {legacyTime * 1000:8.1f} ms")
+    print(f"async sink, caller side:        {callerTime / count * 1e6:8.2f} us/msg   total: {callerTime * 1000:8.1f} ms")
+    print(f"async sink, until on disk:      {drainedTime / count * 1e6:8.2f} us/msg   total: {drainedTime * 1000:8.1f} ms")
+
+    # debug disabled (production): messages are discarded, so all formatting is wasted work
+    urls = [f"https://ads.example{i % 97}.com/track/pixel.gif?id={i}" for i in range(count)]
+    manager = LoggerManager()
+    manager.enableDebug(False)
+
+    startTime = time.perf_counter()
+    for url in urls:
+        legacyDiscarded(False, level, "RequestInterceptor", f"AD Blocked: {url}")
+    legacyTime = time.perf_counter() - startTime
+
+    startTime = time.perf_counter()
+    for url in urls:
+        manager.log(level, "RequestInterceptor", "AD Blocked: %s", url)
+    lazyTime = time.perf_counter() - startTime
+
+    print(f"discarded, legacy (f-string + strftime):  {legacyTime / count * 1e6:8.3f} us/msg")
+    print(f"discarded, lazy log():                    {lazyTime / count * 1e6:8.3f} us/msg")
+
+    # flight recorder: every event is recorded (all levels), so it must stay in the sub-microsecond range
+    recorder = FlightRecorder(LoggerSettings.flightRecorderSize or 2048)
+    startTime = time.perf_counter_ns()
+    for url in urls:
+        recorder.record(level, "RequestInterceptor", "AD Blocked: %s", (url,))
+    recordTime = time.perf_counter_ns() - startTime
+
+    dumpPath = os.path.join(folder, "crash.jsonl")
+    startTime = time.perf_counter()
+    dumped = recorder.dump(dumpPath, "benchmark")
+    dumpTime = time.perf_counter() - startTime
+
+    print(f"flight recorder, record():                {recordTime / count:8.0f} ns/event")
+    print(f"flight recorder, dump():                  {dumpTime * 1000:8.1f} ms ({dumped} events)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
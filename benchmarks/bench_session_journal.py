@@ -0,0 +1,70 @@
+# Session journal benchmark: per-event cost of recording tab changes (navigation, titles, activation, ...) as they happen,
+# legacy cost of saving the whole session to the settings file, and time to restore it (snapshot + events, one read)
+# Run from the application folder:  python -m benchmarks.bench_session_journal [tabs] [events]
+import os
+import random
+import sys
+import tempfile
+import time
+
+from PyQt6.QtCore import QSettings
+
+from sessionjournal import SessionJournal
+
+
+def main(args):
+    tabCount = int(args[0]) if args else 200
+    eventCount = int(args[1]) if len(args) > 1 else 20000
+    folder = tempfile.mkdtemp()
+    rnd = random.Random(0)
+
+    path = os.path.join(folder, "session.journal")
+    journal = SessionJournal().acquire(path, compactEvery=eventCount * 2)
+    journal.restore()
+    windows = [journal.openWindow() for _ in range(2)]
+    tabIds = [journal.openTab(windows[i % 2], i // 2, f"https://www.example{i}.com/", 1.0, f"Example {i}", False) for i in range(tabCount)]
+    journal.compact()
+
+    startTime = time.perf_counter()
+    for i in range(eventCount):
+        tabId = tabIds[i % tabCount]
+        kind = i % 4
+        if kind == 0:
+            journal.setUrl(tabId, f"https://www.example{tabId}.com/page/{i}")
+        elif kind == 1:
+            journal.setTitle(tabId, f"Page {i} - Example {tabId}")
+        elif kind == 2:
+            journal.activate(tabId)
+        else:
+            journal.setZoom(tabId, rnd.choice([1.0, 1.1, 1.25, 0.9]))
+    eventTime = time.perf_counter() - startTime
+    journalSize = os.path.getsize(path)
+
+    startTime = time.perf_counter()
+    journal.compact()
+    compactTime = time.perf_counter() - startTime
+    for i in range(eventCount // 10):
+        journal.setUrl(tabIds[i % tabCount], f"https://www.example.com/tail/{i}")
+
+    # legacy: whole session written to settings file (only on exit, so a crash loses it)
+    settings = QSettings(os.path.join(folder, "legacy.ini"), QSettings.Format.IniFormat)
+    tabs = [[f"https://www.example{i}.com/", 1.0, f"Example {i}", i == 0, False, "0" * 64] for i in range(tabCount)]
+    startTime = time.perf_counter()
+    settings.setValue("Session/tabs", tabs)
+    settings.sync()
+    legacyTime = time.perf_counter() - startTime
+
+    startTime = time.perf_counter()
+    session = SessionJournal().acquire(path).restore()
+    restoreTime = time.perf_counter() - startTime
+
+    print(f"tabs: {tabCount}   events: {eventCount}")
+    print(f"journal event       {eventTime / eventCount * 1e6:8.2f} us/event   ({journalSize / eventCount:.0f} bytes/event)")
+    print(f"compaction          {compactTime * 1000:8.2f} ms")
+    print(f"legacy full save    {legacyTime * 1000:8.2f} ms   (on exit only)")
+    print(f"restore             {restoreTime * 1000:8.2f} ms   (snapshot + {eventCount // 10} events, "
+          f"{sum(len(win) for win in session)} tabs)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
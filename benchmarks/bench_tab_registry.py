@@ -0,0 +1,89 @@
+# Tab registry benchmark: cost of the per-tab bookkeeping (navigation and title updates, duplicate-tab lookup,
+# picking tabs to suspend, saving the session), legacy positional lists (rebuilt on every change, found by scanning)
+# vs. TabState registry (updated in place, indexed by url, host and access order)
+# Run from the application folder:  python -m benchmarks.bench_tab_registry [tabs] [rounds]
+import sys
+import time
+
+from tabstate import TabRegistry
+
+
+def legacy(tabCount, rounds):
+    tabsActivity = {}
+    for i in range(tabCount):
+        tabsActivity[i] = [f"https://www.example{i % 50}.com/page/{i}", f"Example {i}", 1.0, float(i), False, False]
+
+    startTime = time.perf_counter()
+    for r in range(rounds):
+        browser = r % tabCount
+        url, title, zoom, lastAccessed, frozen, isPlayingMedia = tabsActivity[browser]
+        tabsActivity[browser] = [f"https://www.example{browser % 50}.com/page/{r}", title, zoom, lastAccessed, frozen, isPlayingMedia]
+        url, _, zoom, lastAccessed, frozen, isPlayingMedia = tabsActivity[browser]
+        tabsActivity[browser] = [url, f"Page {r}", zoom, float(tabCount + r), frozen, isPlayingMedia]
+    updateTime = time.perf_counter() - startTime
+
+    startTime = time.perf_counter()
+    for r in range(rounds):
+        url = f"https://www.example{r % 50}.com/page/{r % tabCount}"
+        [browser for browser, tabData in tabsActivity.items() if tabData[0] == url]
+    findTime = time.perf_counter() - startTime
+
+    startTime = time.perf_counter()
+    for r in range(rounds // 10):
+        sorted(tabsActivity.items(), key=lambda item: item[1][3])[:10]
+    lruTime = time.perf_counter() - startTime
+
+    startTime = time.perf_counter()
+    for r in range(rounds // 10):
+        [[url, zoom, title, frozen] for url, title, zoom, _, frozen, _ in tabsActivity.values()]
+    saveTime = time.perf_counter() - startTime
+
+    return updateTime, findTime, lruTime * 10, saveTime * 10
+
+
+def registry(tabCount, rounds):
+    tabStates = TabRegistry()
+    browsers = [object() for _ in range(tabCount)]
+    for i, browser in enumerate(browsers):
+        tabStates.add(browser, f"https://www.example{i % 50}.com/page/{i}", f"Example {i}", 1.0, float(i))
+
+    startTime = time.perf_counter()
+    for r in range(rounds):
+        browser = browsers[r % tabCount]
+        state = tabStates.get(browser)
+        tabStates.setUrl(state, f"https://www.example{r % tabCount % 50}.com/page/{r}")
+        state.title = f"Page {r}"
+        tabStates.touch(state, float(tabCount + r))
+    updateTime = time.perf_counter() - startTime
+
+    startTime = time.perf_counter()
+    for r in range(rounds):
+        tabStates.withUrl(f"https://www.example{r % 50}.com/page/{r % tabCount}")
+    findTime = time.perf_counter() - startTime
+
+    startTime = time.perf_counter()
+    for r in range(rounds // 10):
+        tabStates.leastRecentlyUsed()[:10]
+    lruTime = time.perf_counter() - startTime
+
+    startTime = time.perf_counter()
+    for r in range(rounds // 10):
+        [[state.url, state.zoom, state.title, state.frozen] for state in tabStates]
+    saveTime = time.perf_counter() - startTime
+
+    return updateTime, findTime, lruTime * 10, saveTime * 10
+
+
+def main(args):
+    tabCount = int(args[0]) if args else 500
+    rounds = int(args[1]) if len(args) > 1 else 20000
+
+    print(f"tabs: {tabCount}   rounds: {rounds}")
+    print(f"{'':<10} {'update':>12} {'find url':>12} {'lru pick':>12} {'save':>12}   (us/operation)")
+    for name, function in (("legacy", legacy), ("registry", registry)):
+        times = min((function(tabCount, rounds) for _ in range(3)), key=sum)
+        print(f"{name:<10} " + " ".join(f"{t / rounds * 1e6:12.2f}" for t in times))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,72 @@
+# Tab restore benchmark: time to first usable window (all tabs in tab bar, window shown and responsive) when restoring
+# a saved session, legacy (a view per tab if activity checking is off, tab texts recalculated on every tab added)
+# vs. placeholders for all tabs but the active one, added in a single tab bar update
+# Run from the application folder:  python -m benchmarks.bench_tab_restore [tabs]
+import sys
+import time
+
+from PyQt6.QtCore import QUrl
+from PyQt6.QtWidgets import QApplication, QWidget, QLabel, QVBoxLayout
+
+from tabwidget import TabWidget
+
+try:
+    from PyQt6.QtWebEngineWidgets import QWebEngineView
+except:
+    QWebEngineView = None
+
+
+class Window(QWidget):
+
+    h_tab_size = 32
+
+    def __init__(self):
+        super(Window, self).__init__()
+        self.resize(1200, 800)
+        self.tabs = TabWidget(self)
+        layout = QVBoxLayout()
+        layout.addWidget(self.tabs)
+        self.setLayout(layout)
+
+
+def restore(app, tabs, loadAll, batched, views):
+    startTime = time.perf_counter()
+    window = Window()
+    window.tabs.addTab(QLabel(), "", False)
+    if batched:
+        window.tabs.beginTabsUpdate()
+    for url, title, active in tabs:
+        if views and (active or loadAll):
+            widget = QWebEngineView()
+            widget.load(QUrl(url))
+        else:
+            widget = QLabel()
+        window.tabs.addTab(widget, title, True)
+    if batched:
+        window.tabs.endTabsUpdate()
+    window.tabs.addTab(QLabel(), " + ", True)
+    window.tabs.setCurrentIndex(1)
+    window.show()
+    app.processEvents()
+    elapsed = time.perf_counter() - startTime
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+    return elapsed
+
+
+def main(args):
+    count = int(args[0]) if args else 100
+    app = QApplication.instance() or QApplication(sys.argv)
+    tabs = [(f"https://www.example{i}.com/", f"Example page number {i} - a long title to elide", i == 0) for i in range(count)]
+
+    views = QWebEngineView is not None
+    print(f"tabs: {count}   web views: {'yes' if views else 'not available (placeholders only)'}")
+    modes = [("legacy (all loaded)", True, False), ("legacy (activity on)", False, False), ("scheduler", False, True)]
+    for name, loadAll, batched in modes:
+        best = min(restore(app, tabs, loadAll, batched, views) for _ in range(3))
+        print(f"{name:<22} first usable window: {best * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,156 @@
+# Tab resume benchmark: time from activating a suspended tab until it can be used again, legacy (view destroyed and
+# replaced by a placeholder, a new view created and loaded when activated) vs. page lifecycle (view kept, page frozen
+# or discarded), whether scroll position survives, and renderer CPU usage of a hidden busy page, running vs. frozen
+# Run from the application folder:  python -m benchmarks.bench_tab_resume [rounds]
+import os
+import sys
+import tempfile
+import time
+
+import psutil
+from PyQt6.QtCore import QUrl, QEventLoop
+from PyQt6.QtWidgets import QApplication, QWidget, QLabel, QVBoxLayout
+
+from tabwidget import TabWidget
+
+try:
+    from PyQt6.QtWebEngineCore import QWebEnginePage
+    from PyQt6.QtWebEngineWidgets import QWebEngineView
+except:
+    QWebEngineView = None
+
+# long page with a script busy in background (as many sites are: timers, animations, polling, ...)
+PAGE = """<html><head><title>Resume test</title></head><body>
+%s
+<script>setInterval(function() { var x = 0; for (var i = 0; i < 200000; i++) { x += Math.sqrt(i); } }, 20);</script>
+</body></html>""" % "\n".join(f"<p>Paragraph {i}: some text to make the page long enough to scroll.</p>" for i in range(2000))
+
+SCROLL = 20000
+
+
+class Window(QWidget):
+
+    h_tab_size = 32
+
+    def __init__(self):
+        super(Window, self).__init__()
+        self.resize(1200, 800)
+        self.tabs = TabWidget(self)
+        layout = QVBoxLayout()
+        layout.addWidget(self.tabs)
+        self.setLayout(layout)
+
+
+def wait(app, done, timeout=30):
+    deadline = time.perf_counter() + timeout
+    while not done() and time.perf_counter() < deadline:
+        app.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 5)
+    return done()
+
+
+def runScript(app, page, script):
+    result = []
+    page.runJavaScript(script, result.append)
+    wait(app, lambda: result)
+    return result[0] if result else None
+
+
+def newView(app, tabs, index, url):
+    view = QWebEngineView()
+    loaded = []
+    view.loadFinished.connect(loaded.append)
+    view.load(url)
+    tabs.insertTab(index, view, "test")
+    return view, loaded
+
+
+def resume(app, tabs, url, mode):
+    # returns (ms to resume, scroll position kept)
+    view, loaded = newView(app, tabs, 1, url)
+    tabs.setCurrentIndex(1)
+    wait(app, lambda: loaded)
+    runScript(app, view.page(), f"window.scrollTo(0, {SCROLL})")
+    tabs.setCurrentIndex(0)
+    app.processEvents()
+
+    page = view.page()
+    loaded.clear()
+    if mode == "rebuild":
+        tabs.removeTab(1)
+        view.close()
+        view.deleteLater()
+        tabs.insertTab(1, QLabel(), "test")
+    elif mode == "frozen":
+        page.setLifecycleState(QWebEnginePage.LifecycleState.Frozen)
+    else:
+        page.setLifecycleState(QWebEnginePage.LifecycleState.Discarded)
+    wait(app, lambda: False, 0.5)
+
+    startTime = time.perf_counter()
+    if mode == "rebuild":
+        tabs.widget(1).deleteLater()
+        tabs.removeTab(1)
+        view, loaded = newView(app, tabs, 1, url)
+        page = view.page()
+    tabs.setCurrentIndex(1)
+    if mode == "frozen":
+        runScript(app, page, "0")
+    else:
+        wait(app, lambda: loaded)
+    elapsed = time.perf_counter() - startTime
+
+    wait(app, lambda: False, 0.3)
+    scrolled = (runScript(app, page, "window.scrollY") or 0) >= SCROLL / 2
+    tabs.setCurrentIndex(0)
+    tabs.removeTab(1)
+    view.close()
+    view.deleteLater()
+    app.processEvents()
+    return elapsed, scrolled
+
+
+def rendererCpu(app, view, seconds=3):
+    try:
+        process = psutil.Process(view.page().renderProcessPid())
+        startTimes = process.cpu_times()
+        wait(app, lambda: False, seconds)
+        endTimes = process.cpu_times()
+        return (endTimes.user + endTimes.system - startTimes.user - startTimes.system) / seconds * 100
+    except:
+        return -1
+
+
+def main(args):
+    rounds = int(args[0]) if args else 5
+    if QWebEngineView is None:
+        print("web views not available: QtWebEngine is needed for this benchmark")
+        return
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    path = os.path.join(tempfile.mkdtemp(), "page.html")
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(PAGE)
+    url = QUrl.fromLocalFile(path)
+
+    window = Window()
+    tabs = window.tabs
+    tabs.addTab(QLabel("current tab"), "current", True)
+    window.show()
+
+    print(f"rounds: {rounds}")
+    for mode in ("rebuild", "discarded", "frozen"):
+        results = [resume(app, tabs, url, mode) for _ in range(rounds)]
+        best = min(elapsed for elapsed, _ in results)
+        scrolled = sum(1 for _, kept in results if kept)
+        print(f"{mode:<10} resume: {best * 1000:8.1f} ms   scroll kept: {scrolled}/{rounds}")
+
+    view, loaded = newView(app, tabs, 1, url)
+    wait(app, lambda: loaded)
+    tabs.setCurrentIndex(0)
+    print(f"hidden page renderer CPU   running: {rendererCpu(app, view):5.1f} %", end="")
+    view.page().setLifecycleState(QWebEnginePage.LifecycleState.Frozen)
+    print(f"   frozen: {rendererCpu(app, view):5.1f} %")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,77 @@
+# Micro-benchmark: compiled UrlMatcher vs. the plain "any(blocked in url ...)" loop used by RequestInterceptor before
+# Run from the application folder:  python -m benchmarks.bench_urlmatcher [path/to/urlblacklist.txt]
+import random
+import string
+import sys
+import timeit
+
+from webprofile import UrlMatcher
+
+
+def randomWord(rnd, minLen=4, maxLen=12):
+    return "".join(rnd.choice(string.ascii_lowercase) for _ in range(rnd.randint(minLen, maxLen)))
+
+
+def syntheticPatterns(rnd, count):
+    patterns = []
+    for _ in range(count):
+        kind = rnd.random()
+        if kind < 0.5:
+            patterns.append(randomWord(rnd) + "." + rnd.choice(["com", "net", "io", "org"]))
+        elif kind < 0.8:
+            patterns.append("/" + randomWord(rnd) + "/" + randomWord(rnd) + ".js")
+        else:
+            patterns.append(randomWord(rnd) + "=" + randomWord(rnd, 2, 6))
+    return patterns
+
+
+def syntheticUrls(rnd, patterns, count, hitRatio=0.05):
+    urls = []
+    for _ in range(count):
+        url = ("https://" + randomWord(rnd) + "." + randomWord(rnd) + ".com/" + randomWord(rnd) + "/"
+               + randomWord(rnd) + ".js?" + randomWord(rnd) + "=" + randomWord(rnd, 10, 30))
+        if patterns and rnd.random() < hitRatio:
+            url += "&ref=" + rnd.choice(patterns)
+        urls.append(url)
+    return urls
+
+
+def loadPatterns(path):
+    with open(path, "r") as f:
+        return [line.rstrip() for line in f if not line.startswith('#') and line.rstrip()]
+
+
+def run(patterns, urls, repeat=5):
+
+    matcher = UrlMatcher(patterns)
+
+    def loop():
+        for url in urls:
+            any(blocked in url for blocked in patterns)
+
+    def compiled():
+        for url in urls:
+            matcher.match(url)
+
+    # both approaches must agree before comparing them
+    assert [any(blocked in url for blocked in patterns) for url in urls] == [matcher.match(url) for url in urls]
+
+    loopTime = min(timeit.repeat(loop, number=1, repeat=repeat)) / len(urls)
+    compiledTime = min(timeit.repeat(compiled, number=1, repeat=repeat)) / len(urls)
+    print(f"patterns: {len(patterns):>6}   any() loop: {loopTime * 1e6:9.2f} us/url   "
+          f"UrlMatcher: {compiledTime * 1e6:9.2f} us/url   speedup: {loopTime / compiledTime:6.1f}x")
+
+
+def main(args):
+    rnd = random.Random(1234)
+    if args:
+        patterns = loadPatterns(args[0])
+        run(patterns, syntheticUrls(rnd, patterns, 2000))
+    else:
+        for count in (10, 100, 1000, 5000, 20000):
+            patterns = syntheticPatterns(rnd, count)
+            run(patterns, syntheticUrls(rnd, patterns, 2000))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
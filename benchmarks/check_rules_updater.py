@@ -0,0 +1,151 @@
+# Rules updater check: runs the conditional-GET updater against a local HTTP stand-in of the filter lists server,
+# checking full downloads (200), not modified lists (304, using ETag / Last-Modified), server errors and failed writes
+# (previous list must be kept, with no temp files left behind), and that the engine is only rebuilt when lists change
+# (not modified lists must not be touched either: the filter service's file watcher would reload them)
+# Run from the application folder:  python -m benchmarks.check_rules_updater
+import os
+import sys
+import tempfile
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from webprofile._rulesupdater import RulesUpdater
+
+
+class ListsServer(BaseHTTPRequestHandler):
+
+    # path: [content, etag, last modified] (status code instead of content to simulate errors)
+    lists = {}
+    requests = []
+
+    def do_GET(self):
+        self.requests.append((self.path, self.headers.get("If-None-Match"), self.headers.get("If-Modified-Since")))
+        content, etag, lastModified = self.lists.get(self.path, (404, "", ""))
+        if isinstance(content, int):
+            self.send_response(content)
+            self.end_headers()
+        elif self.headers.get("If-None-Match") == etag or self.headers.get("If-Modified-Since") == lastModified:
+            self.send_response(304)
+            self.end_headers()
+        else:
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", lastModified)
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+def check(name, condition):
+    print(f"{'ok  ' if condition else 'FAIL'} {name}")
+    return condition
+
+
+def signature(path):
+    # same as the filter service's file watcher compares to decide if a list has to be reloaded
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def update(updater):
+    # run in this thread (no event loop needed), collecting what would be emitted to the GUI thread
+    result = []
+    updater.rulesUpdatedSig.connect(result.append)
+    updater.run()
+    return result[0] if result else None
+
+
+def main(args):
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ListsServer)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    baseUrl = f"http://127.0.0.1:{server.server_address[1]}"
+
+    folder = tempfile.mkdtemp()
+    easylistPath = os.path.join(folder, "easylist.txt")
+    easyprivacyPath = os.path.join(folder, "easyprivacy.txt")
+    metaPath = os.path.join(folder, "filters.meta")
+    sources = [(baseUrl + "/easylist.txt", easylistPath), (baseUrl + "/easyprivacy.txt", easyprivacyPath)]
+    builds = []
+
+    def build():
+        builds.append(time.time())
+        return "engine %d" % len(builds)
+
+    def newUpdater():
+        return RulesUpdater(sources, metaPath, build, timeout=5)
+
+    def readFile(path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    results = []
+    ListsServer.lists = {"/easylist.txt": [b"||ads.example^\n", '"v1"', formatdate(1e9, usegmt=True)],
+                         "/easyprivacy.txt": [b"||track.example^\n", "", formatdate(1e9, usegmt=True)]}
+
+    # first download: no validators sent, lists written, engine built
+    engine = update(newUpdater())
+    results.append(check("first download writes both lists", readFile(easylistPath) == b"||ads.example^\n"
+                         and readFile(easyprivacyPath) == b"||track.example^\n"))
+    results.append(check("first download sends no validators", all(etag is None and since is None for _, etag, since in ListsServer.requests)))
+    results.append(check("engine built after download", engine == "engine 1"))
+
+    # nothing changed: ETag (easylist) and Last-Modified (easyprivacy, no ETag) sent back, 304, no rebuild
+    ListsServer.requests.clear()
+    os.utime(easylistPath, (0, 0))
+    signatures = [signature(path) for path in (easylistPath, easyprivacyPath)]
+    engine = update(newUpdater())
+    sent = {path: (etag, since) for path, etag, since in ListsServer.requests}
+    results.append(check("ETag sent as If-None-Match", sent["/easylist.txt"][0] == '"v1"'))
+    results.append(check("Last-Modified sent as If-Modified-Since", sent["/easyprivacy.txt"][1] == formatdate(1e9, usegmt=True)))
+    results.append(check("not modified: engine not rebuilt", engine is None and len(builds) == 1))
+    results.append(check("not modified: list marked as fresh",
+                         time.time() - RulesUpdater.lastChecked(RulesUpdater.loadMeta(metaPath), easylistPath) < 60))
+    results.append(check("not modified: lists untouched (watcher sees no change)",
+                         [signature(path) for path in (easylistPath, easyprivacyPath)] == signatures))
+
+    # one list changed: downloaded again, new validators saved, engine rebuilt
+    ListsServer.lists["/easylist.txt"] = [b"||ads.example^\n||more.example^\n", '"v2"', formatdate(2e9, usegmt=True)]
+    engine = update(newUpdater())
+    results.append(check("modified list downloaded", readFile(easylistPath).endswith(b"||more.example^\n")))
+    results.append(check("engine rebuilt", engine == "engine 2"))
+    ListsServer.requests.clear()
+    update(newUpdater())
+    results.append(check("new ETag used afterwards", ListsServer.requests[0][1] == '"v2"'))
+
+    # server error: previous list kept, nothing rebuilt
+    ListsServer.lists["/easylist.txt"][0] = 500
+    engine = update(newUpdater())
+    results.append(check("server error keeps previous list", readFile(easylistPath).endswith(b"||more.example^\n") and engine is None))
+
+    # server down: same
+    ListsServer.lists["/easylist.txt"] = [b"||new.example^\n", '"v3"', formatdate(3e9, usegmt=True)]
+    server.shutdown()
+    server.server_close()
+    engine = update(newUpdater())
+    results.append(check("server down keeps previous list", readFile(easylistPath).endswith(b"||more.example^\n") and engine is None))
+
+    # failed write: previous file untouched, no temp file left behind
+    updater = newUpdater()
+    blocker = os.path.join(folder, "blocked.txt")
+    os.makedirs(blocker)
+    try:
+        updater._writeAtomic(blocker, b"new content")
+        failed = False
+    except:
+        failed = True
+    results.append(check("failed write raises", failed))
+    results.append(check("failed write leaves no temp file", not os.path.exists(blocker + ".tmp")))
+    results.append(check("failed write keeps previous file", os.path.isdir(blocker)))
+
+    print(f"{sum(results)}/{len(results)} checks passed")
+    return all(results)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main(sys.argv[1:]) else 1)
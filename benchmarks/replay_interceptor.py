@@ -0,0 +1,155 @@
+# Replay benchmark: feeds a recorded request corpus through RequestInterceptor.interceptRequest (no pages are loaded)
+# Run from the application folder:  python -m benchmarks.replay_interceptor [path/to/.filterlists] [path/to/corpus]
+# Corpus can be a HAR file (.har) or a JSON-lines file with "url", "source_url", "request_type" and "first_party_url"
+# keys, as recorded by running Coward with "-record_requests path/to/corpus.jsonl" option
+# If no filter lists folder is given, synthetic lists are generated; if no corpus is given, a synthetic one is generated
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from PyQt6.QtCore import QCoreApplication, QUrl
+from PyQt6.QtWebEngineCore import QWebEngineUrlRequestInfo
+
+from settings import DefaultSettings
+from webprofile import RequestInterceptor, UrlMatcher, FILTER_SERVICE
+from benchmarks.bench_abpengine import syntheticCorpus, loadRules
+from benchmarks.bench_adblock_startup import syntheticLists
+
+# HAR resource types (as exported by Chromium dev tools) translated to interceptor ones
+_harTypes = {
+    "document": "document",
+    "stylesheet": "stylesheet",
+    "script": "script",
+    "image": "image",
+    "ping": "ping",
+    "websocket": "websocket",
+    "xhr": "xmlhttprequest",
+    "fetch": "xmlhttprequest"
+}
+
+
+class ReplayedRequest:
+
+    # minimal replacement of QWebEngineUrlRequestInfo, with the methods used by the interceptor
+    def __init__(self, url, source_url, first_party_url, resource_type):
+        self._url = QUrl(url)
+        self._initiator = QUrl(source_url)
+        self._firstPartyUrl = QUrl(first_party_url or source_url)
+        self._resourceType = resource_type
+        self.blocked = False
+
+    def requestUrl(self):
+        return self._url
+
+    def initiator(self):
+        return self._initiator
+
+    def firstPartyUrl(self):
+        return self._firstPartyUrl
+
+    def resourceType(self):
+        return self._resourceType
+
+    def block(self, shouldBlock):
+        self.blocked = shouldBlock
+
+
+def loadHar(path):
+    with open(path, "r", encoding="utf-8") as f:
+        har = json.load(f)
+    pages = {page.get("id"): page.get("title", "") for page in har["log"].get("pages", [])}
+    corpus = []
+    for entry in har["log"]["entries"]:
+        pageUrl = pages.get(entry.get("pageref"), "")
+        initiator = entry.get("_initiator", {}).get("url") or pageUrl
+        corpus.append((entry["request"]["url"], initiator, _harTypes.get(entry.get("_resourceType", ""), ""), pageUrl))
+    return corpus
+
+
+def loadRecording(path):
+    # first-party (top-level page) URL decides third-party and $domain= rules, as in the live interceptor
+    corpus = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                corpus.append((item["url"], item.get("source_url", ""), item.get("request_type", ""), item.get("first_party_url", "")))
+    return corpus
+
+
+def replay(interceptor, requests):
+    latencies = []
+    blocked = 0
+    startTime = time.perf_counter()
+    for request in requests:
+        callStart = time.perf_counter_ns()
+        interceptor.interceptRequest(request)
+        latencies.append(time.perf_counter_ns() - callStart)
+        blocked += request.blocked
+        request.blocked = False
+    elapsed = time.perf_counter() - startTime
+    latencies.sort()
+    return {
+        "rps": len(requests) / elapsed,
+        "p50": latencies[len(latencies) // 2] / 1000,
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] / 1000,
+        "blocked": blocked / len(requests)
+    }
+
+
+def main(args):
+
+    app = QCoreApplication(sys.argv)
+
+    folder = args[0] if args else tempfile.mkdtemp()
+    if not args:
+        syntheticLists(folder)
+    easylistPath = os.path.join(folder, DefaultSettings.AdBlocker.easylistFile)
+    easyprivacyPath = os.path.join(folder, DefaultSettings.AdBlocker.easyprivacytFile)
+    if not os.path.exists(easylistPath) or not os.path.exists(easyprivacyPath):
+        print(f"filter lists not found in {folder}")
+        return
+
+    # work on a copy, so caches and snapshots are not written into the given folder, and never download lists during the benchmark
+    rulesFolder = tempfile.mkdtemp()
+    for fileName in os.listdir(folder):
+        if os.path.isfile(os.path.join(folder, fileName)):
+            shutil.copy2(os.path.join(folder, fileName), rulesFolder)
+    DefaultSettings.AdBlocker.updateInterval = float("inf")
+
+    if len(args) > 1:
+        corpus = loadHar(args[1]) if args[1].lower().endswith(".har") else loadRecording(args[1])
+    else:
+        # synthetic requests are all made by the page itself
+        corpus = [(url, source_url, request_type, source_url) for url, source_url, request_type in syntheticCorpus(loadRules(folder))]
+        # blacklist some of the synthetic hosts, as users would do with the ones making pages crash
+        hosts = sorted({QUrl(url).host() for url, _, _, _ in corpus})
+        with open(os.path.join(rulesFolder, DefaultSettings.AdBlocker.urlBlackListFile), "w", encoding="utf-8") as f:
+            f.write("\n".join(hosts[::50]))
+
+    interceptor = RequestInterceptor(rulesFolder)
+    resourceTypes = {value: key for key, value in interceptor.resourceTypes.items()}
+    requests = [ReplayedRequest(url, source_url, first_party_url,
+                                resourceTypes.get(request_type, QWebEngineUrlRequestInfo.ResourceType.ResourceTypeUnknown))
+                for url, source_url, request_type, first_party_url in corpus]
+    blacklistMatcher = FILTER_SERVICE.blacklistMatcher
+    print(f"requests: {len(requests)}   blacklisted URLs: {len(blacklistMatcher)}")
+
+    for name, blacklist, adblock in (("blacklist only", blacklistMatcher, False),
+                                     ("adblock only", UrlMatcher(), True),
+                                     ("combined", blacklistMatcher, True)):
+        FILTER_SERVICE.blacklistMatcher = blacklist
+        interceptor.setEnabled(adblock)
+        result = replay(interceptor, requests)
+        print(f"{name:<16}{result['rps']:10.0f} req/s   p50: {result['p50']:7.2f} us   p99: {result['p99']:7.2f} us   "
+              f"blocked: {result['blocked']:.1%}")
+
+    interceptor.release()
+    app.quit()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
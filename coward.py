@@ -18,11 +18,17 @@ from appconfig import OPTIONS, Splash
 from cachemanager import CacheManager
 from dialog import DialogsManager
 from downloadmanager import DownloadManager
-from historymanager import History, HistoryWidget
+from faviconstore import FAVICON_STORE
+from historymanager import History, HistoryCompleter, HistoryWidget
 from logger import LoggerSettings, LOGGER
 from mediaplayer import HttpManager
+from memorypolicy import MemoryPolicy
+from restorescheduler import RestoreScheduler
 from searchwidget import SearchWidget
+from sessionjournal import SESSION_JOURNAL
 from settings import Settings, DefaultSettings
+from statswidget import StatsWidget
+from tabstate import TabRegistry
 from themes import Themes
 from ui import Ui_MainWindow
 from webpage import WebPage
@@ -126,7 +132,7 @@ class MainWindow(QMainWindow):
 
         LOGGER.write(LoggerSettings.LogLevels.info, "Main", "Settings loaded")
 
-    def saveSettings(self, tabs, new_wins):
+    def saveSettings(self):
 
         # backup .ini file
         self.settings.backupSettings()
@@ -145,8 +151,6 @@ class MainWindow(QMainWindow):
         self.settings.setRadius(self.settings.radius, True)
         self.settings.setPosition(self.pos(), True)
         self.settings.setSize(self.size(), True)
-        self.settings.setPreviousTabs(tabs, True)
-        self.settings.setNewWindows(new_wins, True)
 
         LOGGER.write(LoggerSettings.LogLevels.info, "Main", "Settings saved")
 
@@ -177,17 +181,37 @@ class MainWindow(QMainWindow):
         # check if relaunched to delete cache (when using "clean all" option) or temp files
         self.deletePreviousCacheAndTemp()
 
-        # configure tabs
-        self.tabIconsFolder = os.path.normpath(os.path.join(self.cache_manager.cachePath, DefaultSettings.Storage.Tabs.tabsFolder))
-        if not os.path.exists(self.tabIconsFolder):
-            os.makedirs(self.tabIconsFolder)
+        # favicons of tabs and history (shared by all windows)
+        self.favicons = FAVICON_STORE.acquire(os.path.join(self.cache_manager.cachePath, DefaultSettings.Storage.Favicons.faviconsFile),
+                                              DefaultSettings.Storage.Favicons.maxSize,
+                                              DefaultSettings.Storage.Favicons.cacheSize)
+
+        # open windows and tabs are saved as they change, not only on exit (incognito windows are never saved)
+        self.journal = SESSION_JOURNAL
+        if not self.isIncognito:
+            self.journal.acquire(os.path.join(self.appStorageFolder, DefaultSettings.Storage.Session.sessionFile),
+                                 DefaultSettings.Storage.Session.compactEvery)
+        self.sessionWin = None
+        self.tabStates = TabRegistry()
+        # shared resources (filters, icons, session, history) are released once, even if window is closed again
+        self._released = False
+
+        # tab icons were formerly stored as individual files
+        tabIconsFolder = os.path.normpath(os.path.join(self.cache_manager.cachePath, DefaultSettings.Storage.Tabs.tabsFolder))
+        if os.path.isdir(tabIconsFolder):
+            self.favicons.importFolder(tabIconsFolder)
+            try:
+                os.rmdir(tabIconsFolder)
+            except:
+                pass
 
         # webpage common profile to keep session logins, cookies, etc.
         self._profile = None
 
-        # Request interceptor for blocking URLs and ad-blocking
+        # Request interceptor for blocking URLs and ad-blocking (filters are shared by all windows)
         self.requestInterceptor = RequestInterceptor(os.path.join(self.appStorageFolder,
-                                                                  DefaultSettings.AdBlocker.filterlistsFolder))
+                                                                  DefaultSettings.AdBlocker.filterlistsFolder),
+                                                     OPTIONS.recordRequests)
         self.requestInterceptor.setEnabled(self.adblock)
 
         # creating download manager before custom title bar to allow moving it too
@@ -198,6 +222,10 @@ class MainWindow(QMainWindow):
         self.search_widget = SearchWidget(self, self.searchPage)
         self.search_widget.hide()
 
+        # interceptor stats widget (latency and blocked requests, shared by all windows)
+        self.stats_widget = StatsWidget(self, self.requestInterceptor.stats)
+        self.stats_widget.hide()
+
         # use a dialog manager to enqueue dialogs and avoid showing all at once
         self.dialog_manager = DialogsManager(self,
                                              DefaultSettings.Theme.deafultIncognitoTheme if self.isIncognito else DefaultSettings.Theme.defaultTheme,
@@ -224,12 +252,22 @@ class MainWindow(QMainWindow):
         if not self.settings.enableHistory:
             self.history_widget.content_widget.hide()
 
-        # set check activity to free memory if enabled
+        # suggest history entries (best ranked first) while typing in urlbar (only if history is enabled)
+        self.history_completer = HistoryCompleter(self, self.settings, self.history_manager)
+
+        # set check activity to free memory if enabled (main window checks tabs of all windows: budget is global)
         self.checkActivityEnabled = DefaultSettings.Tabs.checkActivity
-        if self.checkActivityEnabled:
+        if self.checkActivityEnabled and not self.isNewWin:
+            self.memoryPolicy = MemoryPolicy(DefaultSettings.Tabs.memoryBudget, DefaultSettings.Tabs.memoryLowWater,
+                                             DefaultSettings.Tabs.discardMinIdle)
             self.activityTimer = QTimer()
+            self.activityTimer.setSingleShot(True)
             self.activityTimer.timeout.connect(self.checkTabsActivityTrigger)
-            self.activityTimer.start(60000)
+            self.activityTimer.start(self.memoryPolicy.interval * 1000)
+
+        # restored tabs are loaded when activated, but a few recently used ones may be loaded in background
+        self.restoreScheduler = RestoreScheduler(self, self.warmUpTab, self.isCurrentTabLoading,
+                                                 DefaultSettings.Tabs.warmUpConcurrency, DefaultSettings.Tabs.warmUpIdleTime)
 
         # create http server
         self.http_manager = None
@@ -309,6 +347,7 @@ class MainWindow(QMainWindow):
         # apply styles to independent widgets
         self.dl_manager.setStyleSheet(Themes.styleSheet(theme, Themes.Section.downloadManager))
         self.search_widget.setStyleSheet(Themes.styleSheet(theme, Themes.Section.searchWidget))
+        self.stats_widget.setStyleSheet(Themes.styleSheet(theme, Themes.Section.statsWidget))
         self.history_widget.setStyleSheet(Themes.styleSheet(self.settings.theme, Themes.Section.historyWidget))
 
         # context menu styles
@@ -325,6 +364,8 @@ class MainWindow(QMainWindow):
         self.ui.next_btn.triggered.connect(self.goForward)
         self.ui.reload_btn.triggered.connect(self.reloadPage)
         self.ui.urlbar.returnPressed.connect(self.navigate_to_url)
+        self.history_completer.setUrlbar(self.ui.urlbar)
+        self.history_completer.urlActivatedSig.connect(self.navigate_to_suggestion)
         self.ui.ext_player_btn.clicked.connect(self.openExternalPlayer)
         self.ui.sidePanel_btn.clicked.connect(self.toggleSidePanel)
         self.ui.engine_btn.clicked.connect(self.toggleEngine)
@@ -371,7 +412,7 @@ class MainWindow(QMainWindow):
         self.leaveTabBarSig.connect(self.leaveTabBar)
 
         # signal to load page when clicked in history
-        self.loadHistoryUrlSig.connect(self.add_new_tab)
+        self.loadHistoryUrlSig.connect(self.switch_or_add_tab)
 
         # signal to replace browser widget when suspended / re-enabled
         self.checkTabsActivitySig.connect(self.checkTabsActivity)
@@ -420,30 +461,39 @@ class MainWindow(QMainWindow):
             new_wins = []
 
         else:
-            # get open tabs for  main instance window
-            tabs = self.settings.previousTabs
-            # get child windows instances and their open tabs
-            new_wins = self.settings.newWindows
+            # get open tabs for main instance window and child windows instances, as saved in session journal
+            session = self.journal.restore()
+            if session is None:
+                # session was formerly saved in settings file (only on exit)
+                tabs = self.settings.previousTabs
+                new_wins = self.settings.newWindows
+            else:
+                wins = [[tab[:5] + [self._getIconFileName(QUrl(tab[0])), tab[5]] for tab in win_tabs] for win_tabs in session]
+                tabs = wins[0] if wins else []
+                new_wins = wins[1:]
 
         # add the new toggle vertical / horizontal tabs action in tab bar
         self.add_toggletab_action()
 
         # open all tabs in main / child window
         current = 1
-        tabIcons = []
-        self.tabsActivity = {}
+        self.tabStates = TabRegistry()
+        if not self.isIncognito:
+            self.sessionWin = self.journal.openWindow()
+        placeholders = []
         if tabs:
+            # only active tab is loaded, the rest are lightweight placeholders until activated (or warmed up)
+            self.ui.tabs.beginTabsUpdate()
             for i, tab in enumerate(tabs):
-                url, zoom, title, active, frozen, icon = tab
+                url, zoom, title, active, frozen, icon = tab[:6]
+                used = tab[6] if len(tab) > 6 else 0
                 if active:
                     current = i + 1
                     QTimer.singleShot(0, lambda u=url: self.ui.urlbar.setText(u))
-                self.add_tab(QUrl(url), zoom, title, active or not self.checkActivityEnabled, icon)
-                tabIcons.append(icon)
-            for file in os.listdir(self.tabIconsFolder):
-                filepath = os.path.join(self.tabIconsFolder, file)
-                if os.path.exists(filepath) and file not in tabIcons:
-                    os.remove(filepath)
+                tabIndex = self.add_tab(QUrl(url), zoom, title, active, icon, used=used)
+                if not active:
+                    placeholders.append((used, i + 1, self.ui.tabs.widget(tabIndex)))
+            self.ui.tabs.endTabsUpdate()
 
         else:
             self.add_tab(QUrl(self.defaultPage))
@@ -464,9 +514,19 @@ class MainWindow(QMainWindow):
         # run this again to set tabs titles and tooltips
         self.toggle_tabbar(clicked=False)
 
+        # most recently used tabs (or closest to active one) are loaded in background, once the user is idle
+        placeholders.sort(key=lambda item: (-item[0], abs(item[1] - current)))
+        self.restoreScheduler.start([browser for _, _, browser in placeholders[:DefaultSettings.Tabs.warmUpTabs]])
+
+        if not self.isNewWin and not self.isIncognito:
+            # restored session (main and child windows) replaces the previous one
+            if self.journal.compact() and session is None:
+                self.settings.setPreviousTabs([], True)
+                self.settings.setNewWindows([], True)
+
         LOGGER.write(LoggerSettings.LogLevels.info, "Main", f"All tabs created: {len(tabs)}")
 
-    def add_tab(self, qurl, zoom=1.0, label="Loading...", loadUrl=True, icon="", tabIndex=None):
+    def add_tab(self, qurl, zoom=1.0, label="Loading...", loadUrl=True, icon="", tabIndex=None, state=None, used=0):
 
         # create webengineview as tab widget
         if loadUrl:
@@ -481,7 +541,14 @@ class MainWindow(QMainWindow):
             browser = QLabel()
             tab_type = "DUMMY"
 
-        self.tabsActivity[browser] = [qurl.toString(), label, zoom, time.time(), not loadUrl, False]
+        # replaced widgets (e.g. suspended tabs) keep their state, and their entry in session journal
+        if state is None:
+            # restored tabs keep their last use time (not the time they are restored), so access order is kept too
+            state = self.tabStates.add(browser, qurl.toString(), label, zoom, used or None, frozen=not loadUrl)
+        else:
+            self.tabStates.replace(state.browser, browser)
+            state.frozen = not loadUrl
+        state.lifecycle = QWebEnginePage.LifecycleState.Active if loadUrl else None
 
         # add / insert tab and set title tooltip and icon
         if tabIndex is None:
@@ -494,6 +561,11 @@ class MainWindow(QMainWindow):
         self.ui.tabs.setTabToolTip(tabIndex, label + ("" if self.h_tabbar else "\n(Right-click to close)"))
         self.ui.tabs.setTabIcon(tabIndex, self._getTabIcon(icon, tab_type == "STANDARD"))
 
+        if state.tabId is None:
+            state.tabId = self.journal.openTab(self.sessionWin, tabIndex - 1, state.url, zoom, label, state.frozen, used)
+        else:
+            self.journal.setFrozen(state.tabId, state.frozen)
+
         # set close buttons according to tabs orientation
         if self.h_tabbar:
             self.ui.tabs.tabBar().tabButton(tabIndex, QTabBar.ButtonPosition.RightSide).clicked.disconnect()
@@ -501,16 +573,15 @@ class MainWindow(QMainWindow):
         else:
             self.ui.tabs.tabBar().setTabButton(tabIndex, QTabBar.ButtonPosition.RightSide, None)
 
-        LOGGER.write(LoggerSettings.LogLevels.info, "Main", f"{tab_type} Tab created: {qurl.toString()}")
+        LOGGER.log(LoggerSettings.LogLevels.info, "Main", lambda: f"{tab_type} Tab created: {qurl.toString()}")
 
         return tabIndex
 
     def _getTabIcon(self, icon, enabled):
         qicon = None
         if icon:
-            iconFile = os.path.join(self.tabIconsFolder, icon)
-            if os.path.exists(iconFile):
-                pixmap = QPixmap(iconFile)
+            pixmap = self.favicons.pixmap(icon)
+            if pixmap is not None:
                 if not enabled:
                     qimage = pixmap.toImage()
                     grayscale_image = utils.convert_to_grayscale_with_alpha(qimage)
@@ -570,6 +641,11 @@ class MainWindow(QMainWindow):
             self.ui.reload_btn.setText(self.ui.reload_char)
             self.ui.reload_btn.setToolTip("Reload page")
 
+        # suspended tab (discarded or replaced by a placeholder) is resumed once its page is loaded again
+        state = self.tabStates.get(browser)
+        if state is not None and state.resumeStart is not None:
+            self._logResumed(state, "reloaded")
+
     def getProfile(self, browser=None):
 
         if self._profile is None or self.cache_manager.deleteCacheRequested:
@@ -607,9 +683,9 @@ class MainWindow(QMainWindow):
             browser = page.parent()
         except:
             browser = None
-        if browser is not None and browser in self.tabsActivity.keys():
-            url, title, zoom, lastTimeLoaded, frozen, _ = self.tabsActivity[browser]
-            self.tabsActivity[browser] = [url, title, zoom, lastTimeLoaded, frozen, isPlaying]
+        state = self.tabStates.get(browser) if browser is not None else None
+        if state is not None:
+            state.isPlayingMedia = isPlaying
 
     def setPageContextMenu(self, page):
 
@@ -642,6 +718,9 @@ class MainWindow(QMainWindow):
             page.titleChanged.connect(lambda title, b=page.parent(): self.title_changed(title, b))
             page.iconChanged.connect(lambda icon, b=page.parent(): self.icon_changed(icon, b))
 
+            # suspending / resuming inactive tabs
+            page.lifecycleStateChanged.connect(lambda lifecycle, b=page.parent(): self.lifecycle_changed(lifecycle, b))
+
         elif isinstance(page, QWebEnginePage):
             page.fullScreenRequested.disconnect()
             page.featurePermissionRequested.disconnect()
@@ -649,6 +728,7 @@ class MainWindow(QMainWindow):
             page.desktopMediaRequested.disconnect()
             page.titleChanged.disconnect()
             page.iconChanged.disconnect()
+            page.lifecycleStateChanged.disconnect()
 
     def page_fullscr(self, request):
         self.manage_fullscr(request.toggleOn(), page_fullscr=True)
@@ -685,11 +765,11 @@ class MainWindow(QMainWindow):
 
         QTimer.singleShot(0, lambda q=qurl, b=browser: self.update_urlbar(q, b))
 
-        tabData = self.tabsActivity.get(browser, None)
-        if tabData:
-            _, title, zoom, lastAccessed, frozen, isPlayingMedia = tabData
+        state = self.tabStates.get(browser)
+        if state is not None:
             url = qurl.toString()
-            self.tabsActivity[browser] = [url, title, zoom, lastAccessed, frozen, isPlayingMedia]
+            self.tabStates.setUrl(state, url)
+            self.journal.setUrl(state.tabId, url)
 
             if DefaultSettings.Media.checkPageCanPlayMedia and url and url not in self.checkedURL:
                 self.checkedURL.append(qurl.toString())
@@ -702,10 +782,11 @@ class MainWindow(QMainWindow):
         self.ui.tabs.setTabText(tabIndex, title if self.h_tabbar else "")
         self.ui.tabs.setTabToolTip(tabIndex, title + ("" if self.h_tabbar else "\n(Right-click to close)"))
 
-        tabData = self.tabsActivity.get(browser, None)
-        if tabData:
-            url, _, zoom, lastAccessed, frozen, isPlayingMedia = tabData
-            self.tabsActivity[browser] = [url, title, zoom, lastAccessed, frozen, isPlayingMedia]
+        state = self.tabStates.get(browser)
+        if state is not None:
+            url = state.url
+            state.title = title
+            self.journal.setTitle(state.tabId, title)
 
             if self.settings.enableHistory:
                 # create history once the title is available
@@ -726,14 +807,16 @@ class MainWindow(QMainWindow):
         self.ui.tabs.setTabIcon(tabIndex, QIcon(pixmapRotated))
 
         filename = self._getIconFileName(browser.url())
-        iconFile = os.path.join(self.tabIconsFolder, filename)
-        if not os.path.exists(iconFile):
-            pixmap.save(iconFile, "PNG")
+        self.favicons.put(filename, pixmap)
 
         if self.settings.enableHistory:
-            # update icon since it is asynchronous once the url changes (the icon file name was set when entry added)
-            iconFile = os.path.join(self.history_manager.historyFolder, filename)
-            self.history_widget.updateEntryIcon(icon, iconFile)
+            # update icon since it is asynchronous once the url changes (the icon key was set when entry added)
+            self.history_widget.updateEntryIcon(filename)
+
+        # suspended tabs from the same site show it too (instead of the generic icon)
+        for state in self.tabStates.withHost(browser.url().host()):
+            if isinstance(state.browser, QLabel):
+                self.ui.tabs.setTabIcon(self.ui.tabs.indexOf(state.browser), self._getTabIcon(filename, False))
 
     def _getIconFileName(self, qurl):
         filename = DefaultSettings.Icons.loading
@@ -768,6 +851,19 @@ class MainWindow(QMainWindow):
             self.ui.tabs.setCurrentIndex(tabIndex)
             QTimer.singleShot(0, lambda q=qurl, b=self.ui.tabs.currentWidget(): self.update_urlbar(q, b))
 
+    # avoid duplicate tabs: switch to the tab already showing the url, if any
+    def switch_or_add_tab(self, qurl):
+        for state in self.tabStates.withUrl(qurl.toString()):
+            tabIndex = self.ui.tabs.indexOf(state.browser)
+            if tabIndex > 0:
+                self.ui.tabs.setCurrentIndex(tabIndex)
+                return
+        self.add_new_tab(qurl)
+
+    def navigate_to_suggestion(self, url):
+        self.ui.urlbar.setText(url)
+        self.navigate_to_url()
+
     # method to update the url when tab is changed
     def navigate_to_url(self):
 
@@ -787,9 +883,11 @@ class MainWindow(QMainWindow):
             qurl.setScheme("https")
             qurl = QUrl(qurl.toString().replace("https:", "https://"))
 
-        browser = self.ui.tabs.currentWidget()
-        url = qurl.toString()
-        self.tabsActivity[browser] = [url, "", 1.0, time.time(), False, False]
+        state = self.tabStates.get(self.ui.tabs.currentWidget())
+        if state is not None:
+            self.tabStates.setUrl(state, qurl.toString())
+            state.title = ""
+            self.tabStates.touch(state)
 
         # set the url
         QTimer.singleShot(0, lambda u=qurl: self.ui.tabs.currentWidget().load(u))
@@ -799,20 +897,91 @@ class MainWindow(QMainWindow):
 
     @pyqtSlot()
     def checkTabsActivity(self):
-        tabKeys = list(self.tabsActivity.keys())
+        # inactive tabs are only discarded if renderer processes (of all windows) use more memory than allowed
         currTime = time.time()
-        for browser in tabKeys:
-            url, title, zoom, lastTimeLoaded, frozen, isPlayingMedia = self.tabsActivity[browser]
-            if browser == self.ui.tabs.currentWidget() or isPlayingMedia:
-                lastTimeLoaded = currTime
-            if not frozen and currTime - lastTimeLoaded > DefaultSettings.Tabs.suspendTime:
-                if isinstance(browser, QWebEngineView):
-                    # destroy qwebengineview to free resources and create a dummy qlabel widget
-                    zoom = browser.page().zoomFactor()
-                    browser = self._replaceInactiveBrowser(browser, self.ui.tabs.indexOf(browser), QUrl(url), title, zoom)
-                frozen = True
-                LOGGER.write(LoggerSettings.LogLevels.info, "Main", f"Tab suspended: {self.ui.tabs.indexOf(browser)}, {title}")
-            self.tabsActivity[browser] = [url, title, zoom, lastTimeLoaded, frozen, isPlayingMedia]
+        tabs = []
+        for window in [self] + [w for w in self.instances if w.isVisible()]:
+            tabs += [((window, browser), pid, lastUsed, discardable) for browser, pid, lastUsed, discardable in window.getTabsUsage(currTime)]
+        for (window, browser), size in self.memoryPolicy.select(tabs, currTime):
+            window.discardTab(browser, size)
+        if DefaultSettings.Tabs.useLifecycle and DefaultSettings.Tabs.freezeTime > 0:
+            for window in [self] + [w for w in self.instances if w.isVisible()]:
+                window.freezeTabs(currTime - DefaultSettings.Tabs.freezeTime)
+        self.activityTimer.start(self.memoryPolicy.interval * 1000)
+
+    def getTabsUsage(self, currTime):
+        # [(browser, renderer process id, last time used, can be discarded), ...] of loaded tabs
+        tabs = []
+        for state in self.tabStates.leastRecentlyUsed():
+            browser = state.browser
+            inUse = browser == self.ui.tabs.currentWidget() or state.isPlayingMedia
+            if inUse:
+                self.tabStates.touch(state, currTime)
+            # frozen pages still keep their memory (and can be discarded)
+            if isinstance(browser, QWebEngineView) and state.lifecycle != QWebEnginePage.LifecycleState.Discarded:
+                tabs.append((browser, browser.page().renderProcessPid(), state.lastAccessed, not inUse))
+        return tabs
+
+    def freezeTabs(self, lastAccessed):
+        # pages of tabs not used since given time are frozen: no CPU usage (timers, scripts, ...), but everything kept
+        for state in self.tabStates.leastRecentlyUsed():
+            if state.lastAccessed > lastAccessed:
+                break
+            if state.lifecycle == QWebEnginePage.LifecycleState.Active:
+                page = state.browser.page()
+                # not possible (or recommended) if page is visible, playing audio, ...
+                if page.recommendedState() != QWebEnginePage.LifecycleState.Active:
+                    page.setLifecycleState(QWebEnginePage.LifecycleState.Frozen)
+
+    def lifecycle_changed(self, lifecycle, browser):
+
+        state = self.tabStates.get(browser)
+        if state is None:
+            return
+        previous, state.lifecycle = state.lifecycle, lifecycle
+
+        # frozen / discarded pages keep their view (pages are resumed when shown), but are saved as suspended tabs
+        state.frozen = lifecycle != QWebEnginePage.LifecycleState.Active
+        self.journal.setFrozen(state.tabId, state.frozen)
+
+        if lifecycle == QWebEnginePage.LifecycleState.Discarded:
+            tabIndex = self.ui.tabs.indexOf(browser)
+            self.ui.tabs.setTabIcon(tabIndex, self._getTabIcon(self._getIconFileName(browser.url()), False))
+
+        elif lifecycle == QWebEnginePage.LifecycleState.Active:
+            if previous == QWebEnginePage.LifecycleState.Frozen:
+                # resumed as soon as renderer runs scripts again
+                state.resumeStart = time.perf_counter()
+                browser.page().runJavaScript("0", lambda result, s=state: self._logResumed(s, "unfrozen"))
+            elif previous == QWebEnginePage.LifecycleState.Discarded:
+                # page is reloaded: resumed once loaded (see onLoadFinished())
+                state.resumeStart = time.perf_counter()
+
+    def _logResumed(self, state, how):
+        if state.resumeStart is not None:
+            elapsed = time.perf_counter() - state.resumeStart
+            state.resumeStart = None
+            LOGGER.log(LoggerSettings.LogLevels.info, "Main", lambda: f"Tab resumed ({how}): {state.title} ({elapsed * 1000:.0f} ms)")
+
+    def discardTab(self, browser, size=0):
+        state = self.tabStates.get(browser)
+        if state is None or not isinstance(browser, QWebEngineView):
+            return
+        tabIndex = self.ui.tabs.indexOf(browser)
+        page = browser.page()
+        state.zoom = page.zoomFactor()
+        self.journal.setZoom(state.tabId, state.zoom)
+        if DefaultSettings.Tabs.useLifecycle:
+            # keep the view, only its renderer is released (page is reloaded from its navigation history when shown,
+            # so scroll position is kept). Not possible if it is visible, has developer tools open, ...
+            if page.recommendedState() != QWebEnginePage.LifecycleState.Discarded:
+                return
+            page.setLifecycleState(QWebEnginePage.LifecycleState.Discarded)
+        else:
+            # destroy qwebengineview to free resources and create a dummy qlabel widget
+            self._replaceInactiveBrowser(browser, tabIndex, QUrl(state.url), state.title, state.zoom)
+        LOGGER.log(LoggerSettings.LogLevels.info, "Main",
+                   lambda: f"Tab discarded: {tabIndex}, {state.title} (~{size / 2**20:.0f} MB, idle {time.time() - state.lastAccessed:.0f} s)")
 
     def current_tab_changed(self, tabIndex):
 
@@ -825,18 +994,20 @@ class MainWindow(QMainWindow):
         else:
 
             browser = self.ui.tabs.widget(tabIndex)
-            tabData = self.tabsActivity.get(browser, None)
-            if tabData:
+            state = self.tabStates.get(browser)
+            if state is not None:
 
-                url, title, zoom, _, frozen, isPlayingMedia = tabData
+                url = state.url
                 qurl = QUrl(url)
                 # update the url
                 QTimer.singleShot(0, lambda q=qurl, b=browser: self.update_urlbar(q, b))
 
                 if isinstance(browser, QLabel):
                     # create qwebengineview if page was suspended and load url
-                    browser = self._replaceInactiveBrowser(browser, tabIndex, qurl, title, zoom)
-                self.tabsActivity[browser] = [url, title, zoom, time.time(), False, isPlayingMedia]
+                    state.resumeStart = time.perf_counter()
+                    browser = self._replaceInactiveBrowser(browser, tabIndex, qurl, state.title, state.zoom)
+                self.tabStates.touch(state)
+                self.journal.activate(state.tabId)
 
                 if DefaultSettings.Media.checkPageCanPlayMedia and url and url not in self.checkedURL:
                     self.checkedURL.append(url)
@@ -852,13 +1023,28 @@ class MainWindow(QMainWindow):
                     self.ui.reload_btn.setText(self.ui.reload_char)
                     self.ui.reload_btn.setToolTip("Reload page")
 
-    def _replaceInactiveBrowser(self, browser, tabIndex, qurl, title, zoom):
+    def warmUpTab(self, placeholder):
+        # load a restored tab in background, without activating it (unless it has been activated or closed meanwhile)
+        state = self.tabStates.get(placeholder)
+        tabIndex = self.ui.tabs.indexOf(placeholder)
+        if state is None or tabIndex < 0 or not isinstance(placeholder, QLabel):
+            return None
+        LOGGER.log(LoggerSettings.LogLevels.info, "Main", lambda: f"Tab warmed up: {tabIndex}, {state.title}")
+        browser = self._replaceInactiveBrowser(placeholder, tabIndex, QUrl(state.url), state.title, state.zoom, activate=False)
+        self.tabStates.touch(state)
+        return browser
+
+    def isCurrentTabLoading(self):
+        browser = self.ui.tabs.currentWidget()
+        return isinstance(browser, QWebEngineView) and browser.page().isLoading()
+
+    def _replaceInactiveBrowser(self, browser, tabIndex, qurl, title, zoom, activate=True):
 
         # disconnect signal to avoid repeatedly calling current_tab_changed() when removing and adding tabs
         self.ui.tabs.currentChanged.disconnect()
 
         # close previous widget and tab
-        del self.tabsActivity[browser]
+        state = self.tabStates.get(browser)
         self.ui.tabs.removeTab(tabIndex)
         isView = isinstance(browser, QWebEngineView)
         if isView:
@@ -870,9 +1056,9 @@ class MainWindow(QMainWindow):
 
         # create new widget in add_tab() method (QWebEngineView if it was QLabel and vice versa)
         icon = self._getIconFileName(qurl)
-        tabIndex = self.add_tab(qurl, zoom, title, not isView, icon, tabIndex)
+        tabIndex = self.add_tab(qurl, zoom, title, not isView, icon, tabIndex, state)
         # self.ui.tabs.setTabIcon(tabIndex, self._getTabIcon(self._getIconFileName(qurl), not isView))
-        if not isView:
+        if not isView and activate:
             self.ui.tabs.setCurrentIndex(tabIndex)
 
         # reconnect signal for current index changed
@@ -906,6 +1092,10 @@ class MainWindow(QMainWindow):
             # self.add_toggletab_action()
             self.ui.tabs.tabBar().moveTab(from_index, 0)
 
+        # save new order of tabs
+        states = [self.tabStates.get(self.ui.tabs.widget(i)) for i in range(1, self.ui.tabs.count() - 1)]
+        self.journal.moveTabs(self.sessionWin, [state.tabId for state in states if state is not None])
+
     def tab_closed(self, browser):
 
         tabIndex = self.ui.tabs.indexOf(browser)
@@ -916,9 +1106,11 @@ class MainWindow(QMainWindow):
                 # close additional window only
                 self.close()
             else:
-                self.ui.tabs.removeTab(1)
                 # remove all tabs
-                self.settings.setPreviousTabs([], True)
+                state = self.tabStates.remove(browser)
+                if state is not None:
+                    self.journal.closeTab(state.tabId)
+                self.ui.tabs.removeTab(1)
                 # close application
                 QCoreApplication.quit()
 
@@ -926,11 +1118,11 @@ class MainWindow(QMainWindow):
             # calculate next tab position
             targetIndex = self.ui.tabs.currentIndex() if tabIndex != self.ui.tabs.currentIndex() else self.ui.tabs.currentIndex() + 1
 
-            tabData = self.tabsActivity.get(browser, None)
+            state = self.tabStates.remove(browser)
             title = ""
-            if tabData is not None:
-                _, title, _, _, _, _ = tabData
-                del self.tabsActivity[browser]
+            if state is not None:
+                title = state.title
+                self.journal.closeTab(state.tabId)
 
             # remove tab and delete tab widget safely
             self.ui.tabs.removeTab(tabIndex)
@@ -948,7 +1140,7 @@ class MainWindow(QMainWindow):
                 targetIndex = 1
             self.ui.tabs.setCurrentIndex(targetIndex)
 
-            LOGGER.write(LoggerSettings.LogLevels.info, "Main", f"Tab closed: {title}")
+            LOGGER.log(LoggerSettings.LogLevels.info, "Main", "Tab closed: %s", title)
 
     def toggle_tabbar(self, clicked=True):
 
@@ -971,10 +1163,8 @@ class MainWindow(QMainWindow):
         for i in range(1, self.ui.tabs.count() - 1):
             browser = self.ui.tabs.widget(i)
             icon = self.ui.tabs.tabIcon(i)
-            title = ""
-            tabData = self.tabsActivity.get(browser, None)
-            if tabData is not None:
-                _, title, _, _, _, _ = tabData
+            state = self.tabStates.get(browser)
+            title = state.title if state is not None else ""
             if self.h_tabbar:
                 new_icon = QIcon(icon.pixmap(QSize(self.icon_size, self.icon_size)).transformed(QTransform().rotate(-90), Qt.TransformationMode.SmoothTransformation))
                 self.ui.tabs.setTabText(i, title)
@@ -1131,6 +1321,17 @@ class MainWindow(QMainWindow):
             else:
                 self.ui.tabs.currentWidget().findText(textToFind, QWebEnginePage.FindFlag.FindBackward)
 
+    def manage_stats(self):
+        if self.stats_widget.isVisible():
+            self.stats_widget.hide()
+
+        else:
+            self.stats_widget.show()
+            # centered below navigation bar
+            gap = self.mapToGlobal(self.ui.navtab.pos()).y() - self.y()
+            self.stats_widget.move(QPoint(self.x() + (self.width() - self.stats_widget.width()) // 2,
+                                          self.y() + self.ui.navtab.height() + gap))
+
     def get_dl_manager_pos(self):
 
         # getting title bar height (custom or standard)
@@ -1293,17 +1494,17 @@ class MainWindow(QMainWindow):
 
         url = request.requestedUrl().toString()
         if request.destination() == QWebEngineNewWindowRequest.DestinationType.InNewWindow:
-            self.show_in_new_window([[url, 1.0, True, False, ""]])
-            LOGGER.write(LoggerSettings.LogLevels.info, "Main", f"New window open: {url}")
+            self.show_in_new_window([[url, 1.0, "", True, False, ""]])
+            LOGGER.log(LoggerSettings.LogLevels.info, "Main", "New window open: %s", url)
 
         elif request.destination() == QWebEngineNewWindowRequest.DestinationType.InNewTab:
             self.add_new_tab(QUrl(url), setFocus=False)
-            LOGGER.write(LoggerSettings.LogLevels.info, "Main", f"New tab open: {url}")
+            LOGGER.log(LoggerSettings.LogLevels.info, "Main", "New tab open: %s", url)
 
         elif request.destination() == QWebEngineNewWindowRequest.DestinationType.InNewDialog:
             if request.isUserInitiated():
                 self.show_in_new_dialog(request)
-                LOGGER.write(LoggerSettings.LogLevels.info, "Main", f"New dialog open: {url}")
+                LOGGER.log(LoggerSettings.LogLevels.info, "Main", "New dialog open: %s", url)
         #     else:
         #         # This would allow popups... something we don't want, of course
         #         self.show_in_new_dialog(request)
@@ -1441,6 +1642,20 @@ class MainWindow(QMainWindow):
             if a0.modifiers() == Qt.KeyboardModifier.ControlModifier:
                 self.manage_history()
 
+        elif a0.key() == Qt.Key.Key_B:
+            if a0.modifiers() == Qt.KeyboardModifier.ControlModifier | Qt.KeyboardModifier.ShiftModifier:
+                self.manage_stats()
+
+        elif a0.key() == Qt.Key.Key_L:
+            if a0.modifiers() == Qt.KeyboardModifier.ControlModifier | Qt.KeyboardModifier.ShiftModifier:
+                path = LOGGER.dumpFlightRecorder("Requested by user")
+                if path is not None:
+                    self.dialog_manager.createDialog(
+                        icon=QIcon(DefaultSettings.Icons.appIcon_32),
+                        title="Recent events saved",
+                        message=f"Recent events have been saved to:\n{os.path.abspath(path)}",
+                        buttonOkOnly=True)
+
         elif a0.key() == Qt.Key.Key_Backtab:
             if a0.modifiers() == Qt.KeyboardModifier.ShiftModifier | Qt.KeyboardModifier.ControlModifier:
                 index = self.ui.tabs.currentIndex() - 1
@@ -1534,9 +1749,11 @@ class MainWindow(QMainWindow):
     def closeEvent(self, a0):
 
         # close all other widgets and processes
+        self.restoreScheduler.stop()
         self.dl_manager.cancelAllDownloads()
         self.dl_manager.close()
         self.search_widget.close()
+        self.stats_widget.close()
         self.history_widget.close()
         self.ui.hoverHWidget.close()
         self.ui.hoverVWidget.close()
@@ -1556,14 +1773,19 @@ class MainWindow(QMainWindow):
         tabs = []
         for i in range(1, self.ui.tabs.count() - 1):
             browser = self.ui.tabs.widget(i)
-            url, title, zoom, _, frozen, _ = self.tabsActivity[browser]
+            state = self.tabStates.get(browser)
+            if state is None:
+                continue
+            url, title, zoom = state.url, state.title, state.zoom
             if isinstance(browser, QWebEngineView):
                 url = browser.url().toString()
                 page = browser.page()
                 page.externalPlayer.closeExternalPlayer(False, url)
                 zoom = page.zoomFactor()
+            self.journal.setUrl(state.tabId, url)
+            self.journal.setZoom(state.tabId, zoom)
             iconFile = self._getIconFileName(QUrl(url))
-            tabs.append([url, zoom, title, i == self.ui.tabs.currentIndex(), frozen, iconFile])
+            tabs.append([url, zoom, title, i == self.ui.tabs.currentIndex(), state.frozen, iconFile])
         LOGGER.write(LoggerSettings.LogLevels.info, "Main", f"Current tabs saved: {len(tabs)}")
 
         # save other open windows
@@ -1579,30 +1801,51 @@ class MainWindow(QMainWindow):
                 new_tabs = []
                 for i in range(1, w.ui.tabs.count() - 1):
                     browser = w.ui.tabs.widget(i)
-                    url, title, zoom, _, frozen, _ = self.tabsActivity[browser]
+                    state = w.tabStates.get(browser)
+                    if state is None:
+                        continue
+                    url, title, zoom = state.url, state.title, state.zoom
                     if isinstance(browser, QWebEngineView):
                         url = browser.url().toString()
                         page = browser.page()
                         page.externalPlayer.closeExternalPlayer(False, url)
                         zoom = page.zoomFactor()
+                    self.journal.setUrl(state.tabId, url)
+                    self.journal.setZoom(state.tabId, zoom)
                     iconFile = self._getIconFileName(QUrl(url))
-                    new_tabs.append([url, zoom, title, i == self.ui.tabs.currentIndex(), frozen, iconFile])
+                    new_tabs.append([url, zoom, title, i == w.ui.tabs.currentIndex(), state.frozen, iconFile])
                     total_new_tabs += 1
 
                 # won't keep any incognito data
                 if not w.isIncognito:
                     new_wins.append(new_tabs)
 
-            # closing all other open child windows
-            w.close()
+                # closing all other open child windows (they will be restored, so they are not removed from session)
+                # windows already closed by the user must not be closed (and release their resources) again
+                w.sessionWin = None
+                w.close()
         LOGGER.write(LoggerSettings.LogLevels.info, "Main", f"New windows saved: {len(new_wins)} / tabs: {total_new_tabs}")
 
         # only main window can save settings
         if not self.isNewWin and not self.isIncognito:
-            self.saveSettings(tabs, new_wins)
-
-        if not self.isIncognito:
-            self.history_manager.saveHistory()
+            self.saveSettings()
+            # save session as a snapshot, and stop recording it (windows closed from now on must be restored)
+            self.journal.close()
+            # icons of saved tabs will be needed when restoring them
+            self.favicons.touch([tab[5] for tab in tabs] + [tab[5] for new_tabs in new_wins for tab in new_tabs])
+
+        elif self.sessionWin is not None:
+            # child window closed by the user: it won't be restored
+            self.journal.closeWindow(self.sessionWin)
+
+        # stop using shared filters, icons and session (they will be freed when no other window is using them)
+        if not self._released:
+            self._released = True
+            if not self.isIncognito:
+                self.history_manager.saveHistory()
+                self.journal.release()
+            self.requestInterceptor.release()
+            self.favicons.release()
 
         args = []
         if self.cache_manager.deleteCacheRequested and not self.isNewWin and not self.isIncognito:
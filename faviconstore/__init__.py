@@ -0,0 +1 @@
+from ._faviconstore import FaviconStore, FAVICON_STORE
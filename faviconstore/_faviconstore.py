@@ -0,0 +1,234 @@
+import contextlib
+import hashlib
+import os
+import re
+import sqlite3
+import time
+
+from PyQt6.QtCore import QByteArray, QBuffer, QIODevice
+from PyQt6.QtGui import QPixmap
+
+from logger import LOGGER, LoggerSettings
+
+
+class FaviconStore:
+
+    # keys are the SHA-256 of the host (as formerly used for icon file names), so existing references are still valid
+    _keyFormat = re.compile(r"^[0-9a-f]{64}$")
+
+    def __init__(self):
+
+        # favicons shared by tabs, history and session (and all windows), stored in a single database:
+        #   icons: PNG data, by SHA-256 of its content (hosts with the same icon share it)
+        #   hosts: icon used by each host, and when it was last stored or shown (least recently used are evicted first)
+        self._refCount = 0
+        self._conn = None
+        self.path = ""
+        self.maxSize = 0
+        self.totalSize = 0
+
+        # decoded pixmaps (None if there is no icon for that key), most recently used last
+        self._pixmaps = {}
+        self.cacheSize = 256
+
+        # keys shown since their last use time was written (written in batches, not on every paint)
+        self._used = set()
+        self._usedWritten = time.time()
+        self.usedInterval = 60
+
+    def acquire(self, path, maxSize=8 * 1024 * 1024, cacheSize=256):
+
+        self._refCount += 1
+        if self._refCount == 1:
+            self.path = path
+            self.maxSize = maxSize
+            self.cacheSize = cacheSize
+            self._conn = sqlite3.connect(path, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA busy_timeout=2000")
+            with self._transaction():
+                self._conn.execute("""CREATE TABLE IF NOT EXISTS icons (
+                                          hash TEXT PRIMARY KEY,
+                                          data BLOB NOT NULL,
+                                          size INTEGER NOT NULL)""")
+                self._conn.execute("""CREATE TABLE IF NOT EXISTS hosts (
+                                          key TEXT PRIMARY KEY,
+                                          icon TEXT NOT NULL,
+                                          used REAL NOT NULL)""")
+                self._conn.execute("CREATE INDEX IF NOT EXISTS hosts_icon ON hosts (icon)")
+                self._conn.execute("CREATE INDEX IF NOT EXISTS hosts_used ON hosts (used)")
+            self.totalSize = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM icons").fetchone()[0]
+            LOGGER.write(LoggerSettings.LogLevels.info, "FaviconStore", f"Favicon store opened: {self.totalSize} bytes")
+
+        return self
+
+    def release(self):
+
+        self._refCount = max(0, self._refCount - 1)
+        if self._refCount == 0 and self._conn is not None:
+            try:
+                self._writeUsed()
+                self._conn.execute("PRAGMA optimize")
+                self._conn.close()
+            except:
+                pass
+            self._conn = None
+            self._pixmaps = {}
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._conn
+        except:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    @staticmethod
+    def encode(pixmap):
+        data = QByteArray()
+        buffer = QBuffer(data)
+        buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+        pixmap.save(buffer, "PNG")
+        buffer.close()
+        return bytes(data)
+
+    def _cache(self, key, pixmap):
+        self._pixmaps.pop(key, None)
+        if len(self._pixmaps) >= self.cacheSize:
+            del self._pixmaps[next(iter(self._pixmaps))]
+        self._pixmaps[key] = pixmap
+
+    def __contains__(self, key):
+        if self._pixmaps.get(key) is not None:
+            return True
+        return self._conn is not None and self._conn.execute("SELECT 1 FROM hosts WHERE key = ?", (key,)).fetchone() is not None
+
+    def pixmap(self, key):
+        # returns None if there is no icon for given key
+        if key in self._pixmaps:
+            pixmap = self._pixmaps[key]
+            self._cache(key, pixmap)
+            if pixmap is not None:
+                self._markUsed(key)
+            return pixmap
+        if not key or self._conn is None:
+            return None
+        row = self._conn.execute("SELECT icons.data FROM hosts JOIN icons ON icons.hash = hosts.icon WHERE hosts.key = ?",
+                                 (key,)).fetchone()
+        pixmap = None
+        if row is not None:
+            pixmap = QPixmap()
+            if not pixmap.loadFromData(row[0], "PNG"):
+                pixmap = None
+        # missing icons are cached too, so rows or tabs without icon don't query the database on every paint
+        self._cache(key, pixmap)
+        if pixmap is not None:
+            self._markUsed(key)
+        return pixmap
+
+    def _markUsed(self, key):
+        self._used.add(key)
+        if time.time() - self._usedWritten >= self.usedInterval:
+            self._writeUsed()
+
+    def _writeUsed(self):
+        # icons shown are as recently used as those just stored (so they are not evicted before them)
+        self._usedWritten = time.time()
+        if self._used and self._conn is not None:
+            used, self._used = self._used, set()
+            try:
+                self.touch(used)
+            except:
+                pass
+
+    def put(self, key, pixmap):
+        # store icon for given key (usually when the page icon changes). Returns True if it was stored
+        if not key or self._conn is None or pixmap is None or pixmap.isNull():
+            return False
+        try:
+            data = self.encode(pixmap)
+            if self._putData(key, data):
+                self._cache(key, QPixmap(pixmap))
+                return True
+        except:
+            LOGGER.write(LoggerSettings.LogLevels.warning, "FaviconStore", f"Icon could not be stored: {key}")
+        return False
+
+    def _putData(self, key, data):
+        iconHash = hashlib.sha256(data).hexdigest()
+        with self._transaction():
+            row = self._conn.execute("SELECT icon FROM hosts WHERE key = ?", (key,)).fetchone()
+            self._conn.execute("INSERT INTO hosts (key, icon, used) VALUES (?, ?, ?) "
+                               "ON CONFLICT (key) DO UPDATE SET icon = excluded.icon, used = excluded.used",
+                               (key, iconHash, time.time()))
+            if row is not None and row[0] == iconHash:
+                # same icon as before: it's just been used
+                return True
+            if self._conn.execute("INSERT OR IGNORE INTO icons (hash, data, size) VALUES (?, ?, ?)",
+                                  (iconHash, data, len(data))).rowcount:
+                self.totalSize += len(data)
+            if row is not None:
+                self._deleteUnused([row[0]])
+        if self.maxSize and self.totalSize > self.maxSize:
+            self.evict(self.maxSize * 3 // 4)
+        return True
+
+    def touch(self, keys):
+        # mark given icons as recently used (e.g. icons of tabs saved in session), so they are evicted last
+        if self._conn is not None:
+            now = time.time()
+            with self._transaction():
+                self._conn.executemany("UPDATE hosts SET used = ? WHERE key = ?", [(now, key) for key in keys])
+
+    def _deleteUnused(self, iconHashes):
+        for iconHash in iconHashes:
+            row = self._conn.execute("SELECT size FROM icons WHERE hash = ? AND NOT EXISTS (SELECT 1 FROM hosts WHERE icon = ?)",
+                                     (iconHash, iconHash)).fetchone()
+            if row is not None:
+                self._conn.execute("DELETE FROM icons WHERE hash = ?", (iconHash,))
+                self.totalSize -= row[0]
+
+    def evict(self, targetSize):
+        # delete least recently used hosts (and their icons, if no other host shares them) until under targetSize
+        self._writeUsed()
+        evicted = 0
+        while self.totalSize > targetSize:
+            rows = self._conn.execute("SELECT key, icon FROM hosts ORDER BY used LIMIT 64").fetchall()
+            if not rows:
+                break
+            with self._transaction():
+                self._conn.executemany("DELETE FROM hosts WHERE key = ?", [(key,) for key, _ in rows])
+                self._deleteUnused({icon for _, icon in rows})
+            for key, _ in rows:
+                self._pixmaps.pop(key, None)
+            evicted += len(rows)
+        if evicted:
+            LOGGER.write(LoggerSettings.LogLevels.info, "FaviconStore", f"Favicons evicted: {evicted}")
+        return evicted
+
+    def importFolder(self, folder, remove=True):
+        # move icon files (named by their key, as formerly stored by tabs and history) into the store
+        count = 0
+        if self._conn is None or not os.path.isdir(folder):
+            return count
+        for file in os.listdir(folder):
+            if not self._keyFormat.match(file):
+                continue
+            path = os.path.join(folder, file)
+            try:
+                if file not in self:
+                    with open(path, "rb") as f:
+                        count += self._putData(file, f.read())
+                if remove:
+                    os.remove(path)
+            except:
+                pass
+        if count:
+            LOGGER.write(LoggerSettings.LogLevels.info, "FaviconStore", f"Favicons imported from {folder}: {count}")
+        return count
+
+
+FAVICON_STORE = FaviconStore()
@@ -1,2 +1,5 @@
 from ._history import History
+from ._historycompleter import HistoryCompleter
+from ._historymodel import HistoryModel
+from ._historystore import HistoryStore
 from ._historywidget import HistoryWidget
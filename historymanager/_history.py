@@ -1,11 +1,13 @@
 import os
 import shutil
-import time
 
-from PyQt6.QtCore import QSettings
+from PyQt6.QtCore import QSettings, QTimer
 
+from faviconstore import FAVICON_STORE
 from logger import LOGGER, LoggerSettings
 from settings import DefaultSettings
+from ._historystore import HistoryStore
+from ._iconcollector import IconCollector
 
 
 class History:
@@ -21,10 +23,22 @@ class History:
         if not os.path.exists(self.historyFolder):
             os.makedirs(self.historyFolder)
 
-        self._historyValues = self._getDict("History/history", {})
+        # entries are stored (and updated) one by one in a database, as they are visited
+        self._store = self._openStore()
+        self._iconCollector = None
+        self.migrateHistory()
+        # icons were formerly stored as individual files in history folder
+        FAVICON_STORE.importFolder(self.historyFolder)
         self.filterHistory()
         LOGGER.write(LoggerSettings.LogLevels.info, "History", f"History loaded")
 
+        # icons not needed anymore are collected out of the startup path (once the window is shown and idle)
+        self._iconTimer = QTimer()
+        self._iconTimer.setSingleShot(True)
+        self._iconTimer.setInterval(DefaultSettings.History.iconsCollectDelay)
+        self._iconTimer.timeout.connect(self.collectIcons)
+        self._iconTimer.start()
+
     def _getDict(self, key, defaultValue):
         value = defaultValue
         try:
@@ -33,6 +47,9 @@ class History:
             LOGGER.write(LoggerSettings.LogLevels.warning, "History", f"Wrong value in History: {key}")
         return value or defaultValue
 
+    def _openStore(self):
+        return HistoryStore(self.historyDbPath, DefaultSettings.History.historySize, DefaultSettings.History.frecencyHalfLife)
+
     @property
     def historyFolder(self):
         return os.path.dirname(self._historyObj.fileName())
@@ -45,73 +62,108 @@ class History:
     def historyPath(self):
         return self._historyObj.fileName()
 
+    @property
+    def historyDbPath(self):
+        return os.path.join(self.historyFolder, DefaultSettings.Storage.History.historyDbFile)
+
+    def migrateHistory(self):
+        # history was formerly stored as a whole in the settings file. Move it to the database (only once)
+        if self._historyObj.contains("History/history"):
+            values = self._getDict("History/history", {})
+            try:
+                count = self._store.importEntries(values)
+            except:
+                LOGGER.write(LoggerSettings.LogLevels.error, "History", f"History couldn't be migrated to {self.historyDbPath}")
+                return
+            self._historyObj.remove("History/history")
+            self._historyObj.sync()
+            LOGGER.write(LoggerSettings.LogLevels.info, "History", f"History migrated: {count} entries")
+
     def filterHistory(self):
-        historySorted = {}
-        icons = {self.historyFile}
-        # sort by date and discard items beyond maximum history size (also delete icon file if not needed anymore)
-        for i, (url, item) in enumerate(sorted(self._historyValues.items(), reverse=True, key=lambda item: item[1]["date"])):
-            item = self._historyValues[url]
-            icon = item["icon"]
-            if i < DefaultSettings.History.historySize:
-                historySorted[url] = item
-                icons.add(os.path.basename(icon))
-            else:
-                break
-        for iconFile in os.listdir(self.historyFolder):
-            if iconFile not in icons:
-                try:
-                    os.remove(os.path.join(self.historyFolder, iconFile))
-                except:
-                    pass
-        self._historyValues = historySorted
+        # discard items beyond maximum history size, in case it has been reduced (new entries evict old ones)
+        self._store.prune(DefaultSettings.History.historySize)
+
+    def collectIcons(self):
+        # forget icons no entry refers to anymore, in background. Their favicons are left in the shared store, since
+        # tabs and session may still use them: store evicts them by itself once they are not used anymore
+        if self._iconCollector is None or not self._iconCollector.isRunning():
+            self._iconCollector = IconCollector(self.historyDbPath)
+            self._iconCollector.start(IconCollector.Priority.LowestPriority)
+
+    def _waitIconCollector(self):
+        self._iconTimer.stop()
+        if self._iconCollector is not None:
+            self._iconCollector.wait()
+            self._iconCollector = None
 
     @property
     def history(self):
-        return self._historyValues
+        # {url: {"date": date, "title": title, "icon": icon, "frecency": frecency}}, best ranked (frecency) first
+        return {url: {"date": date, "title": title, "icon": icon, "frecency": frecency}
+                for url, date, title, icon, frecency in self._store.entries(DefaultSettings.History.historySize)}
+
+    def frecency(self, url):
+        entry = self._store.get(url)
+        return 0 if entry is None else entry["frecency"]
+
+    def searchHistory(self, text, limit=50):
+        # [(url, date, title, icon, frecency), ...] matching the given text, best matches first
+        try:
+            return self._store.search(text, limit)
+        except:
+            LOGGER.write(LoggerSettings.LogLevels.warning, "History", f"History search failed: {text}")
+            return []
+
+    def suggestHistory(self, text, limit=8):
+        # [(url, date, title, icon, frecency), ...] containing the given text, best ranked (frecency) first
+        try:
+            return self._store.suggest(text, limit)
+        except:
+            LOGGER.write(LoggerSettings.LogLevels.warning, "History", f"History suggestions failed: {text}")
+            return []
 
     def addHistoryEntry(self, item):
-        added = True
         date, title, url, icon = item
         if not url or not title:
             return False
-        item = self._historyValues.get(url, None)
-        if item is not None:
-            added = False
-            del self._historyValues[url]
-        self._historyValues[url] = {
-            "date": date,
-            "title": title,
-            "icon": icon
-        }
-        return added
+        try:
+            return self._store.addVisit(url, title, icon, date)
+        except:
+            LOGGER.write(LoggerSettings.LogLevels.warning, "History", f"History entry couldn't be added: {url}")
+            return False
 
     def updateHistoryEntry(self, url, title=None, icon=None):
-        item = self._historyValues.get(url, None)
-        if item is not None:
-            if title is not None:
-                item["title"] = title
-            if icon is not None:
-                item["icon"] = icon
-            self._historyValues[url] = item
+        try:
+            self._store.update(url, title, icon)
+        except:
+            LOGGER.write(LoggerSettings.LogLevels.warning, "History", f"History entry couldn't be updated: {url}")
 
     def deleteHistoryEntryByUrl(self, url):
         try:
-            del self._historyValues[url]
-            LOGGER.write(LoggerSettings.LogLevels.info, "History", f"History entry deleted: {url}")
+            if self._store.delete(url):
+                LOGGER.write(LoggerSettings.LogLevels.info, "History", f"History entry deleted: {url}")
+                return
         except:
-            LOGGER.write(LoggerSettings.LogLevels.warning, "HistoryManager", f"History entry couldn't be deleted: {url}")
+            pass
+        LOGGER.write(LoggerSettings.LogLevels.warning, "HistoryManager", f"History entry couldn't be deleted: {url}")
 
     def deleteAllHistory(self):
+        self._waitIconCollector()
         try:
+            self._store.clear()
+            self._store.close()
             shutil.rmtree(self.historyFolder)
-            self._historyValues = {}
-            self.saveHistory()
             LOGGER.write(LoggerSettings.LogLevels.info, "HistoryManager", "History deleted")
         except:
             LOGGER.write(LoggerSettings.LogLevels.warning, "HistoryManager", "History folder not found when trying to delete it")
+        if not os.path.exists(self.historyFolder):
+            os.makedirs(self.historyFolder)
+        self._store = self._openStore()
 
     def saveHistory(self):
-        self._historyObj.setValue("History/history", self._historyValues)
+        # entries are already stored as they are added, just release the database
+        self._waitIconCollector()
+        self._store.close()
         LOGGER.write(LoggerSettings.LogLevels.info, "HistoryManager", "History saved")
 
     def instance(self):
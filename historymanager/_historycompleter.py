@@ -0,0 +1,77 @@
+from PyQt6.QtCore import Qt, QTimer, QModelIndex, QEvent, pyqtSignal
+from PyQt6.QtGui import QPixmap
+from PyQt6.QtWidgets import QCompleter, QAbstractItemView
+
+from settings import DefaultSettings
+from themes import Themes
+from ._historydelegate import HistoryDelegate
+from ._historymodel import HistoryModel
+
+
+class HistoryCompleter(QCompleter):
+
+    urlActivatedSig = pyqtSignal(str)
+
+    def __init__(self, parent=None, settings=None, history_manager=None):
+        super(HistoryCompleter, self).__init__(parent)
+
+        self._settings = settings
+        self.history_manager = history_manager
+
+        # suggestions come already filtered and ranked (frecency) by history store, so completer must show them as they are
+        self.suggestionsModel = HistoryModel(self)
+        self.setModel(self.suggestionsModel)
+        self.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.setCompletionRole(HistoryModel.UrlRole)
+        self.setMaxVisibleItems(DefaultSettings.History.suggestions)
+
+        loadingIcon = QPixmap(DefaultSettings.Icons.loading).scaled(24, 24, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+        self.delegate = HistoryDelegate(self, loadingIcon)
+        self.popup().setItemDelegate(self.delegate)
+        # same look as history widget rows (colors are taken from the theme stylesheet)
+        self.popup().setObjectName("content")
+        self.popup().setStyleSheet(Themes.styleSheet(settings.theme, Themes.Section.historyWidget))
+        self.popup().setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.popup().setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.popup().setUniformItemSizes(True)
+        self.activated[QModelIndex].connect(self.onActivated)
+
+        self.suggestTimer = QTimer()
+        self.suggestTimer.setSingleShot(True)
+        self.suggestTimer.setInterval(DefaultSettings.History.searchDelay)
+        self.suggestTimer.timeout.connect(self.suggest)
+
+    def setUrlbar(self, urlbar):
+        # not using urlbar.setCompleter(): it would replace (and filter) urlbar text as the user types
+        self.setWidget(urlbar)
+        urlbar.textEdited.connect(self.onTextEdited)
+
+    def onTextEdited(self, text):
+        # only while the user is typing (not when urlbar is updated by the browser), and once they stop
+        if self._settings.enableHistory:
+            self.suggestTimer.start()
+
+    def suggest(self):
+        urlbar = self.widget()
+        text = urlbar.text().strip() if urlbar is not None else ""
+        entries = self.history_manager.suggestHistory(text, DefaultSettings.History.suggestions) if text and urlbar.hasFocus() else []
+        self.suggestionsModel.setEntries(entries)
+        if entries:
+            self.complete()
+        else:
+            self.popup().hide()
+
+    def eventFilter(self, obj, event):
+        # Enter on a selected suggestion must only load it (by default, it also reaches urlbar, loading what was typed)
+        if obj is self.popup() and event.type() == QEvent.Type.KeyPress and event.key() in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
+            index = self.popup().currentIndex()
+            if index.isValid():
+                self.popup().hide()
+                self.onActivated(index)
+                return True
+        return super(HistoryCompleter, self).eventFilter(obj, event)
+
+    def onActivated(self, index):
+        url = index.data(HistoryModel.UrlRole)
+        if url:
+            self.urlActivatedSig.emit(url)
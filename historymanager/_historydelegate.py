@@ -0,0 +1,45 @@
+from PyQt6.QtCore import Qt, QSize, QRect
+from PyQt6.QtGui import QPixmap, QPainter, QPalette
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyle, QStyleOptionViewItem, QApplication
+
+from faviconstore import FAVICON_STORE
+from ._historymodel import HistoryModel
+
+
+class HistoryDelegate(QStyledItemDelegate):
+
+    _width = 460
+    _height = 32
+    _iconSize = 24
+    _margin = 5
+
+    def __init__(self, parent=None, loadingIcon=None):
+        super(HistoryDelegate, self).__init__(parent)
+
+        self.loadingIcon = loadingIcon or QPixmap()
+
+    def sizeHint(self, option, index):
+        return QSize(self._width, self._height)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        rect = option.rect
+        # row background and text colors come from the view style (theme stylesheet: QListView::item, :hover, ...)
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        widget = option.widget
+        style = widget.style() if widget is not None else QApplication.style()
+        style.drawPrimitive(QStyle.PrimitiveElement.PE_PanelItemViewItem, opt, painter, widget)
+        selected = option.state & QStyle.StateFlag.State_Selected
+
+        # icons are shared with tabs (decoded ones are cached by the store)
+        pixmap = FAVICON_STORE.pixmap(index.data(HistoryModel.IconRole)) or self.loadingIcon
+        iconRect = QRect(rect.left() + self._margin, rect.top() + (rect.height() - self._iconSize) // 2, self._iconSize, self._iconSize)
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        painter.drawPixmap(iconRect, pixmap)
+
+        textRect = rect.adjusted(self._margin * 2 + self._iconSize, 0, -self._margin, 0)
+        title = option.fontMetrics.elidedText(index.data(Qt.ItemDataRole.DisplayRole) or "", Qt.TextElideMode.ElideRight, textRect.width())
+        painter.setPen(opt.palette.color(QPalette.ColorRole.HighlightedText if selected else QPalette.ColorRole.Text))
+        painter.drawText(textRect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, title)
+        painter.restore()
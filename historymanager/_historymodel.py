@@ -0,0 +1,140 @@
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex
+
+
+class HistoryModel(QAbstractListModel):
+
+    UrlRole = Qt.ItemDataRole.UserRole + 1
+    DateRole = Qt.ItemDataRole.UserRole + 2
+    IconRole = Qt.ItemDataRole.UserRole + 3
+    FrecencyRole = Qt.ItemDataRole.UserRole + 4
+
+    def __init__(self, parent=None, maxEntries=-1):
+        super(HistoryModel, self).__init__(parent)
+
+        # [url, date, title, iconFile, frecency] rows, best ranked first. Views only ask for the (few) visible ones
+        # rows by url, least recently visited first (the one evicted when there are too many)
+        self._entries = []
+        self._urls = {}
+        self.maxEntries = maxEntries
+
+        # number of entries using each icon file
+        self._icons = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._entries)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._entries):
+            return None
+        url, date, title, iconFile, frecency = self._entries[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return title
+        elif role == Qt.ItemDataRole.ToolTipRole or role == self.UrlRole:
+            return url
+        elif role == self.DateRole:
+            return date
+        elif role == self.IconRole:
+            return iconFile
+        elif role == self.FrecencyRole:
+            return frecency
+        return None
+
+    def setEntries(self, entries):
+        # [(url, date, title, iconFile, frecency), ...], best ranked first
+        self.beginResetModel()
+        self._entries = [list(entry) for entry in entries]
+        self._urls = {entry[0]: entry for entry in sorted(self._entries, key=lambda entry: entry[1])}
+        self._icons = {}
+        for entry in self._entries:
+            self._icons[entry[3]] = self._icons.get(entry[3], 0) + 1
+        self.endResetModel()
+
+    def clear(self):
+        self.setEntries([])
+
+    def __contains__(self, url):
+        return url in self._urls
+
+    def hasIcon(self, iconFile):
+        return iconFile in self._icons
+
+    def _addIcon(self, iconFile):
+        self._icons[iconFile] = self._icons.get(iconFile, 0) + 1
+
+    def _removeIcon(self, iconFile):
+        count = self._icons.get(iconFile, 0) - 1
+        if count > 0:
+            self._icons[iconFile] = count
+        else:
+            self._icons.pop(iconFile, None)
+
+    def _position(self, frecency):
+        # row in which an entry with given frecency must be (rows are kept sorted, so no need to sort them again)
+        low, high = 0, len(self._entries)
+        while low < high:
+            middle = (low + high) // 2
+            if self._entries[middle][4] >= frecency:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _row(self, entry):
+        # rows are sorted by frecency, so the entry is found by a binary search (among the ones with its same frecency)
+        row = self._position(entry[4]) - 1
+        while row >= 0 and self._entries[row][4] == entry[4]:
+            if self._entries[row] is entry:
+                return row
+            row -= 1
+        # not sorted by frecency (e.g. search results, ranked by relevance), but they are just a few
+        return next(row for row, item in enumerate(self._entries) if item is entry)
+
+    def addEntry(self, url, date, title, iconFile, frecency):
+        # entries are placed (or moved, if already existing) according to their new frecency
+        entry = self._urls.pop(url, None)
+        if entry is not None:
+            # it's just been visited: now it's the most recently visited one
+            self._urls[url] = entry
+            row = self._row(entry)
+            del self._entries[row]
+            target = self._position(frecency)
+            self._entries.insert(row, entry)
+            if target != row and self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), target if target < row else target + 1):
+                del self._entries[row]
+                self._entries.insert(target, entry)
+                self.endMoveRows()
+            else:
+                target = row
+            self._removeIcon(entry[3])
+            self._addIcon(iconFile)
+            entry[1:] = [date, title, iconFile, frecency]
+            self.dataChanged.emit(self.index(target), self.index(target))
+            return False
+
+        row = self._position(frecency)
+        self.beginInsertRows(QModelIndex(), row, row)
+        entry = [url, date, title, iconFile, frecency]
+        self._entries.insert(row, entry)
+        self._urls[url] = entry
+        self._addIcon(iconFile)
+        self.endInsertRows()
+
+        if 0 <= self.maxEntries < len(self._entries):
+            # same entry the store evicts: the least recently visited one, not the worst ranked
+            self.removeEntry(next(iter(self._urls)))
+        return True
+
+    def removeEntry(self, url):
+        entry = self._urls.pop(url, None)
+        if entry is not None:
+            row = self._row(entry)
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._entries[row]
+            self._removeIcon(entry[3])
+            self.endRemoveRows()
+        return entry is not None
+
+    def iconChanged(self, iconFile):
+        # repaint rows showing given icon: views just repaint their (few) visible rows, so there's no need to look for them
+        if iconFile in self._icons:
+            self.dataChanged.emit(self.index(0), self.index(len(self._entries) - 1), [self.IconRole])
@@ -0,0 +1,244 @@
+import contextlib
+import math
+import re
+import sqlite3
+
+
+class HistoryStore:
+
+    _version = 4
+    _words = re.compile(r"\w+")
+
+    def __init__(self, path, maxEntries=-1, halfLife=30 * 86400):
+
+        # one row per URL, written as soon as it is visited (no need to save whole history on exit)
+        # WAL journal allows several windows (connections) reading while one is writing, and makes small writes cheap
+        self.path = path
+        self._conn = sqlite3.connect(path, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=2000")
+
+        # frecency: visits weighted by how recent they are (weight halves every halfLife seconds)
+        self.decay = math.log(2) / halfLife
+        self._conn.create_function("frecency", 3, self.frecency, deterministic=True)
+
+        self.fullTextSearch = False
+        self._createTables()
+
+        # once maxEntries is reached (-1 = no limit), each new entry evicts the least recently visited one
+        self.maxEntries = maxEntries
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        # connection is in autocommit mode: group statements which must be applied together (or are many)
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._conn
+        except:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _createTables(self):
+        with self._transaction():
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS history (
+                                      url TEXT PRIMARY KEY,
+                                      title TEXT NOT NULL,
+                                      icon TEXT NOT NULL DEFAULT '',
+                                      date REAL NOT NULL,
+                                      visits INTEGER NOT NULL DEFAULT 1)""")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS history_date ON history (date)")
+            self._createFrecency()
+            self.fullTextSearch = self._createSearchIndex()
+            self._createCounters()
+            self._conn.execute(f"PRAGMA user_version={self._version}")
+
+    def _createFrecency(self):
+        # score of an entry is the sum of w * exp(-decay * (now - visit date)) for all its visits. It's stored as
+        # the date F in which that sum would be 1: score(now) = exp(decay * (F - now)). So the order of entries
+        # never changes as time goes by (no need to recompute anything), and a new visit only updates its entry:
+        #   F = now + ln(exp(decay * (F - now)) + w) / decay
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(history)")]
+        if "frecency" not in columns:
+            self._conn.execute("ALTER TABLE history ADD COLUMN frecency REAL NOT NULL DEFAULT 0")
+            # entries stored before: all their visits are assumed to be as recent as the last one
+            self._conn.execute("UPDATE history SET frecency = frecency(0, date, visits)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS history_frecency ON history (frecency)")
+
+    def frecency(self, frecency, now, weight=1.0):
+        return now + math.log(math.exp(self.decay * (frecency - now)) + weight) / self.decay
+
+    def _createCounters(self):
+        # number of entries and references to each icon (favicon store key), kept by triggers, so evicting entries
+        # and finding icons not used anymore never requires scanning the whole history
+        exists = self._conn.execute("SELECT 1 FROM sqlite_master WHERE name='history_icons'").fetchone() is not None
+        self._conn.execute("CREATE TABLE IF NOT EXISTS history_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS history_icons (icon TEXT PRIMARY KEY, refs INTEGER NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS history_icons_unused ON history_icons (icon) WHERE refs <= 0")
+        self._conn.execute("""CREATE TRIGGER IF NOT EXISTS history_count_insert AFTER INSERT ON history BEGIN
+                                  UPDATE history_meta SET value = value + 1 WHERE key = 'count';
+                                  INSERT INTO history_icons (icon, refs) VALUES (new.icon, 1)
+                                      ON CONFLICT (icon) DO UPDATE SET refs = refs + 1;
+                              END""")
+        self._conn.execute("""CREATE TRIGGER IF NOT EXISTS history_count_delete AFTER DELETE ON history BEGIN
+                                  UPDATE history_meta SET value = value - 1 WHERE key = 'count';
+                                  UPDATE history_icons SET refs = refs - 1 WHERE icon = old.icon;
+                              END""")
+        self._conn.execute("""CREATE TRIGGER IF NOT EXISTS history_icons_update AFTER UPDATE OF icon ON history
+                              WHEN old.icon IS NOT new.icon BEGIN
+                                  UPDATE history_icons SET refs = refs - 1 WHERE icon = old.icon;
+                                  INSERT INTO history_icons (icon, refs) VALUES (new.icon, 1)
+                                      ON CONFLICT (icon) DO UPDATE SET refs = refs + 1;
+                              END""")
+        if not exists:
+            # count entries stored before counters were available (only once)
+            self._conn.execute("INSERT OR REPLACE INTO history_meta (key, value) VALUES ('count', (SELECT COUNT(*) FROM history))")
+            self._conn.execute("INSERT INTO history_icons (icon, refs) SELECT icon, COUNT(*) FROM history GROUP BY icon")
+
+    def _createSearchIndex(self):
+        # full-text index of titles and URLs, kept in sync with history table by triggers
+        # (prefix indexes make as-you-type queries of 1-3 characters as fast as full words)
+        # if SQLite was built without FTS5, search falls back to (slower) LIKE queries
+        # index refers to history rowids, so history table must not be VACUUMed (it would renumber them)
+        exists = self._conn.execute("SELECT 1 FROM sqlite_master WHERE name='history_fts'").fetchone() is not None
+        try:
+            self._conn.execute("""CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5 (
+                                      title, url, content='history', content_rowid='rowid',
+                                      tokenize='unicode61 remove_diacritics 2', prefix='1 2 3')""")
+        except sqlite3.OperationalError:
+            return False
+        self._conn.execute("""CREATE TRIGGER IF NOT EXISTS history_fts_insert AFTER INSERT ON history BEGIN
+                                  INSERT INTO history_fts (rowid, title, url) VALUES (new.rowid, new.title, new.url);
+                              END""")
+        self._conn.execute("""CREATE TRIGGER IF NOT EXISTS history_fts_delete AFTER DELETE ON history BEGIN
+                                  INSERT INTO history_fts (history_fts, rowid, title, url) VALUES ('delete', old.rowid, old.title, old.url);
+                              END""")
+        # visits update date (and title, most times unchanged): only reindex if title actually changes
+        self._conn.execute("""CREATE TRIGGER IF NOT EXISTS history_fts_update AFTER UPDATE OF title, url ON history
+                              WHEN old.title IS NOT new.title OR old.url IS NOT new.url BEGIN
+                                  INSERT INTO history_fts (history_fts, rowid, title, url) VALUES ('delete', old.rowid, old.title, old.url);
+                                  INSERT INTO history_fts (rowid, title, url) VALUES (new.rowid, new.title, new.url);
+                              END""")
+        if not exists:
+            # index entries stored before search was available
+            self._conn.execute("INSERT INTO history_fts (history_fts) VALUES ('rebuild')")
+        return True
+
+    def close(self):
+        if self._conn is not None:
+            try:
+                self._conn.execute("PRAGMA optimize")
+                self._conn.close()
+            except:
+                pass
+            self._conn = None
+
+    def __len__(self):
+        return self._conn.execute("SELECT value FROM history_meta WHERE key = 'count'").fetchone()[0]
+
+    def __contains__(self, url):
+        return self._conn.execute("SELECT 1 FROM history WHERE url=?", (url,)).fetchone() is not None
+
+    def addVisit(self, url, title, icon, date, weight=1.0):
+        # returns True if it is a new entry, False if an existing one has been updated
+        with self._transaction():
+            cursor = self._conn.execute("UPDATE history SET title=?, icon=?, date=?, visits=visits+1, frecency=frecency(frecency, ?, ?) "
+                                        "WHERE url=?", (title, icon, float(date), float(date), weight, url))
+            if cursor.rowcount:
+                return False
+            self._conn.execute("INSERT INTO history (url, title, icon, date, frecency) VALUES (?, ?, ?, ?, ?)",
+                               (url, title, icon, float(date), self.frecency(0, float(date), weight)))
+            if self.maxEntries >= 0:
+                self._evict(self.maxEntries)
+            return True
+
+    def update(self, url, title=None, icon=None):
+        self._conn.execute("UPDATE history SET title=COALESCE(?, title), icon=COALESCE(?, icon) WHERE url=?",
+                           (title, icon, url))
+
+    def delete(self, url):
+        # returns True if the entry existed
+        return self._conn.execute("DELETE FROM history WHERE url=?", (url,)).rowcount > 0
+
+    def clear(self):
+        self._conn.execute("DELETE FROM history")
+
+    def _evict(self, maxEntries):
+        # delete least recently visited entries beyond maxEntries, walking date index from its oldest end
+        excess = len(self) - maxEntries
+        if excess <= 0:
+            return 0
+        return self._conn.execute("DELETE FROM history WHERE rowid IN (SELECT rowid FROM history ORDER BY date LIMIT ?)",
+                                  (excess,)).rowcount
+
+    def get(self, url):
+        row = self._conn.execute("SELECT date, title, icon, frecency, visits FROM history WHERE url=?", (url,)).fetchone()
+        return None if row is None else {"date": row[0], "title": row[1], "icon": row[2], "frecency": row[3], "visits": row[4]}
+
+    def entries(self, limit=-1):
+        # (url, date, title, icon, frecency), best ranked first (uses frecency index, so only the requested rows are read)
+        return self._conn.execute("SELECT url, date, title, icon, frecency FROM history ORDER BY frecency DESC LIMIT ?",
+                                  (limit,)).fetchall()
+
+    def suggest(self, text, limit=8):
+        # (url, date, title, icon, frecency) of best ranked entries containing given text in URL or title, e.g. for the
+        # urlbar. Frecency index is walked from the top until enough entries match, so there is no sorting at all
+        text = text.strip().lower()
+        if not text:
+            return []
+        pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        return self._conn.execute("SELECT url, date, title, icon, frecency FROM history INDEXED BY history_frecency "
+                                  "WHERE url LIKE ? ESCAPE '\\' OR title LIKE ? ESCAPE '\\' ORDER BY frecency DESC LIMIT ?",
+                                  (pattern, pattern, limit)).fetchall()
+
+    def search(self, text, limit=50):
+        # (url, date, title, icon, frecency) of entries matching all words in text (last one may be incomplete, as the
+        # user types) ranked by relevance (title matches weight more than URL ones), then by frecency
+        words = self._words.findall(text.lower())
+        if not words:
+            return []
+        if self.fullTextSearch:
+            # all matching entries are ranked (not just the newest ones), so old but often visited pages are found too
+            query = " ".join('"%s"*' % word for word in words)
+            return self._conn.execute("""SELECT history.url, history.date, history.title, history.icon, history.frecency
+                                          FROM history_fts JOIN history ON history.rowid = history_fts.rowid
+                                          WHERE history_fts MATCH ?
+                                          ORDER BY bm25(history_fts, 5.0, 1.0), history.frecency DESC LIMIT ?""",
+                                       (query, limit)).fetchall()
+        conditions = " AND ".join(["(title LIKE ? ESCAPE '\\' OR url LIKE ? ESCAPE '\\')"] * len(words))
+        params = []
+        for word in words:
+            pattern = "%" + word.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            params += [pattern, pattern]
+        return self._conn.execute(f"SELECT url, date, title, icon, frecency FROM history INDEXED BY history_frecency "
+                                  f"WHERE {conditions} ORDER BY frecency DESC LIMIT ?",
+                                  params + [limit]).fetchall()
+
+    def unusedIcons(self):
+        # icons not referenced by any entry anymore
+        return [row[0] for row in self._conn.execute("SELECT icon FROM history_icons WHERE refs <= 0")]
+
+    def forgetIcons(self, icons):
+        # once they are deleted (only if they have not been referenced again in between)
+        with self._transaction():
+            self._conn.executemany("DELETE FROM history_icons WHERE icon = ? AND refs <= 0", [(icon,) for icon in icons])
+
+    def prune(self, maxEntries):
+        # keep the most recent entries only. Returns the number of deleted entries
+        with self._transaction():
+            return self._evict(maxEntries)
+
+    def importEntries(self, values):
+        # bulk insert of {url: {"date": ..., "title": ..., "icon": ...}} (existing entries are kept if more recent)
+        rows = []
+        for url, item in values.items():
+            try:
+                rows.append((url, str(item["title"]), str(item.get("icon", "")), float(item["date"])))
+            except:
+                pass
+        with self._transaction():
+            self._conn.executemany("""INSERT INTO history (url, title, icon, date, frecency) VALUES (?, ?, ?, ?, ?4)
+                                      ON CONFLICT (url) DO UPDATE SET title=excluded.title, icon=excluded.icon, date=excluded.date,
+                                      frecency=excluded.frecency WHERE excluded.date > history.date""", rows)
+        return len(rows)
@@ -1,19 +1,18 @@
-import os.path
 import time
 
-from PyQt6 import sip
-from PyQt6.QtCore import Qt, QUrl, pyqtSignal, QSize, pyqtSlot
+from PyQt6.QtCore import Qt, QUrl, pyqtSignal, QTimer
 from PyQt6.QtGui import QPixmap, QAction
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QGridLayout, QPushButton, QCheckBox, QScrollArea, QMenu, QStyle
+from PyQt6.QtWidgets import QWidget, QLabel, QGridLayout, QPushButton, QCheckBox, QMenu, QStyle, QLineEdit, QListView, QAbstractItemView
 
 from settings import DefaultSettings, Settings
 from themes import Themes
+from ._historydelegate import HistoryDelegate
+from ._historymodel import HistoryModel
 
 
 class HistoryWidget(QWidget):
 
     eraseHistorySig = pyqtSignal()
-    widgetClickedSig = pyqtSignal(Qt.MouseButton, QWidget)
 
     def __init__(self, parent=None, settings=None, history_manager=None, dialog_manager=None, loadUrlSig=None):
         super(HistoryWidget, self).__init__(parent)
@@ -31,20 +30,25 @@ class HistoryWidget(QWidget):
         self.setObjectName("main")
         self.setContentsMargins(0, 0, 0, 0)
 
-        self.content_widget = QWidget()
-        self.content_widget.setObjectName("content")
-        self.setContentsMargins(0, 0, 0, 0)
-
-        self.content_layout = QVBoxLayout(self.content_widget)
-        self.content_layout.setContentsMargins(5, 3, 0, 0)
-        self.content_layout.setSpacing(3)
-        self.content_layout.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignVCenter)
+        # history entries (and search results) are rows of a model: only visible ones are painted by the delegate
+        self.model = HistoryModel(self, DefaultSettings.History.historySize)
+        self.resultsModel = HistoryModel(self)
+        self.loading_ico = QPixmap(DefaultSettings.Icons.loading).scaled(24, 24, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+        self.delegate = HistoryDelegate(self, self.loading_ico)
 
-        self.scroll = QScrollArea()
-        self.scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        self.scroll.setContentsMargins(0, 0, 0, 0)
-        self.scroll.setWidgetResizable(True)
-        self.scroll.setWidget(self.content_widget)
+        self.content_widget = QListView()
+        self.content_widget.setObjectName("content")
+        self.content_widget.setContentsMargins(0, 0, 0, 0)
+        self.content_widget.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.content_widget.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.content_widget.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.content_widget.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.content_widget.setUniformItemSizes(True)
+        self.content_widget.setSpacing(1)
+        self.content_widget.setMouseTracking(True)
+        self.content_widget.setItemDelegate(self.delegate)
+        self.content_widget.setModel(self.model)
+        self.content_widget.clicked.connect(self.onEntryClicked)
 
         self.mainLayout = QGridLayout()
         self.mainLayout.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
@@ -54,7 +58,7 @@ class HistoryWidget(QWidget):
 
         self.init_widget = QWidget()
         self.init_widget.setObjectName("init_widget")
-        self.init_widget.setFixedSize(480, 64)
+        self.init_widget.setFixedSize(480, 96)
         init_layout = QGridLayout()
         self.init_widget.setLayout(init_layout)
 
@@ -67,32 +71,44 @@ class HistoryWidget(QWidget):
         self.historyEmpty = "No history available yet..."
         self.historyDisabled = "History is disabled"
         self.historyText = "Places visited so far"
+        self.historyNoMatches = "No matches found"
+        self.historyMatches = "Best matches"
 
-        text = self.historyEmpty if self._settings.enableHistory else self.historyDisabled
-
-        self.init_label = QLabel(text)
+        self.init_label = QLabel()
         self.init_label.setFixedSize(200, 40)
         self.init_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.init_label.setContentsMargins(0, 0, 0, 0)
-        # self.init_label.setFixedSize(self._item_width, self._item_height)
         init_layout.addWidget(self.init_label, 0, 1)
 
         self.eraseHistory_btn = QPushButton("Erase History")
         self.eraseHistory_btn.clicked.connect(self.eraseHistoryRequest)
         init_layout.addWidget(self.eraseHistory_btn, 0, 2)
 
+        # search box: best matches are shown instead of the whole history as the user types
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("Search history")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.setVisible(self._settings.enableHistory)
+        self.search_box.textChanged.connect(self.onSearchTextChanged)
+        init_layout.addWidget(self.search_box, 1, 0, 1, 3)
+
+        self.searchTimer = QTimer()
+        self.searchTimer.setSingleShot(True)
+        self.searchTimer.setInterval(DefaultSettings.History.searchDelay)
+        self.searchTimer.timeout.connect(self.searchHistory)
+
         init_layout.setColumnStretch(0, 0)
         init_layout.setColumnStretch(1, 1)
         init_layout.setColumnStretch(2, 0)
 
         self.mainLayout.addWidget(self.init_widget, 0, 0)
-        self.mainLayout.addWidget(self.scroll, 1, 0)
+        self.mainLayout.addWidget(self.content_widget, 1, 0)
 
         self.mainLayout.setRowStretch(0, 0)
         self.mainLayout.setRowStretch(1, 1)
 
         # creating a context menu to delete history entry
-        self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.content_widget.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.entryContextMenu = QMenu(self)
         self.entryContextMenu.setMinimumHeight(40)
         self.entryContextMenu.setContentsMargins(0, 5, 0, 0)
@@ -103,108 +119,54 @@ class HistoryWidget(QWidget):
         self.entryContextMenu.addAction(self.delete_action)
 
         self.delete_action.triggered.connect(self.deleteHistoryEntry)
-        self.customContextMenuRequested.connect(self.showContextMenu)
-        self.widgetClickedSig.connect(self.onWidgetClicked)
-        self.clickedWidget = None
+        self.content_widget.customContextMenuRequested.connect(self.showContextMenu)
+        self.clickedUrl = None
         self.eraseHistorySig.connect(self.eraseHistory)
 
-        self.titles = {}
-        self.urls = {}
-        self.pendingIcons = {}
-        self.loading_ico = QPixmap(DefaultSettings.Icons.loading).scaled(24, 24, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+        # stored entries are loaded at once (no need to store them again)
+        self.model.setEntries((url, item["date"], item["title"], item["icon"], item["frecency"])
+                              for url, item in self.history_manager.history.items())
+        self.updateLabel()
 
-        urls = list(self.history_manager.history.keys())
-        for url in urls:
-            date = self.history_manager.history[url]["date"]
-            title = self.history_manager.history[url]["title"]
-            icon = self.history_manager.history[url]["icon"]
-            self.addHistoryEntry([date, title, url, icon])
+    def updateLabel(self):
+        if not self._settings.enableHistory:
+            text = self.historyDisabled
+        elif self.content_widget.model() is self.resultsModel:
+            text = self.historyMatches if self.resultsModel.rowCount() else self.historyNoMatches
+        else:
+            text = self.historyText if self.model.rowCount() else self.historyEmpty
+        self.init_label.setText(text)
 
     def addHistoryEntry(self, entry):
-
         date, title, url, iconFile = entry
-
-        if url in self.urls.keys():
-            old_entry = self.urls[url]["entryText"]
-            self.clickedWidget = old_entry.parent()
-            self.deleteHistoryEntry(False, url)
-
-        if title not in self.titles.keys():
-
-            self.init_label.setText(self.historyText if self._settings.enableHistory else self.historyDisabled)
-
-            widget = Widget(self, self.widgetClickedSig)
-            widget.setObjectName("item")
-            widget.setAccessibleName(str(date))
-            widget.setContentsMargins(5, 0, 0, 0)
-            widget.setFixedSize(460, 32)
-            layout = QGridLayout()
-            layout.setContentsMargins(0, 0, 0, 0)
-            layout.setSpacing(0)
-            layout.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
-
-            entryIcon = QLabel()
-            entryIcon.setObjectName("entryIcon")
-            entryIcon.setFixedSize(24, 24)
-            entryIcon.setAccessibleName(iconFile)
-            icon = os.path.join(self.history_manager.historyFolder, iconFile)
-            if not os.path.exists(icon):
-                entryIcon.setPixmap(self.loading_ico)
-                if iconFile in self.pendingIcons.keys():
-                    self.pendingIcons[iconFile] += [entryIcon]
-                else:
-                    self.pendingIcons[iconFile] = [entryIcon]
-            else:
-                entryIcon.setPixmap(QPixmap(icon))
-            layout.addWidget(entryIcon, 0, 0)
-
-            entryText = QLabel()
-            entryText.setObjectName("entryText")
-            entryText.setContentsMargins(5, 0, 0, 0)
-            entryText.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
-            entryText.setFixedSize(400, 32)
-            entryText.setText(title)
-            entryText.setToolTip(url)
-            layout.addWidget(entryText, 0, 1)
-
-            layout.setColumnStretch(1, 0)
-            layout.setColumnStretch(1, 1)
-
-            widget.setLayout(layout)
-            self.content_layout.insertWidget(0, widget)
-
-            self.update()
-            if self.isVisible():
-                self.hide()
-                self.show()
-
-            item = [time.time(), title, url, iconFile]
-            self.history_manager.addHistoryEntry(item)
-
-            self.titles[title] = {
-                "entryText": entryText,
-                "url": url
-            }
-            self.urls[url] = {
-                "entryText": entryText,
-                "title": title
-            }
-
-    def updateEntryIcon(self, icon, iconPath):
-        iconFile = os.path.basename(iconPath)
-        entryIcons = self.pendingIcons.get(iconFile, [])
-        if entryIcons:
-            pixmap = icon.pixmap(QSize(16, 16))
-            if not os.path.exists(iconPath):
-                pixmap.save(iconPath, "PNG")
-            for entryIcon in entryIcons:
-                if not sip.isdeleted(entryIcon):
-                    entryIcon.setPixmap(QPixmap(pixmap))
-            del self.pendingIcons[iconFile]
-            self.update()
-            if self.isVisible():
-                self.hide()
-                self.show()
+        if not url or not title:
+            return
+        date = time.time()
+        # entry is ranked by its frecency, as updated by this visit
+        self.history_manager.addHistoryEntry([date, title, url, iconFile])
+        self.model.addEntry(url, date, title, iconFile, self.history_manager.frecency(url))
+        self.updateLabel()
+
+    def updateEntryIcon(self, iconFile):
+        # icon has been stored (or replaced): repaint entries using it
+        if self.model.hasIcon(iconFile):
+            self.model.iconChanged(iconFile)
+        if self.resultsModel.hasIcon(iconFile):
+            self.resultsModel.iconChanged(iconFile)
+
+    def onSearchTextChanged(self, text):
+        # wait for the user to stop typing (results of intermediate keystrokes would be discarded anyway)
+        self.searchTimer.start()
+
+    def searchHistory(self):
+        text = self.search_box.text().strip()
+        if text:
+            self.resultsModel.setEntries(self.history_manager.searchHistory(text, DefaultSettings.History.searchResults))
+            self.content_widget.setModel(self.resultsModel)
+        else:
+            self.content_widget.setModel(self.model)
+            self.resultsModel.clear()
+        self.updateLabel()
 
     def eraseHistoryRequest(self):
         dialog = self.dialog_manager.createDialog(
@@ -214,41 +176,25 @@ class HistoryWidget(QWidget):
 
     def eraseHistory(self):
         self.history_manager.deleteAllHistory()
-        self.pendingIcons = {}
-        for i in range(0, self.content_layout.count()):
-            w = self.content_layout.itemAt(i).widget()
-            w.deleteLater()
-
-    @pyqtSlot(Qt.MouseButton, QWidget)
-    def onWidgetClicked(self, button, widget):
-        self.clickedWidget = None
-        if button == Qt.MouseButton.LeftButton:
-            # load URL stored in history entry
-            url = widget.layout().itemAt(1).widget().toolTip()
-            if url:
-                self.load_url_sig.emit(QUrl(url))
-
-        elif button == Qt.MouseButton.RightButton:
-            # save clicked widget in case user selects "delete entry" in context menu
-            self.clickedWidget = widget
+        self.search_box.clear()
+        self.model.clear()
+        self.resultsModel.clear()
+        self.updateLabel()
+
+    def onEntryClicked(self, index):
+        # load URL stored in history entry
+        url = index.data(HistoryModel.UrlRole)
+        if url:
+            self.load_url_sig.emit(QUrl(url))
 
     def deleteHistoryEntry(self, checked, url=None):
-        if url is None and self.clickedWidget is not None:
-            url = self.clickedWidget.layout().itemAt(1).widget().toolTip()
+        url = url or self.clickedUrl
+        self.clickedUrl = None
         if url:
             self.history_manager.deleteHistoryEntryByUrl(url)
-            if url in self.urls.keys():
-                title = self.urls[url]["title"]
-                del self.urls[url]
-                if title in self.titles.keys():
-                    del self.titles[title]
-        if self.clickedWidget is not None:
-            self.clickedWidget.deleteLater()
-            self.clickedWidget = None
-            self.update()
-            if self.isVisible():
-                self.hide()
-                self.show()
+            self.model.removeEntry(url)
+            self.resultsModel.removeEntry(url)
+            self.updateLabel()
 
     def loadHistoryEntry(self, url):
         self.load_url_sig.emit(QUrl(url))
@@ -258,34 +204,17 @@ class HistoryWidget(QWidget):
         self.toggle_chk.setChecked(enabled)
         self.toggle_chk.setText("Disable History" if enabled else "Enable History")
         self._settings.setEnableHistory(enabled, persistent=True)
-        widgets_count = self.content_layout.count()
+        self.search_box.setVisible(enabled)
         if enabled:
-            self.scroll.show()
             self.content_widget.show()
-            if widgets_count > 1:
-                self.init_label.setText(self.historyText)
-            else:
-                self.init_label.setText(self.historyEmpty)
         else:
-            self.scroll.hide()
+            self.search_box.clear()
             self.content_widget.hide()
-            self.init_label.setText(self.historyDisabled)
+        self.updateLabel()
 
     def showContextMenu(self, point):
-        if self.clickedWidget is not None and self.clickedWidget.underMouse():
-            self.entryContextMenu.exec(self.mapToGlobal(point))
-
-
-class Widget(QWidget):
-
-    def __init__(self, parent=None, clickedSig=None):
-        super(Widget, self).__init__(parent)
-
-        self.clickedSig = clickedSig
-
-    def mousePressEvent(self, a0):
-        pass
-
-    def mouseReleaseEvent(self, a0):
-        self.clickedSig.emit(a0.button(), self)
-
+        # save clicked entry in case user selects "delete entry" in context menu
+        index = self.content_widget.indexAt(point)
+        if index.isValid():
+            self.clickedUrl = index.data(HistoryModel.UrlRole)
+            self.entryContextMenu.exec(self.content_widget.viewport().mapToGlobal(point))
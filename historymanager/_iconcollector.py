@@ -0,0 +1,31 @@
+from PyQt6.QtCore import QThread
+
+from logger import LOGGER, LoggerSettings
+from ._historystore import HistoryStore
+
+
+class IconCollector(QThread):
+
+    def __init__(self, db_path):
+        super().__init__()
+
+        # icons no entry refers to anymore are forgotten in background (it may take a while with a big history)
+        # using its own database connection (they can't be shared between threads)
+        self.dbPath = db_path
+
+    def run(self):
+
+        try:
+            store = HistoryStore(self.dbPath)
+        except:
+            LOGGER.write(LoggerSettings.LogLevels.warning, "History", "Icons could not be collected")
+            return
+
+        try:
+            unused = store.unusedIcons()
+            store.forgetIcons(unused)
+            if unused:
+                LOGGER.write(LoggerSettings.LogLevels.info, "History", f"Unused icons forgotten: {len(unused)}")
+        except:
+            LOGGER.write(LoggerSettings.LogLevels.warning, "History", "Icons could not be collected")
+        store.close()
@@ -1,2 +1,5 @@
+from ._flightrecorder import FlightRecorder
 from ._logger_settings import LoggerSettings
 from ._logger import LOGGER
+from ._logreader import LogReader
+from ._logsink import AsyncLogSink
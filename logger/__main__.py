@@ -0,0 +1,43 @@
+# Read and filter log files (structured or plain, rotated and gzipped segments included):
+#   python -m logger .logs --level warning error --origin RequestInterceptor --grep "AD Blocked" --since 2025-01-01T10:00
+import argparse
+import json
+import sys
+
+from ._logger_settings import LoggerSettings
+from ._logreader import LogReader
+
+
+def main(args):
+
+    parser = argparse.ArgumentParser(prog="python -m logger", description="Read and filter Coward log files")
+    parser.add_argument("paths", nargs="*", default=[LoggerSettings.loggerFolder], help="log files or folders (default: %(default)s)")
+    parser.add_argument("--level", nargs="+", choices=[level.name for level in LoggerSettings.LogLevels], help="levels to show")
+    parser.add_argument("--origin", nargs="+", help="origins to show (e.g. Main RequestInterceptor JavaScriptConsole)")
+    parser.add_argument("--thread", help="thread name to show")
+    parser.add_argument("--grep", help="text to find in messages (case insensitive)")
+    parser.add_argument("--since", help="first timestamp to show (e.g. 2025-01-01T10:00)")
+    parser.add_argument("--until", help="last timestamp to show")
+    parser.add_argument("--json", action="store_true", help="output records as JSON lines")
+    parser.add_argument("--count", action="store_true", help="only show the number of matching records by level and origin")
+    options = parser.parse_args(args)
+
+    records = LogReader(options.paths).filter(options.level, options.origin, options.grep, options.since, options.until, options.thread)
+    try:
+        if options.count:
+            counts = {}
+            for record in records:
+                key = (record.get("level", ""), record.get("origin", ""))
+                counts[key] = counts.get(key, 0) + 1
+            for (level, origin), count in sorted(counts.items(), key=lambda item: -item[1]):
+                print(f"{count:>10}  {level:<8} {origin}")
+        else:
+            for record in records:
+                print(json.dumps(record, ensure_ascii=False) if options.json else LogReader.formatRecord(record))
+    except BrokenPipeError:
+        # output piped to a command which stopped reading (e.g. head)
+        pass
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
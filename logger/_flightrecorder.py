@@ -0,0 +1,80 @@
+import itertools
+import json
+import threading
+import time
+
+# bound once: record() is called for every event
+_time = time.time
+_getIdent = threading.get_ident
+# args of these types can't change (nor keep other objects alive) until dumped, so they are formatted then
+_immutableTypes = frozenset((str, int, float, bool, bytes, type(None)))
+
+
+class FlightRecorder:
+
+    def __init__(self, size=2048):
+
+        # fixed-size ring buffer of the most recent events (all levels, no matter if debug is enabled or not)
+        # slots are preallocated and plain messages are not formatted until dumped, so recording an event is very cheap
+        self.size = size
+        self._slots = [None] * size
+        self._counter = itertools.count()
+        self._next = self._counter.__next__
+
+    def __len__(self):
+        return sum(1 for slot in self._slots if slot is not None)
+
+    def record(self, error_level, origin, message, args=()):
+        # lazy messages (callables) and mutable args are formatted right now: dumps must show the state when the event
+        # happened, and recorded events must not keep Qt objects alive (or refer to already deleted ones)
+        if callable(message):
+            message, args = self.formatMessage(message, args), ()
+        else:
+            for arg in args:
+                if type(arg) not in _immutableTypes:
+                    message, args = self.formatMessage(message, args), ()
+                    break
+        # itertools.count is atomic, so events from different threads never share a slot
+        sequence = self._next()
+        self._slots[sequence % self.size] = (sequence, _time(), error_level, origin, message, args, _getIdent())
+
+    def clear(self):
+        self._slots = [None] * self.size
+
+    def events(self):
+        # recorded events, oldest first
+        return sorted((slot for slot in list(self._slots) if slot is not None), key=lambda slot: slot[0])
+
+    @staticmethod
+    def formatMessage(message, args):
+        try:
+            if callable(message):
+                return str(message(*args))
+            return str(message % args) if args else str(message)
+        except Exception as e:
+            return f"{message!r} {args!r} (could not be formatted: {e})"
+
+    def dump(self, path, reason=""):
+
+        # same format as structured log files, so dumps can be read with: python -m logger path/to/dump
+        threadNames = {thread.ident: thread.name for thread in threading.enumerate()}
+        lines = []
+        for sequence, timestamp, error_level, origin, message, args, thread in self.events():
+            lines.append(json.dumps({
+                "level": error_level.name,
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(timestamp)) + ".%03d" % int(timestamp % 1 * 1000),
+                "origin": origin,
+                "thread": threadNames.get(thread, str(thread)),
+                "message": self.formatMessage(message, args)
+            }, ensure_ascii=False))
+        now = time.time()
+        lines.append(json.dumps({
+            "level": "fatal",
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(now)) + ".%03d" % int(now % 1 * 1000),
+            "origin": "FlightRecorder",
+            "thread": threading.current_thread().name,
+            "message": f"Flight recorder dumped ({len(lines)} events): {reason}"
+        }, ensure_ascii=False))
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return len(lines) - 1
@@ -10,8 +10,17 @@ class LoggerSettings:
         fatal = "[FATAL]"
 
     debugEnabled = False        # print application messages and JavaScriptConsoleMessages
+    minLevel = LogLevels.info   # lowest level of messages to print (requires debug enabled)
     javaConsoleEnabled = True   # print messages for java console (requires debug enabled)
     requestInterceptorEnabled = True   # print messages from request interceptor (requires debug enabled)
     loggingEnabled = False      # log messages to file instead of printing them (requires debug enabled)
     loggerFolder = ".logs"      # logs folder will be placed next to coward script/exe to facilitate to find them
-    logDepth = 1                # max number of old log files to keep (-1 = infinite)
+    logDepth = 1                # max number of old log files (including their rotated segments) to keep (-1 = infinite)
+    logMaxSize = 10 * 1024 * 1024   # max size in bytes of log file before rotating it (0 = no rotation)
+    logMaxSegments = 5          # max number of rotated segments to keep for current log file (-1 = infinite)
+    compressLogs = True         # compress rotated segments (gzip)
+    structuredLogs = True       # write log files as JSON lines (level, origin, timestamp, thread, message). See: python -m logger -h
+    flightRecorderSize = 2048   # number of recent events (all levels, even if debug is disabled) kept in memory to dump on crash (0 = disabled)
+    flightRecorderDumps = 5     # max number of flight recorder dumps (crash-*.jsonl files) to keep in logs folder
+    flushInterval = 0.5         # max time in seconds pending messages wait before being written to log file
+    flushSize = 64 * 1024       # max size in characters of pending messages before they are written to log file
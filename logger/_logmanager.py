@@ -1,24 +1,42 @@
 import os
 import time
 
+from ._flightrecorder import FlightRecorder
 from ._logger_settings import LoggerSettings
+from ._logsink import AsyncLogSink
 
 
 class LoggerManager:
 
+    _levelRanks = {
+        LoggerSettings.LogLevels.info: 0,
+        LoggerSettings.LogLevels.warning: 1,
+        LoggerSettings.LogLevels.error: 2,
+        LoggerSettings.LogLevels.fatal: 3
+    }
+
     def __init__(self):
 
         self.debugEnabled = LoggerSettings.debugEnabled
         self.javaConsoleMessagesEnabled = LoggerSettings.javaConsoleEnabled
         self.requestInterceptorMessagesEnabled = LoggerSettings.requestInterceptorEnabled
+
+        # enabled levels and origins are checked with a single lookup, before any message formatting
+        # origins not included here are always enabled (if debug is enabled)
+        self.originsEnabled = {
+            "JavaScriptConsole": self.javaConsoleMessagesEnabled,
+            "RequestInterceptor": self.requestInterceptorMessagesEnabled
+        }
+        self.levelsEnabled = set()
+        self.setMinLevel(LoggerSettings.minLevel)
         self.loggingEnabled = LoggerSettings.loggingEnabled
         self.logDepth = LoggerSettings.logDepth
         self.logFolder = LoggerSettings.loggerFolder
+        self.sink = None
 
-        if self.loggingEnabled and not os.path.exists(self.logFolder):
-            os.makedirs(self.logFolder)
+        # recent events are always kept in memory, and only written to disk on crash or on demand
+        self.flightRecorder = FlightRecorder(LoggerSettings.flightRecorderSize) if LoggerSettings.flightRecorderSize > 0 else None
 
-        self.checkFiles(self.logFolder, self.logDepth)
         self.enableLogging(self.loggingEnabled)
 
     def enableDebug(self, enable):
@@ -26,49 +44,113 @@ class LoggerManager:
 
     def enableJavaConsoleMessages(self, enable):
         self.javaConsoleMessagesEnabled = enable
+        self.originsEnabled["JavaScriptConsole"] = enable
 
     def enableRequestInterceptorMessages(self, enable):
         self.requestInterceptorMessagesEnabled = enable
+        self.originsEnabled["RequestInterceptor"] = enable
+
+    def enableOrigin(self, origin, enable):
+        self.originsEnabled[origin] = enable
+
+    def setMinLevel(self, error_level):
+        # messages below this level are discarded
+        self.levelsEnabled = {level for level, rank in self._levelRanks.items() if rank >= self._levelRanks[error_level]}
 
     def enableLogging(self, enable):
 
         self.loggingEnabled = enable
 
+        # pending messages from a previous log file must be written before replacing it
+        if self.sink is not None:
+            self.sink.close()
+            self.sink = None
+
         if self.loggingEnabled:
 
             if not os.path.exists(self.logFolder):
                 os.makedirs(self.logFolder)
+            self.checkFiles(self.logFolder, self.logDepth)
 
             date = time.strftime("%Y%m%d-%H%M%S")
-            self.logFile = os.path.join(self.logFolder, f"log-{date}")
+            self.logFile = os.path.join(self.logFolder, f"log-{date}" + (".jsonl" if LoggerSettings.structuredLogs else ""))
             with open(self.logFile, "w", encoding="utf-8"):
                 pass
+            self.sink = AsyncLogSink(self.logFile, LoggerSettings.flushInterval, LoggerSettings.flushSize,
+                                     LoggerSettings.logMaxSize, LoggerSettings.logMaxSegments,
+                                     LoggerSettings.compressLogs, LoggerSettings.structuredLogs)
 
     def setLogDepth(self, logDepth):
         self.logDepth = logDepth
         self.checkFiles(self.logFolder, self.logDepth)
 
+    def isEnabled(self, error_level, origin):
+        return self.debugEnabled and error_level in self.levelsEnabled and self.originsEnabled.get(origin, True)
+
     def write(self, error_level, origin, message, force=False):
-        msg = error_level.value + time.strftime(" %Y/%m/%d-%H:%M:%S ") + origin + " --- " + message
-        if self.debugEnabled or force:
-            if (origin not in ("JavaScriptConsole", "RequestInterceptor") or
-                    (origin == "JavaScriptConsole" and self.javaConsoleMessagesEnabled) or
-                    (origin == "RequestInterceptor" and self.requestInterceptorMessagesEnabled)):
-                if self.loggingEnabled:
-                    with open(self.logFile, 'a', encoding="utf-8") as file:
-                        file.write(msg + "\n")
-                else:
-                    print(msg)
+        self.log(error_level, origin, message, force=force)
+
+    def log(self, error_level, origin, message, *args, force=False):
+        # message is only formatted if it is going to be written. It can be:
+        #   - a %-style format string, with its args: LOGGER.log(level, origin, "AD Blocked: %s", url)
+        #   - a callable, with its args (if any): LOGGER.log(level, origin, lambda: f"Tabs: {len(tabs)}")
+        if self.flightRecorder is not None:
+            self.flightRecorder.record(error_level, origin, message, args)
+        if not (force or (self.debugEnabled and error_level in self.levelsEnabled)) or not self.originsEnabled.get(origin, True):
+            return
+        if callable(message):
+            message = message(*args)
+        elif args:
+            message = message % args
+
+        if self.sink is not None:
+            # written to file in background, in batches
+            self.sink.write(error_level, origin, message)
+        else:
+            print(error_level.value + time.strftime(" %Y/%m/%d-%H:%M:%S ") + origin + " --- " + message)
+
+    def flush(self):
+        # make sure all pending messages are written to file (e.g. before exiting on an unhandled exception)
+        if self.sink is not None:
+            self.sink.flush()
+
+    def dumpFlightRecorder(self, reason=""):
+        # write recent events to a new file in logs folder. Returns the file path (or None if it failed)
+        if self.flightRecorder is None:
+            return None
+        try:
+            if not os.path.exists(self.logFolder):
+                os.makedirs(self.logFolder)
+            self.checkDumps(self.logFolder, LoggerSettings.flightRecorderDumps - 1)
+            now = time.time()
+            path = os.path.join(self.logFolder, f"crash-{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}{int(now % 1 * 1000):03d}.jsonl")
+            count = self.flightRecorder.dump(path, reason)
+        except:
+            return None
+        self.write(LoggerSettings.LogLevels.info, "Logger", f"{count} recent events dumped to {path}")
+        self.flush()
+        return path
+
+    def checkDumps(self, logFolder, depth):
+        if os.path.isdir(logFolder) and depth >= 0:
+            dumps = sorted((file for file in os.listdir(logFolder) if file.startswith("crash-")), reverse=True)
+            for file in dumps[depth:]:
+                try:
+                    os.remove(os.path.join(logFolder, file))
+                except:
+                    pass
 
     def checkFiles(self, logFolder, logDepth):
 
+        # log files from the same launch (current file and its rotated segments) share the same name prefix
         if os.path.isdir(logFolder):
-            logFiles = list(os.listdir(logFolder))
-            logFiles.sort(reverse=True)
-
-            if len(logFiles) > logDepth >= 0:
-                for file in logFiles[logDepth:]:
-                    try:
-                        os.remove(os.path.join(logFolder, file))
-                    except:
-                        pass
+            logFiles = [file for file in os.listdir(logFolder) if file.startswith("log-")]
+            logs = sorted({file.split(".")[0] for file in logFiles}, reverse=True)
+
+            if len(logs) > logDepth >= 0:
+                for file in logFiles:
+                    if file.split(".")[0] in logs[logDepth:]:
+                        try:
+                            os.remove(os.path.join(logFolder, file))
+                        except:
+                            pass
@@ -0,0 +1,84 @@
+import gzip
+import json
+import os
+import re
+
+
+class LogReader:
+
+    # plain (non-structured) lines: [LEVEL] YYYY/MM/DD-HH:MM:SS origin --- message
+    _plainLine = re.compile(r"^\[(\w+)\] (\d{4})/(\d\d)/(\d\d)-(\d\d:\d\d:\d\d) (.*?) --- (.*)$")
+    _plainLevels = {"INFO": "info", "WARN": "warning", "ERROR": "error", "FATAL": "fatal"}
+
+    def __init__(self, paths):
+
+        # files are read one line at a time, so logs of any size can be filtered without loading them in memory
+        self.paths = self.logFiles(paths)
+
+    @staticmethod
+    def _fileKey(path):
+        # log-<date>.<segment>.jsonl[.gz]: rotated segments (oldest first) come before the current file of the same log
+        parts = os.path.basename(path).split(".")
+        segment = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else float("inf")
+        return parts[0], segment
+
+    @classmethod
+    def logFiles(cls, paths):
+        files = []
+        for path in paths:
+            if os.path.isdir(path):
+                files += [os.path.join(path, file) for file in os.listdir(path) if file.startswith("log-")]
+            else:
+                files.append(path)
+        return sorted(files, key=cls._fileKey)
+
+    @classmethod
+    def parseLine(cls, line):
+        line = line.rstrip("\n")
+        if line.startswith("{"):
+            try:
+                return json.loads(line)
+            except:
+                pass
+        match = cls._plainLine.match(line)
+        if match:
+            level, year, month, day, clock, origin, message = match.groups()
+            return {"level": cls._plainLevels.get(level, level.lower()), "timestamp": f"{year}-{month}-{day}T{clock}",
+                    "origin": origin, "thread": "", "message": message}
+        # continuation of a multi-line message (plain logs only)
+        return {"level": "", "timestamp": "", "origin": "", "thread": "", "message": line} if line else None
+
+    def records(self):
+        for path in self.paths:
+            opener = gzip.open if path.endswith(".gz") else open
+            try:
+                with opener(path, "rt", encoding="utf-8", errors="replace") as f:
+                    for line in f:
+                        record = self.parseLine(line)
+                        if record is not None:
+                            yield record
+            except OSError:
+                continue
+
+    def filter(self, levels=None, origins=None, text=None, since=None, until=None, thread=None):
+        text = text.lower() if text else None
+        for record in self.records():
+            if levels and record.get("level") not in levels:
+                continue
+            if origins and record.get("origin") not in origins:
+                continue
+            if thread and record.get("thread") != thread:
+                continue
+            # ISO timestamps can be compared as strings (e.g. since="2025-01-01T10:00")
+            if since and record.get("timestamp", "") < since:
+                continue
+            if until and record.get("timestamp", "") > until:
+                continue
+            if text and text not in record.get("message", "").lower():
+                continue
+            yield record
+
+    @staticmethod
+    def formatRecord(record):
+        return f"[{record.get('level', '').upper()}] {record.get('timestamp', '')} {record.get('origin', '')} " \
+               f"({record.get('thread', '')}) --- {record.get('message', '')}"
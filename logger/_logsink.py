@@ -0,0 +1,180 @@
+import atexit
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+
+
+class _Command:
+
+    def __init__(self, stop=False):
+        self.stop = stop
+        self.done = threading.Event()
+
+
+class AsyncLogSink:
+
+    def __init__(self, path, flushInterval=0.5, flushSize=64 * 1024, maxSize=0, maxSegments=-1, compress=False, structured=False):
+
+        # messages are queued by callers and written to file in batches by a background thread,
+        # so no caller (e.g. request interceptor) ever waits for disk access
+        self.path = path
+        self.flushInterval = flushInterval
+        self.flushSize = flushSize
+
+        # when file reaches maxSize (bytes, 0 = never), it is moved to a numbered segment (optionally gzipped)
+        # e.g. log-20250101-120000.jsonl --> log-20250101-120000.001.jsonl.gz, and a new file is started
+        self.maxSize = maxSize
+        self.maxSegments = maxSegments
+        self.compress = compress
+
+        # structured records are written as JSON lines: level, origin, timestamp, message and thread
+        self.structured = structured
+
+        self._queue = queue.SimpleQueue()
+        self._file = open(path, "a", encoding="utf-8")
+        self._size = self._file.tell()
+        self._segment = max([self.segmentNumber(file) for file in self.segments()] + [0])
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="LogSink", daemon=True)
+        self._thread.start()
+
+        # pending messages must be written even if the application is closed abruptly (sys.exit() included)
+        atexit.register(self.close)
+
+    def write(self, error_level, origin, message):
+        # caller only pays for building a tuple and queueing it: formatting is done by the writer thread
+        if not self._closed:
+            self._queue.put((error_level, time.time(), origin, message, threading.current_thread().name))
+
+    def flush(self, timeout=2.0):
+        # blocks until all messages queued so far are on disk (or timeout expires)
+        if not self._closed and self._thread.is_alive():
+            command = _Command()
+            self._queue.put(command)
+            command.done.wait(timeout)
+
+    def close(self, timeout=2.0):
+        if not self._closed:
+            self._closed = True
+            atexit.unregister(self.close)
+            if self._thread.is_alive():
+                command = _Command(stop=True)
+                self._queue.put(command)
+                command.done.wait(timeout)
+
+    def _format(self, record):
+        error_level, timestamp, origin, message, thread = record
+        if self.structured:
+            return json.dumps({
+                "level": error_level.name,
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(timestamp)) + ".%03d" % int(timestamp % 1 * 1000),
+                "origin": origin,
+                "thread": thread,
+                "message": str(message)
+            }, ensure_ascii=False) + "\n"
+        return error_level.value + time.strftime(" %Y/%m/%d-%H:%M:%S ", time.localtime(timestamp)) + origin + " --- " + str(message) + "\n"
+
+    def _writeLines(self, lines):
+        try:
+            data = "".join(lines)
+            self._file.write(data)
+            self._file.flush()
+            # position in file is in bytes (as maxSize), not characters
+            self._size = self._file.tell()
+            if self.maxSize and self._size >= self.maxSize:
+                self._rotate()
+        except:
+            pass
+
+    def _splitPath(self):
+        root, ext = os.path.splitext(self.path)
+        return (root, ext) if ext == ".jsonl" else (self.path, "")
+
+    def segmentPath(self, number):
+        root, ext = self._splitPath()
+        return f"{root}.{number:03d}{ext}"
+
+    def segmentNumber(self, path):
+        root, _ = self._splitPath()
+        try:
+            return int(os.path.basename(path)[len(os.path.basename(root)) + 1:].split(".")[0])
+        except:
+            return 0
+
+    def segments(self):
+        # rotated segments of this log file, oldest first
+        root, _ = self._splitPath()
+        folder, prefix = os.path.split(root)
+        try:
+            files = [os.path.join(folder, file) for file in os.listdir(folder or ".")
+                     if file.startswith(prefix + ".") and os.path.join(folder, file) != self.path]
+        except:
+            files = []
+        return sorted(files, key=self.segmentNumber)
+
+    def _rotate(self):
+
+        self._file.close()
+        try:
+            segmentPath = self.segmentPath(self._segment + 1)
+            os.replace(self.path, segmentPath)
+            self._segment += 1
+        finally:
+            # if file could not be moved, logging goes on in the same file (rotation is tried again on next write)
+            self._file = open(self.path, "a", encoding="utf-8")
+            self._size = self._file.tell()
+
+        if self.compress:
+            with open(segmentPath, "rb") as src, gzip.open(segmentPath + ".gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(segmentPath)
+
+        if self.maxSegments >= 0:
+            segments = self.segments()
+            for oldSegment in segments[:max(0, len(segments) - self.maxSegments)]:
+                os.remove(oldSegment)
+
+    def _run(self):
+
+        lines = []
+        size = 0
+        deadline = None
+        while True:
+            # wait for new messages, but not longer than the time threshold if there are pending ones
+            try:
+                item = self._queue.get(timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, tuple):
+                try:
+                    line = self._format(item)
+                except:
+                    continue
+                lines.append(line)
+                size += len(line)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flushInterval
+                if size < self.flushSize:
+                    continue
+
+            # size or time threshold reached, or flush / stop requested
+            if lines:
+                self._writeLines(lines)
+                lines = []
+                size = 0
+            deadline = None
+
+            if isinstance(item, _Command):
+                if item.stop:
+                    try:
+                        self._file.close()
+                    except:
+                        pass
+                    item.done.set()
+                    return
+                item.done.set()
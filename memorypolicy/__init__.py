@@ -0,0 +1 @@
+from ._memorypolicy import MemoryPolicy
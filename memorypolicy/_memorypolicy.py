@@ -0,0 +1,99 @@
+import psutil
+
+from logger import LOGGER, LoggerSettings
+
+
+class MemoryPolicy:
+
+    def __init__(self, budget=0, lowWater=0.8, minIdle=60, minInterval=10, maxInterval=120, systemReserve=0.1):
+
+        # inactive tabs are discarded only when their renderer processes use more memory than the budget (bytes,
+        # 0 = a quarter of physical memory), or system is running out of memory (less than systemReserve available).
+        # Then, least recently used and biggest tabs go first, until usage is below lowWater * budget
+        total = psutil.virtual_memory().total
+        self.budget = budget or total // 4
+        self.lowWater = lowWater
+        self.minIdle = minIdle
+        self.systemReserve = int(total * systemReserve)
+
+        # seconds to next check: doubled while memory is plentiful, back to minimum when getting close to the budget
+        self.minInterval = minInterval
+        self.maxInterval = maxInterval
+        self.interval = minInterval
+
+        self.usage = 0
+        self._processes = {}
+        self._reclaimed = None
+
+    def rendererSizes(self, pids):
+        # {pid: RSS bytes} of given renderer processes (processes are kept, so each sample is a single call per process)
+        sizes = {}
+        for pid in pids:
+            if not pid or pid in sizes:
+                continue
+            process = self._processes.get(pid)
+            try:
+                if process is None:
+                    process = psutil.Process(pid)
+                    self._processes[pid] = process
+                sizes[pid] = process.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                self._processes.pop(pid, None)
+        for pid in list(self._processes.keys()):
+            if pid not in sizes:
+                del self._processes[pid]
+        return sizes
+
+    def effectiveBudget(self):
+        # budget shrinks if other processes leave the system short of memory
+        try:
+            available = psutil.virtual_memory().available
+        except:
+            return self.budget
+        return min(self.budget, self.usage + available - self.systemReserve)
+
+    def select(self, tabs, now):
+        # tabs: [(key, rendererPid, lastUsed, discardable), ...] of all open (not discarded) tabs
+        # returns [(key, bytes), ...] to discard, and estimated bytes reclaimed by each one
+        sizes = self.rendererSizes([pid for _, pid, _, _ in tabs])
+        previous = self.usage
+        self.usage = sum(sizes.values())
+        if self._reclaimed is not None:
+            LOGGER.write(LoggerSettings.LogLevels.info, "MemoryPolicy",
+                         f"Memory after discarding tabs: {self.usage / 2**20:.0f} MB (reclaimed {(previous - self.usage) / 2**20:.0f} MB, "
+                         f"estimated {self._reclaimed / 2**20:.0f} MB)")
+            self._reclaimed = None
+
+        budget = self.effectiveBudget()
+        if self.usage < budget * self.lowWater:
+            self.interval = min(self.maxInterval, self.interval * 2)
+        else:
+            self.interval = self.minInterval
+        if self.usage <= budget:
+            return []
+
+        # renderer processes may be shared by several tabs (e.g. same site): each one is weighted by its share
+        sharing = {}
+        for _, pid, _, _ in tabs:
+            sharing[pid] = sharing.get(pid, 0) + 1
+        candidates = []
+        for key, pid, lastUsed, discardable in tabs:
+            idle = now - lastUsed
+            if discardable and idle >= self.minIdle:
+                candidates.append((idle * sizes.get(pid, 0) / sharing[pid], sizes.get(pid, 0) // sharing[pid], key))
+        candidates.sort(key=lambda item: item[0], reverse=True)
+
+        target = budget * self.lowWater
+        usage = self.usage
+        discards = []
+        for _, size, key in candidates:
+            if usage <= target:
+                break
+            discards.append((key, size))
+            usage -= size
+        if discards:
+            self._reclaimed = self.usage - usage
+        LOGGER.write(LoggerSettings.LogLevels.warning, "MemoryPolicy",
+                     f"Memory budget exceeded: {self.usage / 2**20:.0f} MB / {budget / 2**20:.0f} MB, "
+                     f"discarding {len(discards)} tabs (~{(self.usage - usage) / 2**20:.0f} MB)")
+        return discards
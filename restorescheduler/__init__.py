@@ -0,0 +1 @@
+from ._restorescheduler import RestoreScheduler
@@ -0,0 +1,80 @@
+import time
+
+from PyQt6.QtCore import QObject, QTimer, QEvent
+from PyQt6.QtWidgets import QApplication
+
+from logger import LOGGER, LoggerSettings
+
+
+class RestoreScheduler(QObject):
+
+    # user activity: warm-up waits until there is none for a while
+    _inputEvents = (QEvent.Type.KeyPress, QEvent.Type.MouseButtonPress, QEvent.Type.Wheel, QEvent.Type.TouchBegin)
+
+    def __init__(self, parent, loadTab, isBusy, maxConcurrent=1, idleTime=2000, loadTimeout=30):
+        super(RestoreScheduler, self).__init__(parent)
+
+        # restored tabs are placeholders, only loaded when activated. A few of them (usually the most recently used)
+        # may be loaded in background (warm-up), one by one (or maxConcurrent), only while the user is idle:
+        #   loadTab(key): loads given placeholder (not activating it), returns its view (None if it can't be loaded)
+        #   isBusy(): True while loading something more important (e.g. current tab)
+        self.loadTab = loadTab
+        self.isBusy = isBusy
+        self.maxConcurrent = max(1, maxConcurrent)
+        self.idleTime = idleTime / 1000
+        self.loadTimeout = loadTimeout
+
+        self._queue = []
+        self._loading = {}
+        self._lastInput = 0.0
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(max(100, idleTime // 4))
+        self._timer.timeout.connect(self._step)
+
+    def start(self, keys):
+        # keys: placeholders to load, in order
+        self.stop()
+        self._queue = list(keys)
+        if self._queue:
+            self._lastInput = time.monotonic()
+            # only watching user input while there are tabs to load
+            QApplication.instance().installEventFilter(self)
+            self._timer.start()
+            LOGGER.write(LoggerSettings.LogLevels.info, "RestoreScheduler", f"Tabs to warm up: {len(self._queue)}")
+
+    def stop(self):
+        if self._timer.isActive():
+            self._timer.stop()
+            QApplication.instance().removeEventFilter(self)
+        self._queue = []
+        self._loading = {}
+
+    def eventFilter(self, obj, event):
+        if event.type() in self._inputEvents:
+            self._lastInput = time.monotonic()
+        return False
+
+    def _loadFinished(self, view):
+        self._loading.pop(view, None)
+
+    def _step(self):
+        now = time.monotonic()
+        # loads never finished (e.g. tab suspended or closed while loading) don't block the rest
+        for view, startTime in list(self._loading.items()):
+            if now - startTime > self.loadTimeout:
+                del self._loading[view]
+
+        if not self._queue:
+            if not self._loading:
+                self.stop()
+            return
+
+        if now - self._lastInput < self.idleTime or self.isBusy():
+            return
+
+        while self._queue and len(self._loading) < self.maxConcurrent:
+            view = self.loadTab(self._queue.pop(0))
+            if view is not None:
+                self._loading[view] = now
+                view.loadFinished.connect(lambda ok, v=view: self._loadFinished(v))
@@ -0,0 +1 @@
+from ._sessionjournal import SessionJournal, SESSION_JOURNAL
@@ -0,0 +1,253 @@
+import json
+import os
+import time
+
+from logger import LOGGER, LoggerSettings
+
+
+class SessionJournal:
+
+    _version = 2
+    # json.dumps() with custom arguments creates a new encoder on every call (most of the cost of an event)
+    _encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+    def __init__(self):
+
+        # open windows and tabs, saved as they change (not only on exit), so a crash doesn't lose the session.
+        # File starts with a snapshot of the whole session, followed by the events (one per line) since then:
+        #   ["S", version, nextId, [[winId, currentTabId, [[tabId, url, zoom, title, frozen, used], ...]], ...]]
+        #   ["W", winId] / ["X", winId]                                 window opened / closed
+        #   ["O", tabId, winId, index, url, zoom, title, frozen, used]  tab opened
+        #   ["C", tabId]                                                tab closed
+        #   ["U", tabId, url] / ["T", tabId, title] / ["Z", tabId, zoom] / ["F", tabId, frozen]
+        #   ["A", tabId, used]                                          tab activated (used: time)
+        #   ["M", winId, [tabId, ...]]                                  tabs moved (new order)
+        # (version 1 had no "used" values)
+        # once there are too many events, a new snapshot replaces the whole file
+        self._refCount = 0
+        self._fd = None
+        self.path = ""
+        self.compactEvery = 1000
+        self._events = 0
+        self._nextId = 1
+
+        # {winId: [currentTabId, [tabId, ...]]} and {tabId: [winId, url, zoom, title, frozen, used]}
+        self._windows = None
+        self._tabs = None
+
+    def acquire(self, path, compactEvery=1000):
+
+        self._refCount += 1
+        if self._refCount == 1:
+            self.path = path
+            self.compactEvery = compactEvery
+            self._windows = {}
+            self._tabs = {}
+            self._events = 0
+        return self
+
+    def release(self):
+
+        self._refCount = max(0, self._refCount - 1)
+        if self._refCount == 0:
+            self.close()
+
+    def restore(self):
+        # returns [[[url, zoom, title, active, frozen, used], ...], ...] (tabs of each window, as they were opened),
+        # or None if there is no session to restore.
+        # Nothing is written until compact() is called, so the previous session is kept if restoring fails
+        windows, tabs, self._nextId = self._read(self.path)
+        self._windows = {}
+        self._tabs = {}
+        self._events = 0
+        self._closeFile()
+        if windows is None:
+            return None
+        session = []
+        for current, tabIds in windows.values():
+            session.append([[tabs[tabId][1], tabs[tabId][2], tabs[tabId][3], tabId == current, tabs[tabId][4], tabs[tabId][5]]
+                            for tabId in tabIds])
+        LOGGER.write(LoggerSettings.LogLevels.info, "SessionJournal", f"Session restored: {len(session)} windows, {len(tabs)} tabs")
+        return session
+
+    @staticmethod
+    def _read(path):
+        # snapshot and events are read (and replayed) in a single sequential pass
+        windows = tabs = None
+        nextId = 1
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        event = json.loads(line)
+                    except:
+                        # last line may be incomplete if the app was killed while writing it
+                        break
+                    kind = event[0]
+                    if kind == "S":
+                        _, _, nextId, snapshot = event
+                        windows = {}
+                        tabs = {}
+                        for winId, current, winTabs in snapshot:
+                            windows[winId] = [current, [tab[0] for tab in winTabs]]
+                            for tabId, url, zoom, title, frozen, *used in winTabs:
+                                tabs[tabId] = [winId, url, zoom, title, frozen, used[0] if used else 0]
+                    elif windows is None:
+                        break
+                    elif kind == "O":
+                        _, tabId, winId, index, url, zoom, title, frozen, *used = event
+                        windows.setdefault(winId, [None, []])[1].insert(index, tabId)
+                        tabs[tabId] = [winId, url, zoom, title, frozen, used[0] if used else 0]
+                        nextId = max(nextId, tabId + 1)
+                    elif kind == "C":
+                        # closing a tab which is not in the session (anymore) changes nothing
+                        tab = tabs.pop(event[1], None)
+                        if tab is not None and tab[0] in windows and event[1] in windows[tab[0]][1]:
+                            windows[tab[0]][1].remove(event[1])
+                    elif kind in ("U", "Z", "T", "F"):
+                        tab = tabs.get(event[1])
+                        if tab is not None:
+                            tab["_UZTF".index(kind)] = event[2]
+                    elif kind == "A":
+                        tab = tabs.get(event[1])
+                        if tab is not None and tab[0] in windows:
+                            windows[tab[0]][0] = event[1]
+                            if len(event) > 2:
+                                tab[5] = event[2]
+                    elif kind == "M":
+                        if event[1] in windows:
+                            windows[event[1]][1] = [tabId for tabId in event[2] if tabId in tabs]
+                    elif kind == "W":
+                        windows[event[1]] = [None, []]
+                        nextId = max(nextId, event[1] + 1)
+                    elif kind == "X":
+                        for tabId in windows.pop(event[1], [None, []])[1]:
+                            tabs.pop(tabId, None)
+        except FileNotFoundError:
+            pass
+        except:
+            # corrupted journal: restoring only the events replayed so far would look like a complete (but wrong) session
+            LOGGER.write(LoggerSettings.LogLevels.warning, "SessionJournal", f"Session journal couldn't be read: {path}")
+            windows = tabs = None
+        return windows, tabs, nextId
+
+    def _write(self, event):
+        if self._fd is None:
+            return
+        # unbuffered (a single system call per event), but no fsync: data in OS buffers survives the app crashing or being killed
+        os.write(self._fd, (self._encoder.encode(event) + "\n").encode("utf-8"))
+        self._events += 1
+        if self._events >= self.compactEvery:
+            self.compact()
+
+    def _closeFile(self):
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except:
+                pass
+            self._fd = None
+
+    def compact(self):
+        # write whole session as a new snapshot, atomically replacing the journal (events are appended to it)
+        if self._windows is None:
+            return False
+        self._closeFile()
+        snapshot = [[winId, current, [[tabId] + self._tabs[tabId][1:] for tabId in tabIds]]
+                    for winId, (current, tabIds) in self._windows.items()]
+        tempPath = self.path + ".tmp"
+        try:
+            with open(tempPath, "w", encoding="utf-8") as file:
+                file.write(self._encoder.encode(["S", self._version, self._nextId, snapshot]))
+                file.write("\n")
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tempPath, self.path)
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+            self._events = 0
+            return True
+        except:
+            LOGGER.write(LoggerSettings.LogLevels.error, "SessionJournal", f"Session journal couldn't be written: {self.path}")
+            return False
+
+    def close(self):
+        # save current session as a snapshot and stop recording (e.g. windows closed on exit must not be forgotten)
+        if self._windows is not None:
+            self.compact()
+            self._closeFile()
+            self._windows = None
+            self._tabs = None
+
+    def _newId(self):
+        newId = self._nextId
+        self._nextId += 1
+        return newId
+
+    def openWindow(self):
+        if self._windows is None:
+            return None
+        winId = self._newId()
+        self._windows[winId] = [None, []]
+        self._write(["W", winId])
+        return winId
+
+    def closeWindow(self, winId):
+        if self._windows is None or winId not in self._windows:
+            return
+        for tabId in self._windows.pop(winId)[1]:
+            self._tabs.pop(tabId, None)
+        self._write(["X", winId])
+
+    def openTab(self, winId, index, url, zoom, title, frozen, used=0):
+        if self._windows is None or winId not in self._windows:
+            return None
+        tabId = self._newId()
+        self._windows[winId][1].insert(index, tabId)
+        self._tabs[tabId] = [winId, url, zoom, title, frozen, used]
+        self._write(["O", tabId, winId, index, url, zoom, title, frozen, used])
+        return tabId
+
+    def closeTab(self, tabId):
+        tab = self._tabs.pop(tabId, None) if self._tabs is not None else None
+        if tab is not None:
+            self._windows[tab[0]][1].remove(tabId)
+            self._write(["C", tabId])
+
+    def _update(self, kind, field, tabId, value):
+        tab = self._tabs.get(tabId) if self._tabs is not None else None
+        if tab is not None and tab[field] != value:
+            tab[field] = value
+            self._write([kind, tabId, value])
+
+    def setUrl(self, tabId, url):
+        self._update("U", 1, tabId, url)
+
+    def setZoom(self, tabId, zoom):
+        self._update("Z", 2, tabId, zoom)
+
+    def setTitle(self, tabId, title):
+        self._update("T", 3, tabId, title)
+
+    def setFrozen(self, tabId, frozen):
+        self._update("F", 4, tabId, frozen)
+
+    def activate(self, tabId):
+        tab = self._tabs.get(tabId) if self._tabs is not None else None
+        if tab is not None and self._windows[tab[0]][0] != tabId:
+            self._windows[tab[0]][0] = tabId
+            # time is only needed to know which tabs were recently used (no need for more precision)
+            tab[5] = int(time.time())
+            self._write(["A", tabId, tab[5]])
+
+    def moveTabs(self, winId, tabIds):
+        # tabIds: new order of window tabs
+        if self._windows is None or winId not in self._windows:
+            return
+        tabIds = [tabId for tabId in tabIds if tabId in self._tabs]
+        if tabIds != self._windows[winId][1]:
+            self._windows[winId][1] = tabIds
+            self._write(["M", winId, tabIds])
+
+
+# shared by all windows (main and child windows are saved in the same session)
+SESSION_JOURNAL = SessionJournal()
@@ -13,7 +13,12 @@ class DefaultSettings:
         appName = "Coward"
 
     class History:
-        historySize = 100
+        historySize = 10000
+        searchResults = 50      # max number of results shown when searching history
+        searchDelay = 50        # ms to wait for the user to stop typing before searching
+        frecencyHalfLife = 30 * 86400   # seconds after which a visit counts half when ranking entries
+        suggestions = 8         # max number of history entries suggested while typing in the urlbar
+        iconsCollectDelay = 10000   # ms after startup to forget icons no entry uses anymore (in background)
 
     class Grips:
         gripSize = 8
@@ -36,7 +41,14 @@ class DefaultSettings:
     class Tabs:
         maxWidth = 240
         checkActivity = True
-        suspendTime = 5*60  # time in seconds to suspend inactive tabs
+        memoryBudget = 0        # bytes used by tabs before inactive ones are discarded (0 = a quarter of physical memory)
+        memoryLowWater = 0.8    # fraction of budget tabs are discarded down to (and below which checks are less frequent)
+        discardMinIdle = 60     # seconds a tab must be inactive before it can be discarded
+        freezeTime = 300        # seconds a tab must be inactive before its page is frozen (0 = never)
+        useLifecycle = True     # suspend tabs by freezing / discarding their pages (False = replace them by placeholders)
+        warmUpTabs = 3          # recently used tabs loaded in background after restoring session (0 = only when activated)
+        warmUpConcurrency = 1   # max number of those tabs loading at the same time
+        warmUpIdleTime = 2000   # ms without user input before loading them
 
     class Splash:
         enableSplash = False  # not really showing from the very beginning
@@ -58,10 +70,20 @@ class DefaultSettings:
         class History:
             historyFolder = "coward.history"
             historyFile = "data"
+            historyDbFile = "history.sqlite"
 
         class Tabs:
             tabsFolder = "coward.tabs"
 
+        class Favicons:
+            faviconsFile = "favicons.sqlite"
+            maxSize = 8 * 1024 * 1024   # bytes of stored icons before least recently used ones are evicted
+            cacheSize = 256             # decoded icons kept in memory
+
+        class Session:
+            sessionFile = "session.journal"
+            compactEvery = 1000         # events appended to the journal before it is replaced by a snapshot
+
     class Browser:
         defaultEngine = 0
         defaultPages = ['https://start.duckduckgo.com/?kae=d', 'https://www.startpage.com']
@@ -98,6 +120,16 @@ class DefaultSettings:
         easyprivacyUrl = 'https://easylist.to/easylist/easyprivacy.txt'
         easyprivacytFile = "easyprivacy.txt"
         urlBlackListFile = "urlblacklist.txt"
+        rulesCacheFile = "filters.cache"  # network rules already filtered from the lists (no comments, cosmetic rules, ...)
+        cosmeticSnapshotFile = "cosmetic.snapshot"
+        rulesMetaFile = "filters.meta"
+        updateInterval = 7 * 86400  # time in seconds to check if rules have been updated
+        reloadDelay = 1000  # time in milliseconds to wait for changes in blacklist / filter lists to settle before reloading them
+        verdictCacheSize = 4096
+        builtinEngine = False  # use built-in filter engine even if braveblock is available
+        enableCosmeticFilters = True  # hide ad containers using element-hiding (##) rules
+        enableStats = True  # collect interceptor latency and block counters (Ctrl+Shift+B to show them)
+        statsMaxHosts = 500
 
     class Media:
         checkPageCanPlayMedia = False
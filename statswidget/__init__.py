@@ -0,0 +1 @@
+from ._statswidget import StatsWidget
@@ -0,0 +1,113 @@
+import os
+
+from PyQt6.QtCore import Qt, QTimer, QDir
+from PyQt6.QtWidgets import QPushButton, QPlainTextEdit, QHBoxLayout, QVBoxLayout, QWidget, QFileDialog
+
+from logger import LOGGER, LoggerSettings
+
+
+class StatsWidget(QWidget):
+
+    _width = 640
+    _height = 480
+    _maxHosts = 30
+
+    def __init__(self, parent, stats):
+        super(StatsWidget, self).__init__(parent)
+
+        self.setWindowFlag(Qt.WindowType.FramelessWindowHint, True)
+        self.setWindowFlag(Qt.WindowType.Tool, True)
+        self.setWindowTitle("Coward - Interceptor Stats")
+        self.setFixedSize(self._width, self._height)
+
+        # interceptor stats (shared by all windows), or None if they are disabled
+        self.stats = stats
+
+        self.mainLayout = QVBoxLayout()
+        self.mainLayout.setContentsMargins(5, 5, 5, 5)
+        self.mainLayout.setSpacing(5)
+        self.setLayout(self.mainLayout)
+
+        self.text = QPlainTextEdit()
+        self.text.setReadOnly(True)
+        self.text.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        self.mainLayout.addWidget(self.text)
+
+        self.buttonsLayout = QHBoxLayout()
+        self.buttonsLayout.setSpacing(10)
+        self.mainLayout.addLayout(self.buttonsLayout)
+
+        self.reset_btn = QPushButton("Reset")
+        self.reset_btn.clicked.connect(self.resetStats)
+        self.buttonsLayout.addWidget(self.reset_btn)
+
+        self.save_btn = QPushButton("Save as JSON")
+        self.save_btn.clicked.connect(self.saveStats)
+        self.buttonsLayout.addWidget(self.save_btn)
+
+        self.close_btn = QPushButton("Close")
+        self.close_btn.clicked.connect(self.hide)
+        self.buttonsLayout.addWidget(self.close_btn)
+
+        # stats are refreshed only while visible
+        self.refreshTimer = QTimer()
+        self.refreshTimer.setInterval(1000)
+        self.refreshTimer.timeout.connect(self.refresh)
+
+    def show(self):
+        super().show()
+        self.refresh()
+        self.refreshTimer.start()
+
+    def hide(self):
+        self.refreshTimer.stop()
+        super().hide()
+
+    def closeEvent(self, a0):
+        self.refreshTimer.stop()
+        super().closeEvent(a0)
+
+    def refresh(self):
+
+        if self.stats is None:
+            self.text.setPlainText("Interceptor stats are disabled (see DefaultSettings.AdBlocker.enableStats)")
+            return
+
+        summary = self.stats.summary()
+        lines = [f"Requests: {summary['requests']}   (since {summary['since']})", "",
+                 f"{'Latency (us)':<16}{'samples':>10}{'mean':>10}{'p50':>10}{'p90':>10}{'p99':>10}"]
+        for phase, values in summary["latency"].items():
+            lines.append(f"{phase:<16}{values['samples']:>10}{values['mean_us']:>10}"
+                         f"{values['p50_us']:>10}{values['p90_us']:>10}{values['p99_us']:>10}")
+
+        lines += ["", f"{'Resource type':<32}{'requests':>10}{'blacklist':>10}{'adblock':>10}{'allowed':>10}"]
+        lines += self._counterLines(summary["by_type"].items())
+
+        lines += ["", f"{'Top-level host':<32}{'requests':>10}{'blacklist':>10}{'adblock':>10}{'allowed':>10}"]
+        lines += self._counterLines(list(summary["by_host"].items())[:self._maxHosts])
+        if len(summary["by_host"]) > self._maxHosts:
+            lines.append(f"... {len(summary['by_host']) - self._maxHosts} more hosts (save as JSON to see all)")
+
+        # keep scroll position between refreshes
+        scroll = self.text.verticalScrollBar().value()
+        self.text.setPlainText("\n".join(lines))
+        self.text.verticalScrollBar().setValue(scroll)
+
+    def _counterLines(self, items):
+        return [f"{key[:31]:<32}{values['requests']:>10}{values['blacklisted']:>10}{values['adblocked']:>10}{values['allowed']:>10}"
+                for key, values in items]
+
+    def resetStats(self):
+        if self.stats is not None:
+            self.stats.reset()
+            self.refresh()
+
+    def saveStats(self):
+        if self.stats is None:
+            return
+        filename, _ = QFileDialog.getSaveFileName(self, "Save Stats As", QDir.home().filePath("interceptor_stats.json"), "JSON (*.json)")
+        if filename:
+            try:
+                self.stats.toJson(os.path.normpath(filename))
+            except:
+                LOGGER.write(LoggerSettings.LogLevels.error, "Main", f"Interceptor stats could not be saved to {filename}")
@@ -0,0 +1 @@
+from ._tabstate import TabState, TabRegistry
@@ -0,0 +1,128 @@
+import time
+from urllib.parse import urlsplit
+
+
+class TabState:
+
+    # one per open tab, updated in place (slots keep them small and fast to access, even with hundreds of tabs)
+    __slots__ = ("browser", "url", "host", "title", "zoom", "lastAccessed", "frozen", "isPlayingMedia", "tabId", "lifecycle", "resumeStart")
+
+    def __init__(self, browser, url, title, zoom, lastAccessed, frozen, isPlayingMedia, tabId):
+        self.browser = browser
+        self.url = url
+        self.host = TabRegistry.hostOf(url)
+        self.title = title
+        self.zoom = zoom
+        self.lastAccessed = lastAccessed
+        self.frozen = frozen
+        self.isPlayingMedia = isPlayingMedia
+        # entry in session journal (None if not saved, e.g. incognito)
+        self.tabId = tabId
+        # page lifecycle state (None if tab has no page), and when it started resuming (to measure how long it takes)
+        self.lifecycle = None
+        self.resumeStart = None
+
+
+class TabRegistry:
+
+    def __init__(self):
+
+        # tab states by tab widget (it changes when tab is suspended / resumed, but state is kept),
+        # indexed by URL and host, and in access order (least recently accessed first)
+        self._states = {}
+        self._byUrl = {}
+        self._byHost = {}
+        self._byAccess = {}
+        # states added out of access order (e.g. restored tabs, with their last use time): sorted when needed
+        self._accessUnsorted = False
+
+    @staticmethod
+    def hostOf(url):
+        try:
+            return urlsplit(url).hostname or ""
+        except ValueError:
+            return ""
+
+    def __len__(self):
+        return len(self._states)
+
+    def __contains__(self, browser):
+        return browser in self._states
+
+    def __iter__(self):
+        return iter(list(self._states.values()))
+
+    def get(self, browser):
+        return self._states.get(browser)
+
+    @staticmethod
+    def _index(index, key, state):
+        # dicts used as (insertion ordered) sets
+        index.setdefault(key, {})[state] = None
+
+    @staticmethod
+    def _unindex(index, key, state):
+        states = index.get(key)
+        if states is not None:
+            states.pop(state, None)
+            if not states:
+                del index[key]
+
+    def add(self, browser, url, title="", zoom=1.0, lastAccessed=None, frozen=False, isPlayingMedia=False, tabId=None):
+        state = TabState(browser, url, title, zoom, time.time() if lastAccessed is None else lastAccessed, frozen, isPlayingMedia, tabId)
+        self._states[browser] = state
+        self._index(self._byUrl, state.url, state)
+        self._index(self._byHost, state.host, state)
+        if self._byAccess and state.lastAccessed < next(reversed(self._byAccess)).lastAccessed:
+            self._accessUnsorted = True
+        self._byAccess[state] = None
+        return state
+
+    def remove(self, browser):
+        state = self._states.pop(browser, None)
+        if state is not None:
+            self._unindex(self._byUrl, state.url, state)
+            self._unindex(self._byHost, state.host, state)
+            self._byAccess.pop(state, None)
+        return state
+
+    def replace(self, browser, newBrowser):
+        # tab widget replaced (e.g. suspended tab): same state, keeping its place in all indexes
+        state = self._states.pop(browser, None)
+        if state is not None:
+            state.browser = newBrowser
+            self._states[newBrowser] = state
+        return state
+
+    def setUrl(self, state, url):
+        if url != state.url:
+            self._unindex(self._byUrl, state.url, state)
+            self._index(self._byUrl, url, state)
+            # most navigations stay in the same site ("scheme://netloc" unchanged): no need to parse the url
+            if url.split("/", 3)[:3] != state.url.split("/", 3)[:3]:
+                host = self.hostOf(url)
+            else:
+                host = state.host
+            if host != state.host:
+                self._unindex(self._byHost, state.host, state)
+                self._index(self._byHost, host, state)
+                state.host = host
+            state.url = url
+
+    def touch(self, state, accessTime=None):
+        state.lastAccessed = time.time() if accessTime is None else accessTime
+        self._byAccess.pop(state, None)
+        self._byAccess[state] = None
+
+    def withUrl(self, url):
+        return list(self._byUrl.get(url, ()))
+
+    def withHost(self, host):
+        return list(self._byHost.get(host, ()))
+
+    def leastRecentlyUsed(self):
+        # states, least recently accessed first
+        if self._accessUnsorted:
+            self._byAccess = dict.fromkeys(sorted(self._byAccess, key=lambda state: state.lastAccessed))
+            self._accessUnsorted = False
+        return list(self._byAccess)
@@ -13,9 +13,25 @@ class TabWidget(QTabWidget):
         self.char_width = self.font_metrics.averageCharWidth()
         self.min_tab_width = self.parent().h_tab_size
 
+        # while adding / removing many tabs at once, tabs text sizes are recalculated only at the end
+        self._batchDepth = 0
+
         # this has no effect. Solved in qss (width: 0px)
         # self.setUsesScrollButtons(False)
 
+    def beginTabsUpdate(self):
+        self._batchDepth += 1
+
+    def endTabsUpdate(self):
+        self._batchDepth = max(0, self._batchDepth - 1)
+        if self._batchDepth == 0:
+            self.resizeEvent()
+
+    def _tabsChanged(self):
+        # force to recalculate all tabs text sizes
+        if self._batchDepth == 0:
+            self.resizeEvent()
+
     def addTab(self, widget, a1, forceSetText=True):
         if forceSetText:
             tabIndex = super().addTab(widget, a1)
@@ -23,8 +39,7 @@ class TabWidget(QTabWidget):
         else:
             tabIndex = super().addTab(widget, "")
         self.setTabWhatsThis(tabIndex, a1)
-        # force to recalculate all tabs text sizes
-        self.resizeEvent()
+        self._tabsChanged()
         return tabIndex
 
     def insertTab(self, index, widget, a2, forceSetText=True):
@@ -34,14 +49,12 @@ class TabWidget(QTabWidget):
         else:
             tabIndex = super().insertTab(index, widget, "")
         self.setTabWhatsThis(tabIndex, a2)
-        # force to recalculate all tabs text sizes
-        self.resizeEvent()
+        self._tabsChanged()
         return tabIndex
 
     def removeTab(self, index):
         super().removeTab(index)
-        # force to recalculate all tabs text sizes
-        self.resizeEvent()
+        self._tabsChanged()
 
     def setCurrentIndex(self, index):
         index = max(1, min(index, self.count() - 2))
@@ -26,6 +26,7 @@ class Themes:
         contextmenu = "contextmenu"
         mediaplayer = "mediaplayer"
         historyWidget = "historyWidget"
+        statsWidget = "statsWidget"
 
     _themes = {
         "Dark": {
@@ -41,7 +42,8 @@ class Themes:
             "messagebox": 'messagebox.qss',
             "contextmenu": "contextmenu.qss",
             "mediaplayer": "mediaplayer.qss",
-            "historyWidget": "history_widget.qss"
+            "historyWidget": "history_widget.qss",
+            "statsWidget": "stats_widget.qss"
         },
         "Incognito": {
             "mainWindow": 'main.qss',
@@ -56,7 +58,8 @@ class Themes:
             "messagebox": 'messagebox.qss',
             "contextmenu": "contextmenu.qss",
             "mediaplayer": "mediaplayer.qss",
-            "historyWidget": "history_widget.qss"
+            "historyWidget": "history_widget.qss",
+            "statsWidget": "stats_widget.qss"
         }
     }
 
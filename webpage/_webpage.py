@@ -1,6 +1,6 @@
 from PyQt6.QtCore import pyqtSlot, pyqtSignal
 from PyQt6.QtGui import QIcon
-from PyQt6.QtWebEngineCore import QWebEnginePage, QWebEngineCertificateError
+from PyQt6.QtWebEngineCore import QWebEnginePage, QWebEngineCertificateError, QWebEngineScript
 from PyQt6.QtWidgets import QMessageBox
 
 from logger import LOGGER, LoggerSettings
@@ -14,6 +14,8 @@ class WebPage(QWebEnginePage):
 
     mediaErrorSig = pyqtSignal(str)
 
+    cosmeticScriptName = "coward-cosmetic-page"
+
     def __init__(self, profile, parent, isPlayingMediaSig, dialog_manager, http_manager=None):
         super(WebPage, self).__init__(profile, parent)
 
@@ -43,10 +45,30 @@ class WebPage(QWebEnginePage):
         self.mediaErrorSig.connect(self.handleMediaError)
         self.windowCloseRequested.connect(self.onCloseRequested)
 
-    # def acceptNavigationRequest(self, url, type, isMainFrame: bool) -> bool:
-    # non-usual types are mostly detected as NavigationTypeOther, so it's not easy to distinguish legit vs. suspicious
-    #     if type == QWebEnginePage.NavigationType.NavigationTypeRedirect: return False
-    #     return super().acceptNavigationRequest(url, type, isMainFrame)
+    def acceptNavigationRequest(self, url, type, isMainFrame: bool) -> bool:
+        # non-usual types are mostly detected as NavigationTypeOther, so it's not easy to distinguish legit vs. suspicious
+        # if type == QWebEnginePage.NavigationType.NavigationTypeRedirect: return False
+        if isMainFrame:
+            self.updateCosmeticFilters(url)
+        return super().acceptNavigationRequest(url, type, isMainFrame)
+
+    def updateCosmeticFilters(self, url):
+
+        # replace domain-specific element-hiding rules before the new document is created
+        scripts = self.scripts()
+        for script in scripts.find(self.cosmeticScriptName):
+            scripts.remove(script)
+
+        interceptor = getattr(self.profile(), "interceptor", None)
+        source = interceptor.pageCosmeticScript(url) if interceptor is not None else ""
+        if source:
+            script = QWebEngineScript()
+            script.setName(self.cosmeticScriptName)
+            script.setSourceCode(source)
+            script.setInjectionPoint(QWebEngineScript.InjectionPoint.DocumentCreation)
+            script.setWorldId(QWebEngineScript.ScriptWorldId.ApplicationWorld)
+            script.setRunsOnSubFrames(False)
+            scripts.insert(script)
 
     @pyqtSlot(QWebEngineCertificateError)
     def handleCertificateError(self, error: QWebEngineCertificateError):
@@ -127,7 +149,8 @@ class WebPage(QWebEnginePage):
 
     def javaScriptConsoleMessage(self, level, message, lineNumber=0, sourceID=""):
 
-        LOGGER.write(self.errorLevel.get(level, LoggerSettings.LogLevels.fatal), "JavaScriptConsole", message)
+        # called for every console message of every page: discarded before any processing if not enabled
+        LOGGER.log(self.errorLevel.get(level, LoggerSettings.LogLevels.fatal), "JavaScriptConsole", message)
 
     def showDialog(self, message, buttonOkOnly=False, acceptSlot=None, rejectSlot=None):
         dialog = self.dialog_manager.createDialog(
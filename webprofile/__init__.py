@@ -1,2 +1,8 @@
+from ._abpengine import AbpEngine
+from ._cosmeticfilters import CosmeticFilters, CosmeticSnapshot
+from ._filterservice import FilterService, FILTER_SERVICE
+from ._interceptorstats import InterceptorStats
 from ._requestinterceptor import RequestInterceptor
+from ._requestrecorder import RequestRecorder
+from ._urlmatcher import UrlMatcher
 from ._webprofile import WebProfile
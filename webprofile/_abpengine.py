@@ -0,0 +1,382 @@
+import re
+
+
+class AbpEngine:
+    """
+        Built-in filter engine for the network subset of Adblock Plus / EasyList syntax, used when braveblock is not available.
+
+        Supported: blocking and exception (@@) filters, || domain anchors, | start / end anchors, ^ separators, * wildcards,
+        /regex/ filters, and these options: third-party / first-party (3p / 1p), resource types (script, image, stylesheet,
+        subdocument, xmlhttprequest, ping, websocket, document, media, font, object, other) and their negations,
+        domain= (from=), match-case, important and all.
+        Filters with any other option (csp, redirect, removeparam, popup, ...) are ignored, since they don't just block.
+
+        Filters are indexed by one of their tokens (runs of [a-z0-9%]), and plain "||domain^" filters by domain, so each
+        request is only checked against the few filters sharing a token or a host suffix with it.
+    """
+
+    TYPES = {
+        "script": 1 << 0,
+        "image": 1 << 1,
+        "stylesheet": 1 << 2,
+        "subdocument": 1 << 3,
+        "xmlhttprequest": 1 << 4,
+        "ping": 1 << 5,
+        "websocket": 1 << 6,
+        "document": 1 << 7,
+        "other": 1 << 8,
+        "media": 1 << 9,
+        "font": 1 << 10,
+        "object": 1 << 11
+    }
+    _typeAliases = {"css": "stylesheet", "frame": "subdocument", "xhr": "xmlhttprequest", "doc": "document",
+                    "beacon": "ping", "object-subrequest": "object"}
+    _allTypes = (1 << 12) - 1
+
+    _tokenRe = re.compile(r"[a-z0-9%]{2,}")
+    _separator = r"(?:[^\w\-.%]|$)"
+    _hostAnchor = r"^[a-z][a-z0-9+.\-]*://(?:[^/?#]*\.)?"
+    _secondLevels = {"co", "com", "org", "net", "gov", "ac", "edu", "or", "ne", "go", "gob", "nic"}
+
+    def __init__(self, rules=None):
+
+        self.blockHosts = {}
+        self.blockTokens = {}
+        self.blockOthers = []
+        self.importantHosts = {}
+        self.importantTokens = {}
+        self.importantOthers = []
+        self.allowHosts = {}
+        self.allowTokens = {}
+        self.allowOthers = []
+        self.documentExceptions = []
+        self.filtersCount = 0
+        self.ignoredCount = 0
+
+        for rule in rules or []:
+            self.addRule(rule)
+
+    def addRule(self, rule):
+
+        rule = rule.strip()
+        if not rule or rule[0] in "![" or "##" in rule or "#@#" in rule or "#?#" in rule or "#$#" in rule:
+            return False
+
+        networkFilter = _NetworkFilter.parse(rule)
+        if networkFilter is None:
+            self.ignoredCount += 1
+            return False
+        self.filtersCount += 1
+
+        if networkFilter.isException and networkFilter.documentOption:
+            # page-wide exception (e.g. @@||site.com^$document): requests from matching pages are never blocked
+            self.documentExceptions.append(networkFilter)
+            if networkFilter.types == self.TYPES["document"]:
+                return True
+
+        if networkFilter.isException:
+            hosts, tokens, others = self.allowHosts, self.allowTokens, self.allowOthers
+        elif networkFilter.important:
+            # indexed apart, so any matching $important filter wins over exceptions, not just the first block match
+            hosts, tokens, others = self.importantHosts, self.importantTokens, self.importantOthers
+        else:
+            hosts, tokens, others = self.blockHosts, self.blockTokens, self.blockOthers
+
+        if networkFilter.host:
+            hosts.setdefault(networkFilter.host, []).append(networkFilter)
+        else:
+            token = self._selectToken(networkFilter, tokens)
+            if token:
+                tokens.setdefault(token, []).append(networkFilter)
+            else:
+                others.append(networkFilter)
+        return True
+
+    def _selectToken(self, networkFilter, tokens):
+        # only tokens which are complete in any matching URL are valid (not next to a wildcard or an unanchored edge)
+        if networkFilter.isRegex:
+            return ""
+        pattern = networkFilter.pattern.lower()
+        best = ""
+        bestCount = -1
+        for match in self._tokenRe.finditer(pattern):
+            start, end = match.span()
+            if start == 0 and not networkFilter.leftAnchored or start > 0 and pattern[start - 1] == "*":
+                continue
+            if end == len(pattern) and not networkFilter.rightAnchored or end < len(pattern) and pattern[end] == "*":
+                continue
+            token = match.group()
+            count = len(tokens.get(token, ()))
+            # prefer the least used token, and the longest one in case of tie
+            if bestCount < 0 or count < bestCount or (count == bestCount and len(token) > len(best)):
+                best = token
+                bestCount = count
+        return best
+
+    @staticmethod
+    def hostOf(url):
+        start = url.find("://")
+        if start < 0:
+            return ""
+        start += 3
+        end = len(url)
+        for ch in "/?#":
+            pos = url.find(ch, start)
+            if 0 <= pos < end:
+                end = pos
+        host = url[start:end]
+        at = host.rfind("@")
+        if at >= 0:
+            host = host[at + 1:]
+        if host.startswith("["):
+            return host[:host.find("]") + 1].lower()
+        colon = host.find(":")
+        if colon >= 0:
+            host = host[:colon]
+        return host.lower()
+
+    def baseDomain(self, host):
+        # approximation to the registrable domain (no public suffix list): last two labels, or three for "co.uk"-like ones
+        labels = host.split(".")
+        if len(labels) > 2 and len(labels[-1]) == 2 and labels[-2] in self._secondLevels:
+            return ".".join(labels[-3:])
+        return ".".join(labels[-2:])
+
+    @staticmethod
+    def hostSuffixes(host):
+        suffixes = [host]
+        pos = host.find(".")
+        while pos >= 0:
+            suffixes.append(host[pos + 1:])
+            pos = host.find(".", pos + 1)
+        return suffixes
+
+    def _candidates(self, hosts, tokens, others, suffixes, urlTokens):
+        for suffix in suffixes:
+            found = hosts.get(suffix)
+            if found:
+                yield from found
+        for token in urlTokens:
+            found = tokens.get(token)
+            if found:
+                yield from found
+        yield from others
+
+    def _firstMatch(self, candidates, request):
+        for networkFilter in candidates:
+            if networkFilter.matches(request):
+                return networkFilter
+        return None
+
+    def check_network_urls(self, url, source_url, request_type):
+
+        urlLower = url.lower()
+        host = self.hostOf(urlLower)
+        sourceHost = self.hostOf(source_url) or host
+        typeBit = self.TYPES.get(request_type or "other", self.TYPES["other"])
+        request = _Request(url, urlLower, host, self.hostSuffixes(sourceHost), typeBit,
+                           self.baseDomain(host) != self.baseDomain(sourceHost))
+
+        suffixes = self.hostSuffixes(host) if host else []
+        urlTokens = set(self._tokenRe.findall(urlLower))
+
+        if self._firstMatch(self._candidates(self.importantHosts, self.importantTokens, self.importantOthers, suffixes, urlTokens), request) is not None:
+            return True
+        blocking = self._firstMatch(self._candidates(self.blockHosts, self.blockTokens, self.blockOthers, suffixes, urlTokens), request)
+        if blocking is None:
+            return False
+
+        exception = self._firstMatch(self._candidates(self.allowHosts, self.allowTokens, self.allowOthers, suffixes, urlTokens), request)
+        if exception is not None:
+            return False
+
+        if self.documentExceptions and source_url:
+            sourceLower = source_url.lower()
+            sourceRequest = _Request(source_url, sourceLower, sourceHost, request.sourceSuffixes, self.TYPES["document"], False)
+            for networkFilter in self.documentExceptions:
+                if networkFilter.matches(sourceRequest):
+                    return False
+
+        return True
+
+
+class _Request:
+
+    __slots__ = ("url", "urlLower", "host", "sourceSuffixes", "typeBit", "thirdParty")
+
+    def __init__(self, url, urlLower, host, sourceSuffixes, typeBit, thirdParty):
+        self.url = url
+        self.urlLower = urlLower
+        self.host = host
+        self.sourceSuffixes = sourceSuffixes
+        self.typeBit = typeBit
+        self.thirdParty = thirdParty
+
+
+class _NetworkFilter:
+
+    __slots__ = ("rule", "pattern", "isException", "isRegex", "important", "matchCase", "types", "thirdParty",
+                 "includeDomains", "excludeDomains", "documentOption", "host", "leftAnchored", "rightAnchored", "hostAnchored", "_regex")
+
+    _supportedOptions = {"third-party", "3p", "first-party", "1p", "match-case", "important", "all"}
+    _plainHost = re.compile(r"^[a-z0-9\-.]+$")
+
+    def __init__(self, rule):
+        self.rule = rule
+        self.pattern = ""
+        self.isException = False
+        self.isRegex = False
+        self.important = False
+        self.matchCase = False
+        self.types = AbpEngine._allTypes
+        self.thirdParty = None
+        self.includeDomains = None
+        self.excludeDomains = None
+        self.documentOption = False
+        self.host = ""
+        self.leftAnchored = False
+        self.rightAnchored = False
+        self.hostAnchored = False
+        self._regex = None
+
+    @classmethod
+    def parse(cls, rule):
+
+        networkFilter = cls(rule)
+        if rule.startswith("@@"):
+            networkFilter.isException = True
+            rule = rule[2:]
+
+        # options are after the last "$" (but regex filters may contain "$" themselves)
+        pattern = rule
+        options = ""
+        dollar = rule.rfind("$")
+        if dollar >= 0 and not (rule.startswith("/") and rule.endswith("/")):
+            pattern, options = rule[:dollar], rule[dollar + 1:]
+        if options and not networkFilter._parseOptions(options):
+            return None
+
+        if len(pattern) > 1 and pattern.startswith("/") and pattern.endswith("/"):
+            networkFilter.isRegex = True
+            networkFilter.pattern = pattern[1:-1]
+            try:
+                networkFilter._regex = re.compile(networkFilter.pattern, 0 if networkFilter.matchCase else re.IGNORECASE)
+            except re.error:
+                return None
+            return networkFilter
+
+        if pattern.startswith("||"):
+            networkFilter.hostAnchored = networkFilter.leftAnchored = True
+            pattern = pattern[2:]
+        elif pattern.startswith("|"):
+            networkFilter.leftAnchored = True
+            pattern = pattern[1:]
+        if pattern.endswith("|"):
+            networkFilter.rightAnchored = True
+            pattern = pattern[:-1]
+
+        # leading and trailing wildcards are implicit in unanchored filters
+        if not networkFilter.leftAnchored:
+            pattern = pattern.lstrip("*")
+        if not networkFilter.rightAnchored:
+            pattern = pattern.rstrip("*")
+        networkFilter.pattern = pattern
+
+        # "||domain^" filters are matched by host lookup, without regex
+        if networkFilter.hostAnchored and not networkFilter.rightAnchored and pattern.endswith("^"):
+            host = pattern[:-1].lower()
+            if host and cls._plainHost.match(host) and not host.startswith(".") and not host.endswith("."):
+                networkFilter.host = host
+
+        return networkFilter
+
+    def _parseOptions(self, options):
+
+        positiveTypes = 0
+        negativeTypes = 0
+        for option in options.split(","):
+            option = option.strip()
+            negated = option.startswith("~")
+            name = option[1:] if negated else option
+            name = AbpEngine._typeAliases.get(name, name)
+
+            if name in AbpEngine.TYPES:
+                if negated:
+                    negativeTypes |= AbpEngine.TYPES[name]
+                else:
+                    positiveTypes |= AbpEngine.TYPES[name]
+
+            elif name in ("domain", "from") or name.startswith("domain=") or name.startswith("from="):
+                _, _, value = name.partition("=")
+                if not value:
+                    return False
+                include = set()
+                exclude = set()
+                for domain in value.lower().split("|"):
+                    if domain.startswith("~"):
+                        exclude.add(domain[1:])
+                    elif domain:
+                        include.add(domain)
+                self.includeDomains = include or None
+                self.excludeDomains = exclude or None
+
+            elif name in self._supportedOptions:
+                if name in ("third-party", "3p"):
+                    self.thirdParty = not negated
+                elif name in ("first-party", "1p"):
+                    self.thirdParty = negated
+                elif name == "match-case":
+                    self.matchCase = not negated
+                elif name == "important":
+                    self.important = True
+                elif name == "all":
+                    positiveTypes |= AbpEngine._allTypes
+
+            else:
+                # any other option changes what the filter does (csp, redirect, popup...): not a plain network filter
+                return False
+
+        self.documentOption = bool(positiveTypes & AbpEngine.TYPES["document"])
+        if positiveTypes:
+            self.types = positiveTypes & ~negativeTypes
+        elif negativeTypes:
+            self.types = AbpEngine._allTypes & ~negativeTypes
+        return True
+
+    def _compile(self):
+        parts = []
+        if self.hostAnchored:
+            parts.append(AbpEngine._hostAnchor)
+        elif self.leftAnchored:
+            parts.append("^")
+        pattern = self.pattern if self.matchCase else self.pattern.lower()
+        for ch in pattern:
+            if ch == "*":
+                parts.append(".*")
+            elif ch == "^":
+                parts.append(AbpEngine._separator)
+            else:
+                parts.append(re.escape(ch))
+        if self.rightAnchored:
+            parts.append("$")
+        return re.compile("".join(parts))
+
+    def matches(self, request):
+
+        if not self.types & request.typeBit:
+            return False
+        if self.thirdParty is not None and self.thirdParty != request.thirdParty:
+            return False
+        if self.excludeDomains is not None and any(suffix in self.excludeDomains for suffix in request.sourceSuffixes):
+            return False
+        if self.includeDomains is not None and not any(suffix in self.includeDomains for suffix in request.sourceSuffixes):
+            return False
+
+        if self.host:
+            return request.host == self.host or request.host.endswith("." + self.host)
+
+        if self._regex is None:
+            self._regex = self._compile()
+        if self.isRegex:
+            return self._regex.search(request.url) is not None
+        return self._regex.search(request.url if self.matchCase else request.urlLower) is not None
@@ -0,0 +1,170 @@
+import json
+import re
+
+from ._abpengine import AbpEngine
+from ._rulescache import RulesCache
+from ._lrucache import LruCache
+
+
+class CosmeticSnapshot(RulesCache):
+
+    _version = 1
+
+    # selectors using extended (non-CSS) syntax can't be injected as plain stylesheets
+    _extendedSyntax = re.compile(r":-abp-|:has-text\(|:contains\(|:xpath\(|:matches-|:upward\(|:remove\(|:style\(|"
+                                 r":min-text-length\(|:watch-attr\(|:matches-path\(|:others\(|[{}]")
+    _validDomains = re.compile(r"^[a-z0-9.,~\-]*$")
+
+    def encode(self, compiled):
+        return json.dumps(compiled, separators=(",", ":"))
+
+    def decode(self, body):
+        return json.loads(body)
+
+    def compileRules(self, contents):
+        # keep element-hiding rules only (## and #@#), indexed by domain:
+        #   generic: selectors hidden in all pages
+        #   domains: selectors hidden in the given domain (and its subdomains)
+        #   exceptions: selectors not to be hidden in the given domain (and its subdomains)
+        #   genericExceptions: generic selectors not to be hidden in the given domain (and its subdomains)
+        generic = {}
+        domains = {}
+        exceptions = {}
+        genericExceptions = {}
+        genericAllowed = set()
+
+        rules = []
+        for content in contents:
+            for line in content.decode("utf-8", errors="ignore").splitlines():
+                line = line.strip()
+                pos = line.find("#")
+                if pos < 0 or not line or line[0] in "![":
+                    continue
+                if line.startswith("##", pos):
+                    isException, selector = False, line[pos + 2:].strip()
+                elif line.startswith("#@#", pos):
+                    isException, selector = True, line[pos + 3:].strip()
+                else:
+                    continue
+                domainList = line[:pos].lower()
+                if not selector or self._extendedSyntax.search(selector) or not self._validDomains.match(domainList):
+                    continue
+                rules.append((isException, selector, [domain for domain in domainList.split(",") if domain]))
+
+        for isException, selector, domainList in rules:
+            included = [domain for domain in domainList if not domain.startswith("~")]
+            excluded = [domain[1:] for domain in domainList if domain.startswith("~")]
+            if isException:
+                if not domainList:
+                    genericAllowed.add(selector)
+                for domain in included:
+                    exceptions.setdefault(domain, {})[selector] = None
+            elif included:
+                for domain in included:
+                    domains.setdefault(domain, {})[selector] = None
+                for domain in excluded:
+                    exceptions.setdefault(domain, {})[selector] = None
+            else:
+                generic[selector] = None
+                for domain in excluded:
+                    genericExceptions.setdefault(domain, {})[selector] = None
+
+        # exceptions of generic selectors are applied by removing them from the generic stylesheet in that page
+        for domain, selectors in exceptions.items():
+            for selector in selectors:
+                if selector in generic:
+                    genericExceptions.setdefault(domain, {})[selector] = None
+
+        generic = [selector for selector in generic if selector not in genericAllowed]
+        return {
+            "count": len(generic) + sum(len(selectors) for selectors in domains.values()),
+            "generic": CosmeticFilters.toCss(generic),
+            "domains": {domain: list(selectors) for domain, selectors in domains.items()},
+            "exceptions": {domain: list(selectors) for domain, selectors in exceptions.items()},
+            "genericExceptions": {domain: list(selectors) for domain, selectors in genericExceptions.items()}
+        }
+
+
+class CosmeticFilters:
+
+    # generic stylesheet is injected in all frames, sharing the (isolated) world with the per-page script
+    _genericTemplate = """(function() {
+    var cosmetic = window.__cowardCosmetic = window.__cowardCosmetic || {};
+    if (cosmetic.generic) return;
+    var sheet = new CSSStyleSheet();
+    sheet.replaceSync(%s);
+    cosmetic.generic = sheet;
+    document.adoptedStyleSheets = document.adoptedStyleSheets.concat([sheet]);
+    if (cosmetic.unhide) cosmetic.unhide(sheet);
+})();"""
+
+    # per-page script: domain-specific selectors, and generic selectors which must be visible in this domain
+    _pageTemplate = """(function() {
+    var cosmetic = window.__cowardCosmetic = window.__cowardCosmetic || {};
+    var hide = %s, unhide = %s;
+    if (hide) {
+        var sheet = new CSSStyleSheet();
+        sheet.replaceSync(hide);
+        document.adoptedStyleSheets = document.adoptedStyleSheets.concat([sheet]);
+    }
+    if (unhide) {
+        cosmetic.unhide = function(generic) {
+            // selectors are normalized by the browser, so compare them once parsed
+            var probe = new CSSStyleSheet();
+            probe.replaceSync(unhide);
+            var skip = new Set(Array.from(probe.cssRules, function(rule) { return rule.selectorText; }));
+            for (var i = generic.cssRules.length - 1; i >= 0; i--) {
+                if (skip.has(generic.cssRules[i].selectorText)) generic.deleteRule(i);
+            }
+        };
+        if (cosmetic.generic) cosmetic.unhide(cosmetic.generic);
+    }
+})();"""
+
+    def __init__(self, compiled=None, cacheSize=1024):
+
+        compiled = compiled or {}
+        self.selectorsCount = compiled.get("count", 0)
+        self.genericCss = compiled.get("generic", "")
+        self.domains = compiled.get("domains", {})
+        self.exceptions = compiled.get("exceptions", {})
+        self.genericExceptions = compiled.get("genericExceptions", {})
+
+        # scripts are built once per host, so most navigations only cost a lookup
+        self._pageScripts = LruCache(cacheSize)
+
+    def __len__(self):
+        return self.selectorsCount
+
+    @staticmethod
+    def toCss(selectors):
+        # one rule per selector: an invalid selector would invalidate the whole rule otherwise
+        return "\n".join(selector + "{display:none!important}" for selector in selectors)
+
+    def genericScript(self):
+        return self._genericTemplate % json.dumps(self.genericCss) if self.genericCss else ""
+
+    def pageScript(self, host):
+        # returns an empty string if there is nothing to apply for the given host
+        host = host.lower().rstrip(".")
+        script = self._pageScripts.get(host)
+        if script is None:
+            script = self._buildPageScript(host)
+            self._pageScripts.put(host, script)
+        return script
+
+    def _buildPageScript(self, host):
+
+        hide = {}
+        allowed = set()
+        unhide = {}
+        for suffix in AbpEngine.hostSuffixes(host) if host else []:
+            hide.update(dict.fromkeys(self.domains.get(suffix, ())))
+            allowed.update(self.exceptions.get(suffix, ()))
+            unhide.update(dict.fromkeys(self.genericExceptions.get(suffix, ())))
+
+        hideCss = self.toCss(selector for selector in hide if selector not in allowed)
+        unhideCss = self.toCss(unhide)
+        if not hideCss and not unhideCss:
+            return ""
+        return self._pageTemplate % (json.dumps(hideCss), json.dumps(unhideCss))
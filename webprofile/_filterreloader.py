@@ -0,0 +1,25 @@
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from logger import LOGGER, LoggerSettings
+
+
+class FilterReloader(QThread):
+
+    # emits whatever the build function returns (or None if it failed)
+    reloadedSig = pyqtSignal(object)
+
+    def __init__(self, build_func, name):
+        super().__init__()
+
+        # filters are fully built here, so the GUI thread only has to swap the new ones in
+        self.build = build_func
+        self.name = name
+
+    def run(self):
+
+        result = None
+        try:
+            result = self.build()
+        except:
+            LOGGER.write(LoggerSettings.LogLevels.error, "RequestInterceptor", f"{self.name} could not be reloaded")
+        self.reloadedSig.emit(result)
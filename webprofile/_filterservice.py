@@ -0,0 +1,380 @@
+import os
+import time
+
+from PyQt6.QtCore import QObject, pyqtSignal, QFileSystemWatcher, QTimer
+
+from logger import LOGGER, LoggerSettings
+from settings import DefaultSettings
+from ._abpengine import AbpEngine
+from ._cosmeticfilters import CosmeticFilters, CosmeticSnapshot
+from ._filterreloader import FilterReloader
+from ._interceptorstats import InterceptorStats
+from ._requestrecorder import RequestRecorder
+from ._rulescache import RulesCache
+from ._rulesupdater import RulesUpdater
+from ._urlmatcher import UrlMatcher
+from ._verdictcache import VerdictCache
+
+try:
+    # braveblock is only available in python 3.11 by now
+    from braveblock import Adblocker
+    _BRAVE_IMPORTED = True
+except:
+    # built-in filter engine will be used instead
+    _BRAVE_IMPORTED = False
+    LOGGER.write(LoggerSettings.LogLevels.info, "RequestInterceptor", f"Failed to load braveblock module (Python 3.11 is required). Using built-in filter engine")
+
+
+class FilterService(QObject):
+
+    # emitted when filters are built or replaced (e.g. to inject the new cosmetic filters)
+    filtersChangedSig = pyqtSignal()
+
+    def __init__(self):
+        super().__init__()
+
+        # one single instance of the filters (blacklist + adblocker) is shared by all windows and profiles
+        # it is built when the first window acquires it, and freed when the last one releases it
+        self._refCount = 0
+        self.rulesFolder = ""
+
+        self.blacklistMatcher = UrlMatcher()
+        self.adblocker = None
+        self.cosmeticFilters = None
+        self.rulesUpdater = None
+
+        # the same trackers are requested from every tab and on every reload, so remember adblocker verdicts
+        self.verdictCache = VerdictCache(DefaultSettings.AdBlocker.verdictCacheSize)
+
+        # interceptor instrumentation: latency histograms and counters by resource type and top-level host
+        self.stats = InterceptorStats(DefaultSettings.AdBlocker.statsMaxHosts) if DefaultSettings.AdBlocker.enableStats else None
+
+        # optional capture of all intercepted requests (see -record_requests option)
+        self.recorder = None
+
+        # blacklist and filter lists are reloaded when modified, without restarting the browser
+        # editors (and the rules updater) may write files in several steps, so wait until changes settle down
+        self.watcher = None
+        self._signatures = {}
+        # changes noticed while a reload (or rules update) was running: applied once it finishes
+        self._blackListChanged = False
+        self._filtersChanged = False
+        self.blacklistReloader = None
+        self.filtersReloader = None
+        self.reloadTimer = QTimer()
+        self.reloadTimer.setSingleShot(True)
+        self.reloadTimer.setInterval(DefaultSettings.AdBlocker.reloadDelay)
+        self.reloadTimer.timeout.connect(self.checkChanges)
+
+    def acquire(self, rules_folder):
+
+        self._refCount += 1
+        if self._refCount == 1:
+            self.rulesFolder = rules_folder
+
+            # List of URLs (as strings or patterns) to block
+            self.easylistPath = os.path.join(rules_folder, DefaultSettings.AdBlocker.easylistFile)
+            self.easyprivacyPath = os.path.join(rules_folder, DefaultSettings.AdBlocker.easyprivacytFile)
+            self.urlBlackListPath = os.path.join(rules_folder, DefaultSettings.AdBlocker.urlBlackListFile)
+            self.rulesCachePath = os.path.join(rules_folder, DefaultSettings.AdBlocker.rulesCacheFile)
+            self.rulesCache = RulesCache(self.rulesCachePath, [self.easylistPath, self.easyprivacyPath])
+            self.cosmeticSnapshot = CosmeticSnapshot(os.path.join(rules_folder, DefaultSettings.AdBlocker.cosmeticSnapshotFile),
+                                                     [self.easylistPath, self.easyprivacyPath])
+            self.rulesMetaPath = os.path.join(rules_folder, DefaultSettings.AdBlocker.rulesMetaFile)
+
+            # compile all blocked urls at once, so every request URL is checked in a single pass
+            self.blacklistMatcher = UrlMatcher(self.loadBlackList())
+            LOGGER.write(LoggerSettings.LogLevels.info, "RequestInterceptor", f"Filter service started: {len(self.blacklistMatcher)} blacklisted URLs")
+
+            self.startWatching()
+
+        return self
+
+    def release(self):
+
+        self._refCount = max(0, self._refCount - 1)
+        if self._refCount == 0:
+            # free the rule sets once no window is using them
+            # (a running updater must be kept alive until it finishes, but its result will be discarded)
+            if self.rulesUpdater is not None and not self.rulesUpdater.isRunning():
+                self.rulesUpdater = None
+            self.stopWatching()
+            self.stopRecording()
+            self.adblocker = None
+            self.cosmeticFilters = None
+            self.blacklistMatcher = UrlMatcher()
+            self.verdictCache.clear()
+            LOGGER.write(LoggerSettings.LogLevels.info, "RequestInterceptor", "Filter service stopped")
+
+    def loadBlackList(self):
+
+        # retrieve blocked urls file
+        blocked_urls = []
+        if os.path.exists(self.urlBlackListPath):
+            with open(self.urlBlackListPath, "r") as f:
+                blocked_urls = [line.rstrip() for line in f if not line.startswith('#')]
+        else:
+            with open(self.urlBlackListPath, "w") as f:
+                f.write("# include here the complete or partial URL you want to be blocked, one string per line\n"
+                        "# if the url contains the given string, it will be blocked\n"
+                        "# e.g. if you include 'televisión' here, any URL containing 'television' will be blocked (including searches, for instance)\n"
+                        "# use '#' for comments, but be sure it is at the very beginning of the line\n")
+        return blocked_urls
+
+    def startRecording(self, path):
+        if self.recorder is None:
+            self.recorder = RequestRecorder(path)
+
+    def stopRecording(self):
+        recorder = self.recorder
+        self.recorder = None
+        if recorder is not None:
+            recorder.close()
+
+    def startWatching(self):
+
+        self.watcher = QFileSystemWatcher()
+        self.watcher.fileChanged.connect(self.onFileChanged)
+        # files which don't exist yet can't be watched, but their creation is notified as a folder change
+        self.watcher.directoryChanged.connect(self.onFileChanged)
+        self._signatures = {path: self._fileSignature(path) for path in self.watchedPaths()}
+        self.watchPaths()
+
+    def stopWatching(self):
+        self.reloadTimer.stop()
+        if self.watcher is not None:
+            self.watcher.fileChanged.disconnect()
+            self.watcher.directoryChanged.disconnect()
+            self.watcher = None
+
+    def watchedPaths(self):
+        # rules cache too: if it is replaced or removed (e.g. by another instance), it is checked against the lists again
+        return [self.urlBlackListPath, self.easylistPath, self.easyprivacyPath, self.rulesCachePath]
+
+    def watchPaths(self):
+        # files replaced (not modified) are removed from the watcher, so they have to be added again
+        watched = set(self.watcher.files()) | set(self.watcher.directories())
+        paths = [path for path in [self.rulesFolder] + self.watchedPaths() if path not in watched and os.path.exists(path)]
+        if paths:
+            self.watcher.addPaths(paths)
+
+    def _fileSignature(self, path):
+        try:
+            stat = os.stat(path)
+            return stat.st_size, stat.st_mtime_ns
+        except:
+            return None
+
+    def onFileChanged(self, path):
+        # restart timer on every notification, so a burst of changes triggers one single reload
+        self.reloadTimer.start()
+
+    def checkChanges(self):
+
+        if self.watcher is None:
+            return
+        self.watchPaths()
+
+        # lists being written by the rules updater are checked once it finishes (it applies its own changes)
+        updating = self.rulesUpdater is not None and self.rulesUpdater.isRunning()
+        # rules cache is rewritten by our own reloads: it is checked once they finish
+        reloading = updating or (self.filtersReloader is not None and self.filtersReloader.isRunning())
+        changed = []
+        for path in self.watchedPaths():
+            if updating and path in (self.easylistPath, self.easyprivacyPath) or reloading and path == self.rulesCachePath:
+                continue
+            signature = self._fileSignature(path)
+            if signature != self._signatures.get(path):
+                self._signatures[path] = signature
+                changed.append(path)
+
+        if self.urlBlackListPath in changed:
+            self._blackListChanged = True
+        if self.easylistPath in changed or self.easyprivacyPath in changed or self.rulesCachePath in changed:
+            self._filtersChanged = True
+        self.reloadChanged()
+
+    def reloadChanged(self):
+        # changes are only marked as applied when their reload actually starts (otherwise they are kept pending)
+        if self._blackListChanged and self._refCount > 0:
+            if self.blacklistReloader is None or not self.blacklistReloader.isRunning():
+                self._blackListChanged = False
+                self.reloadBlackList()
+
+        # lists being downloaded by the rules updater will be reloaded once it finishes
+        updating = self.rulesUpdater is not None and self.rulesUpdater.isRunning()
+        if self._filtersChanged and self.adblocker is not None and not updating:
+            if self.filtersReloader is None or not self.filtersReloader.isRunning():
+                self._filtersChanged = False
+                self.reloadFilters()
+
+    def reloadBlackList(self):
+
+        self.blacklistReloader = FilterReloader(self.buildBlackList, "Blacklist")
+        self.blacklistReloader.reloadedSig.connect(self.onBlackListReloaded)
+        self.blacklistReloader.start()
+
+    def buildBlackList(self):
+        # runs in a separate thread, so it must not modify the service
+        startTime = time.perf_counter()
+        patterns = self.loadBlackList()
+        matcher = self.blacklistMatcher
+        if sorted({pattern for pattern in patterns if pattern}) != matcher.patterns:
+            # the automaton can't be patched (failure links depend on all patterns), so it is built again
+            matcher = UrlMatcher(patterns)
+        LOGGER.write(LoggerSettings.LogLevels.info, "RequestInterceptor",
+                     f"Blacklist reloaded in {(time.perf_counter() - startTime) * 1000:.0f} ms: {len(matcher)} blacklisted URLs"
+                     + ("" if matcher is not self.blacklistMatcher else " (unchanged)"))
+        return matcher
+
+    def onBlackListReloaded(self, matcher):
+        # matcher is completely built at this point: requests being checked right now will just use the previous one
+        if matcher is not None and self._refCount > 0:
+            self.blacklistMatcher = matcher
+        # blacklist edited while it was being rebuilt (reloader thread may not have finished yet: check a bit later)
+        if self._blackListChanged:
+            self.reloadTimer.start()
+
+    def reloadFilters(self):
+
+        self.filtersReloader = FilterReloader(self.buildFilters, "Filter lists")
+        self.filtersReloader.reloadedSig.connect(self.onFiltersReloaded)
+        self.filtersReloader.start()
+
+    def enableAdblocker(self):
+
+        # adblocker is only built once, no matter how many windows enable it
+        if self.adblocker is None and self._refCount > 0:
+
+            # Load EasyList rules (downloaded easylist.txt and easyprivacy.txt, or braveblock built-in ones if not available yet)
+            self.adblocker, self.cosmeticFilters = self.buildFilters()
+            self._signatures[self.rulesCachePath] = self._fileSignature(self.rulesCachePath)
+            self.filtersChangedSig.emit()
+
+            # refresh rules in background if needed. New rules will be applied as soon as they are available
+            currTime = time.time()
+            meta = RulesUpdater.loadMeta(self.rulesMetaPath)
+            if any(not os.path.exists(path) or currTime - RulesUpdater.lastChecked(meta, path) >= DefaultSettings.AdBlocker.updateInterval
+                   for path in (self.easylistPath, self.easyprivacyPath)):
+                self.updateRules()
+
+    def clearVerdicts(self):
+        # cached verdicts are not valid anymore if adblocker is toggled or rules are reloaded
+        if self.verdictCache.hits or self.verdictCache.misses:
+            LOGGER.write(LoggerSettings.LogLevels.info, "RequestInterceptor",
+                         f"Verdict cache cleared. Hits: {self.verdictCache.hits}, misses: {self.verdictCache.misses} "
+                         f"({self.verdictCache.hitRatio:.1%})")
+        self.verdictCache.clear()
+
+    def buildFilters(self):
+        # this may run in a separate thread (when rules are updated), so it must not modify the service
+        return self.buildAdblocker(), self.buildCosmeticFilters()
+
+    def buildAdblocker(self):
+        # this may run in a separate thread (when rules are updated), so it must not modify the service
+
+        # network rules are filtered from the lists once and cached, and only filtered again when the lists change
+        # (the engine itself is still built on every start: braveblock engines can't be serialized)
+        startTime = time.perf_counter()
+        easylistUpdated = os.path.exists(self.easylistPath)
+        easyprivacyUpdated = os.path.exists(self.easyprivacyPath)
+        rules, fromCache = self.rulesCache.load()
+
+        if _BRAVE_IMPORTED and not DefaultSettings.AdBlocker.builtinEngine:
+            # Create Adblocker instance (prioritizing our own downloaded, and updated, rules files)
+            adblocker = Adblocker(
+                rules=rules,
+                include_easylist=not easylistUpdated,
+                include_easyprivacy=not easyprivacyUpdated
+            )
+            engine = "braveblock"
+        else:
+            # built-in engine has no default rules: it will be empty until lists are downloaded
+            adblocker = AbpEngine(rules)
+            engine = "built-in"
+        LOGGER.write(LoggerSettings.LogLevels.info, "RequestInterceptor",  "Finished initialization " + ("with obsolete rules" if not easylistUpdated and not easyprivacyUpdated else ""))
+        LOGGER.write(LoggerSettings.LogLevels.info, "RequestInterceptor",
+                     f"Adblocker ({engine}) ready in {(time.perf_counter() - startTime) * 1000:.0f} ms: {len(rules)} rules "
+                     + ("loaded from cache" if fromCache else "filtered, cache rebuilt"))
+        return adblocker
+
+    def buildCosmeticFilters(self):
+
+        # element-hiding rules are compiled to CSS bundles by domain, and stored in their own snapshot
+        if not DefaultSettings.AdBlocker.enableCosmeticFilters:
+            return None
+        startTime = time.perf_counter()
+        compiled, fromSnapshot = self.cosmeticSnapshot.load()
+        cosmeticFilters = CosmeticFilters(compiled)
+        LOGGER.write(LoggerSettings.LogLevels.info, "RequestInterceptor",
+                     f"Cosmetic filters ready in {(time.perf_counter() - startTime) * 1000:.0f} ms: {len(cosmeticFilters)} selectors "
+                     + ("loaded from snapshot" if fromSnapshot else "compiled, snapshot rebuilt"))
+        return cosmeticFilters
+
+    def genericCosmeticScript(self):
+        cosmeticFilters = self.cosmeticFilters
+        return cosmeticFilters.genericScript() if cosmeticFilters is not None else ""
+
+    def pageCosmeticScript(self, host):
+        cosmeticFilters = self.cosmeticFilters
+        return cosmeticFilters.pageScript(host) if cosmeticFilters is not None else ""
+
+    def isBlacklisted(self, url):
+        return self.blacklistMatcher.match(url)
+
+    def shouldBlock(self, url, source_url, request_type):
+
+        # read generation before the engine, so a verdict from an engine swapped meanwhile is not cached
+        generation = self.verdictCache.generation
+        adblocker = self.adblocker
+        if adblocker is None:
+            return False
+
+        key = (url, source_url, request_type)
+        should_block = self.verdictCache.get(key)
+        if should_block is None:
+            should_block = adblocker.check_network_urls(
+                url=url,
+                source_url=source_url,
+                request_type=request_type)
+            self.verdictCache.put(key, should_block, generation)
+        return should_block
+
+    def updateRules(self):
+
+        # download rules in a separate thread, using conditional requests to avoid downloading unchanged lists
+        if self.rulesUpdater is not None and self.rulesUpdater.isRunning():
+            return
+        self.rulesUpdater = RulesUpdater(
+            sources=[(DefaultSettings.AdBlocker.easylistUrl, self.easylistPath),
+                     (DefaultSettings.AdBlocker.easyprivacyUrl, self.easyprivacyPath)],
+            meta_path=self.rulesMetaPath,
+            build_engine_func=self.buildFilters
+        )
+        self.rulesUpdater.rulesUpdatedSig.connect(self.onRulesUpdated)
+        self.rulesUpdater.start()
+
+    def onRulesUpdated(self, filters):
+        if filters is not None and self._refCount > 0:
+            # lists written by the updater are already applied: don't reload them again when the watcher notices
+            for path in (self.easylistPath, self.easyprivacyPath):
+                self._signatures[path] = self._fileSignature(path)
+            LOGGER.write(LoggerSettings.LogLevels.info, "RequestInterceptor", "Updated rules applied")
+        self.onFiltersReloaded(filters)
+        # lists edited while updating were not checked yet
+        self.reloadTimer.start()
+
+    def onFiltersReloaded(self, filters):
+        # rules cache may have been rewritten by the reload: that's not a change to reload again
+        self._signatures[self.rulesCachePath] = self._fileSignature(self.rulesCachePath)
+        # hot-swap the filter engines: requests being checked right now will just finish with the previous one
+        if filters is not None and self._refCount > 0:
+            self.adblocker, self.cosmeticFilters = filters
+            self.clearVerdicts()
+            self.filtersChangedSig.emit()
+        # lists edited while they were being rebuilt are reloaded again
+        if self._filtersChanged:
+            self.reloadTimer.start()
+
+
+FILTER_SERVICE = FilterService()
@@ -0,0 +1,107 @@
+import json
+import threading
+import time
+
+
+class InterceptorStats:
+
+    # latency histogram buckets are powers of two, in microseconds: [0, 1), [1, 2), [2, 4), ... [2^19, inf)
+    _bucketsCount = 21
+    phases = ("blacklist", "adblock", "total")
+
+    def __init__(self, maxHosts=500):
+
+        # counters and histograms are shared by all windows, and may be updated from several threads
+        self._lock = threading.Lock()
+        self.maxHosts = maxHosts
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.startTime = time.time()
+            self.histograms = {phase: [0] * self._bucketsCount for phase in self.phases}
+            self.latencies = {phase: 0 for phase in self.phases}
+            # [requests, blacklisted, adblocked] by resource type and by top-level host
+            self.byType = {}
+            self.byHost = {}
+
+    def record(self, request_type, host, blacklistNs, adblockNs, totalNs, blacklisted, adblocked):
+
+        with self._lock:
+            for phase, elapsed in (("blacklist", blacklistNs), ("adblock", adblockNs), ("total", totalNs)):
+                if elapsed is not None:
+                    self.histograms[phase][min(self._bucketsCount - 1, (elapsed // 1000).bit_length())] += 1
+                    self.latencies[phase] += elapsed
+
+            counters = self.byType.get(request_type)
+            if counters is None:
+                counters = self.byType[request_type] = [0, 0, 0]
+            counters[0] += 1
+            counters[1] += blacklisted
+            counters[2] += adblocked
+
+            counters = self.byHost.get(host)
+            if counters is None:
+                # keep memory bounded: once the limit is reached, new hosts are accounted together
+                if len(self.byHost) >= self.maxHosts:
+                    host = "(other)"
+                counters = self.byHost.setdefault(host, [0, 0, 0])
+            counters[0] += 1
+            counters[1] += blacklisted
+            counters[2] += adblocked
+
+    @classmethod
+    def bucketLimit(cls, index):
+        # upper limit of the given bucket, in microseconds (None for the last, unbounded, one)
+        return 1 << index if index < cls._bucketsCount - 1 else None
+
+    @classmethod
+    def percentile(cls, histogram, fraction):
+        # approximated to the upper limit of the bucket in which the given fraction of samples is reached
+        total = sum(histogram)
+        if not total:
+            return 0
+        target = total * fraction
+        count = 0
+        for index, value in enumerate(histogram):
+            count += value
+            if count >= target:
+                return cls.bucketLimit(index) or cls.bucketLimit(index - 1)
+        return 0
+
+    def summary(self):
+
+        with self._lock:
+            histograms = {phase: list(values) for phase, values in self.histograms.items()}
+            latencies = dict(self.latencies)
+            byType = {key: list(values) for key, values in self.byType.items()}
+            byHost = {key: list(values) for key, values in self.byHost.items()}
+
+        def counters(values):
+            return {"requests": values[0], "blacklisted": values[1], "adblocked": values[2],
+                    "allowed": values[0] - values[1] - values[2]}
+
+        latency = {}
+        for phase, histogram in histograms.items():
+            samples = sum(histogram)
+            latency[phase] = {
+                "samples": samples,
+                "mean_us": round(latencies[phase] / samples / 1000, 2) if samples else 0,
+                "p50_us": self.percentile(histogram, 0.5),
+                "p90_us": self.percentile(histogram, 0.9),
+                "p99_us": self.percentile(histogram, 0.99),
+                "histogram_us": {("<%s" % self.bucketLimit(index) if self.bucketLimit(index) else ">=%s" % self.bucketLimit(index - 1)): value
+                                 for index, value in enumerate(histogram) if value}
+            }
+
+        return {
+            "since": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.startTime)),
+            "requests": sum(values[0] for values in byType.values()),
+            "latency": latency,
+            "by_type": {key or "other": counters(values) for key, values in sorted(byType.items())},
+            "by_host": {key: counters(values) for key, values in sorted(byHost.items(), key=lambda item: -item[1][0])}
+        }
+
+    def toJson(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
@@ -0,0 +1,34 @@
+import threading
+from collections import OrderedDict
+
+
+class LruCache:
+
+    def __init__(self, maxSize=1024):
+
+        # bounded LRU cache, safe to use from several threads (None values can't be cached: None means not cached)
+        self.maxSize = maxSize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        # returns None if key is not cached
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            if len(self._items) > self.maxSize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
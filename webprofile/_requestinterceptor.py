@@ -1,103 +1,97 @@
-import os
 import time
 
-import requests
-from PyQt6.QtCore import QUrl
+from PyQt6.QtCore import QUrl, pyqtSignal
 from PyQt6.QtWebEngineCore import QWebEngineUrlRequestInterceptor, QWebEngineUrlRequestInfo
 
 from logger import LOGGER, LoggerSettings
 from settings import DefaultSettings
-
-try:
-    # braveblock is only available in python 3.11 by now
-    from braveblock import Adblocker
-    _BRAVE_IMPORTED = True
-except:
-    DefaultSettings.AdBlocker.enableAdBlocker = False
-    _BRAVE_IMPORTED = False
-    LOGGER.write(LoggerSettings.LogLevels.info, "RequestInterceptor", f"Failed to load braveblock module. Python 3.11 is required to enable this feature")
+from ._filterservice import FILTER_SERVICE
 
 
 class RequestInterceptor(QWebEngineUrlRequestInterceptor):
 
-    def __init__(self, rules_folder):
+    # cosmetic filters to inject in pages have changed (adblocker toggled, or rules built / updated)
+    cosmeticFiltersChangedSig = pyqtSignal()
+
+    def __init__(self, rules_folder, record_path=None):
         super().__init__()
 
-        # List of URLs (as strings or patterns) to block
-        self.easylistPath = os.path.join(rules_folder, DefaultSettings.AdBlocker.easylistFile)
-        self.easyprivacyPath = os.path.join(rules_folder, DefaultSettings.AdBlocker.easyprivacytFile)
-        self.urlBlackListPath = os.path.join(rules_folder, DefaultSettings.AdBlocker.urlBlackListFile)
-
-        # retrieve blocked urls file
-        self.blocked_urls = []
-        if os.path.exists(self.urlBlackListPath):
-            with open(self.urlBlackListPath, "r") as f:
-                self.blocked_urls = [line.rstrip() for line in f if not line.startswith('#')]
-        else:
-            with open(self.urlBlackListPath, "w") as f:
-                f.write("# include here the complete or partial URL you want to be blocked, one string per line\n"
-                        "# if the url contains the given string, it will be blocked\n"
-                        "# e.g. if you include 'televisión' here, any URL containing 'television' will be blocked (including searches, for instance)\n"
-                        "# use '#' for comments, but be sure it is at the very beginning of the line\n")
-
-        # enable / disable adblocker
+        # filters (blacklist and adblocker) are built once and shared by all windows and profiles
+        self.filterService = FILTER_SERVICE.acquire(rules_folder)
+        if record_path:
+            self.filterService.startRecording(record_path)
+        self.filterService.filtersChangedSig.connect(self.cosmeticFiltersChangedSig)
+        self._released = False
+
+        # enable / disable adblocker (for this window only)
         self.enableAdBlocker = DefaultSettings.AdBlocker.enableAdBlocker
-        self.adblocker = None
-        self.resourceTypes = {}
+        self.resourceTypes = self.getRequestType()
+
+        # latency and block counters, shared by all windows (None if disabled)
+        self.stats = self.filterService.stats
 
     def setEnabled(self, enabled):
 
-        global _BRAVE_IMPORTED
-        self.enableAdBlocker = enabled and _BRAVE_IMPORTED
-
-        if self.enableAdBlocker and self.adblocker is None:
-
-            self.resourceTypes = self.getRequestType()
-
-            currTime = time.time()
-            if (not os.path.exists(self.easylistPath) or currTime - os.path.getmtime(self.easylistPath) >= 7 * 86400
-                    or not os.path.exists(self.easyprivacyPath) or currTime - os.path.getmtime(self.easyprivacyPath) >= 7 * 86400):
-                self.updateRules(self.easylistPath, self.easyprivacyPath)
-
-            # Load EasyList rules (download easylist.txt and easyprivacy.txt beforehand)
-            easylistrules = []
-            easyprivacyrules = []
-            easylistUpdated = easyprivacyUpdated = False
-            if os.path.exists(self.easylistPath):
-                with open(self.easylistPath, "r", encoding="utf-8") as f:
-                    easylistrules = f.readlines()
-                    easylistUpdated = True
-            if os.path.exists(self.easyprivacyPath):
-                with open(self.easyprivacyPath, "r", encoding="utf-8") as f:
-                    easyprivacyrules = f.readlines()
-                    easyprivacyUpdated = True
-
-            # Create Adblocker instance (prioritizing our own downloaded, and updated, rules files)
-            self.adblocker = Adblocker(
-                rules=list(set(easylistrules + easyprivacyrules)),
-                include_easylist=not easylistUpdated,
-                include_easyprivacy=not easyprivacyUpdated
-            )
-            LOGGER.write(LoggerSettings.LogLevels.info, "RequestInterceptor",  "Finished initialization " + ("with obsolete rules" if not easylistUpdated and not easyprivacyUpdated else ""))
+        self.enableAdBlocker = enabled
+
+        # cached verdicts are not valid anymore if adblocker is toggled or rules are reloaded
+        self.filterService.clearVerdicts()
+
+        if self.enableAdBlocker:
+            self.filterService.enableAdblocker()
+        self.cosmeticFiltersChangedSig.emit()
+
+    def release(self):
+        # stop using the shared filters (e.g. when the window is closed)
+        if not self._released:
+            self._released = True
+            self.enableAdBlocker = False
+            self.filterService.filtersChangedSig.disconnect(self.cosmeticFiltersChangedSig)
+            self.filterService.release()
+
+    def genericCosmeticScript(self):
+        # element-hiding stylesheet for all pages and frames (empty if adblocker is disabled)
+        return self.filterService.genericCosmeticScript() if self.enableAdBlocker else ""
+
+    def pageCosmeticScript(self, url):
+        # domain-specific element-hiding stylesheet for the page about to be loaded (empty if nothing to apply)
+        return self.filterService.pageCosmeticScript(QUrl(url).host()) if self.enableAdBlocker else ""
 
     def interceptRequest(self, info: QWebEngineUrlRequestInfo):
+        startTime = time.perf_counter_ns()
         url = info.requestUrl().url()
+        request_type = self.resourceTypes.get(info.resourceType(), "")
+        adblocked = False
+        adblockTime = None
+
+        recorder = self.filterService.recorder
+        if recorder is not None:
+            recorder.record(url, info.initiator().url(), request_type, info.firstPartyUrl().url())
+            startTime = time.perf_counter_ns()
 
         # Check if the request URL is in the blocked list
-        if not QUrl(url).isValid() or any(blocked in url for blocked in self.blocked_urls):
+        blacklisted = not QUrl(url).isValid() or self.filterService.isBlacklisted(url)
+        blacklistTime = time.perf_counter_ns() - startTime
+        if blacklisted:
             # Block the request (redirect to about:blank? How to detect it is not the "main" url???)
             info.block(True)
-            LOGGER.write(LoggerSettings.LogLevels.info, "RequestInterceptor", f"Black List Blocked: {url}")
+            LOGGER.log(LoggerSettings.LogLevels.info, "RequestInterceptor", "Black List Blocked: %s", url)
 
-        # check ad-block rules
-        if self.enableAdBlocker and self.adblocker is not None:
-            should_block = self.adblocker.check_network_urls(
+        # check ad-block rules (no need to check them for an already blocked request)
+        elif self.enableAdBlocker:
+            adblockStart = time.perf_counter_ns()
+            adblocked = self.filterService.shouldBlock(
                 url=url,
                 source_url=info.initiator().url(),
-                request_type=self.resourceTypes.get(info.resourceType(), ""))
-            if should_block:
+                request_type=request_type)
+            adblockTime = time.perf_counter_ns() - adblockStart
+            if adblocked:
                 info.block(True)
-                LOGGER.write(LoggerSettings.LogLevels.info, "RequestInterceptor",  f"AD Blocked: {url}")
+                LOGGER.log(LoggerSettings.LogLevels.info, "RequestInterceptor", "AD Blocked: %s", url)
+
+        if self.stats is not None:
+            self.stats.record(request_type, info.firstPartyUrl().host(), blacklistTime, adblockTime,
+                              time.perf_counter_ns() - startTime, blacklisted, adblocked)
 
     def getRequestType(self):
         """
@@ -121,27 +115,3 @@ class RequestInterceptor(QWebEngineUrlRequestInterceptor):
             QWebEngineUrlRequestInfo.ResourceType.ResourceTypeXhr: "xmlhttprequest"
         }
         return resourceTypes
-
-    def updateRules(self, easylistPath, easyPrivacyPath):
-
-        try:
-            response = requests.get(DefaultSettings.AdBlocker.easylistUrl)
-            if response.status_code == 200:
-                with open(easylistPath, "wb") as file:
-                    file.write(response.content)
-                LOGGER.write(LoggerSettings.LogLevels.info, "RequestInterceptor", "easylist updated successfully!")
-            else:
-                LOGGER.write(LoggerSettings.LogLevels.error, "RequestInterceptor", "easylist failed to download")
-        except:
-            LOGGER.write(LoggerSettings.LogLevels.error, "RequestInterceptor", "easylist failed to download")
-
-        try:
-            response = requests.get(DefaultSettings.AdBlocker.easyprivacyUrl)
-            if response.status_code == 200:
-                with open(easyPrivacyPath, "wb") as file:
-                    file.write(response.content)
-                LOGGER.write(LoggerSettings.LogLevels.info, "RequestInterceptor", "easyprivacy updated successfully!")
-            else:
-                LOGGER.write(LoggerSettings.LogLevels.error, "RequestInterceptor", "easyprivacy failed to download")
-        except:
-            LOGGER.write(LoggerSettings.LogLevels.error, "RequestInterceptor", "easyprivacy failed to download")
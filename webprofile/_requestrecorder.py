@@ -0,0 +1,36 @@
+import json
+import threading
+
+from logger import LOGGER, LoggerSettings
+
+
+class RequestRecorder:
+
+    def __init__(self, path):
+
+        # requests seen by the interceptor are appended as JSON lines, to be replayed by benchmarks/replay_interceptor.py
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = None
+        try:
+            self._file = open(path, "a", encoding="utf-8", buffering=1)
+            LOGGER.write(LoggerSettings.LogLevels.info, "RequestInterceptor", f"Recording requests to {path}")
+        except:
+            LOGGER.write(LoggerSettings.LogLevels.error, "RequestInterceptor", f"Requests recording file could not be opened: {path}")
+
+    def record(self, url, source_url, request_type, first_party_url=""):
+        if self._file is None:
+            return
+        line = json.dumps({"url": url, "source_url": source_url, "request_type": request_type, "first_party_url": first_party_url})
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line + "\n")
+                self.count += 1
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                LOGGER.write(LoggerSettings.LogLevels.info, "RequestInterceptor", f"{self.count} requests recorded to {self.path}")
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import re
+
+from logger import LOGGER, LoggerSettings
+
+
+class RulesCache:
+
+    _version = 1
+
+    # element-hiding (cosmetic) rules markers: ##, #@#, #?#, #$#, #%#, #@$#, ... (not used by network checks)
+    _cosmeticMarker = re.compile(r"#@?[$%]?\??#")
+
+    def __init__(self, cache_path, rules_paths):
+
+        # filtered rules are stored next to the filter lists, and are only valid for the exact content of these lists
+        self.cachePath = cache_path
+        self.rulesPaths = rules_paths
+
+    def _signature(self):
+        # cheap check (size and modification time) to avoid hashing the lists when they haven't been touched
+        signature = []
+        for path in self.rulesPaths:
+            if os.path.exists(path):
+                stat = os.stat(path)
+                signature.append([os.path.basename(path), stat.st_size, stat.st_mtime_ns])
+            else:
+                signature.append([os.path.basename(path), -1, -1])
+        return signature
+
+    def _contentHash(self, contents):
+        hash_object = hashlib.sha256()
+        for content in contents:
+            hash_object.update(hashlib.sha256(content).digest())
+        return hash_object.hexdigest()
+
+    def _readRulesFiles(self):
+        contents = []
+        for path in self.rulesPaths:
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    contents.append(f.read())
+            else:
+                contents.append(b"")
+        return contents
+
+    def _readCache(self):
+        # whole cache is read at once: first line is the header, the rest are the filtered rules
+        try:
+            with open(self.cachePath, "r", encoding="utf-8") as f:
+                data = f.read()
+            header, _, body = data.partition("\n")
+            header = json.loads(header)
+            if header.get("version") != self._version:
+                return None, None
+            return header, body
+        except:
+            return None, None
+
+    def encode(self, rules):
+        return "\n".join(rules)
+
+    def decode(self, body):
+        return body.split("\n") if body else []
+
+    def compileRules(self, contents):
+        # keep network rules only, discarding comments, headers, blank lines, cosmetic rules and duplicates
+        rules = {}
+        for content in contents:
+            for line in content.decode("utf-8", errors="ignore").splitlines():
+                line = line.strip()
+                if not line or line[0] in "![" or ("#" in line and self._cosmeticMarker.search(line)):
+                    continue
+                rules[line] = None
+        return list(rules)
+
+    def load(self):
+        # returns filtered rules, and a flag to know if they were taken from cache (True) or filtered again (False)
+        signature = self._signature()
+        header, body = self._readCache()
+        if header is not None and header.get("signature") == signature:
+            return self.decode(body), True
+
+        contents = self._readRulesFiles()
+        contentHash = self._contentHash(contents)
+        if header is not None and header.get("hash") == contentHash:
+            # lists were touched, but their content didn't change: just refresh the signature
+            rules = self.decode(body)
+            self.save(rules, contentHash, signature)
+            return rules, True
+
+        rules = self.compileRules(contents)
+        self.save(rules, contentHash, signature)
+        return rules, False
+
+    def save(self, rules, contentHash, signature):
+        header = {"version": self._version, "hash": contentHash, "signature": signature}
+        tempPath = self.cachePath + ".tmp"
+        try:
+            with open(tempPath, "w", encoding="utf-8") as f:
+                f.write(json.dumps(header) + "\n" + self.encode(rules))
+            os.replace(tempPath, self.cachePath)
+        except:
+            LOGGER.write(LoggerSettings.LogLevels.error, "RequestInterceptor", f"{os.path.basename(self.cachePath)} could not be saved")
@@ -0,0 +1,122 @@
+import json
+import os
+import time
+
+import requests
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from logger import LOGGER, LoggerSettings
+
+
+class RulesUpdater(QThread):
+
+    # emits the new filter engines (or None if the lists didn't change and nothing was built)
+    rulesUpdatedSig = pyqtSignal(object)
+
+    def __init__(self, sources, meta_path, build_engine_func=None, timeout=30):
+        super().__init__()
+
+        # sources: list of (url, file path) to refresh. URLs can point to any server (e.g. a local one for testing)
+        self.sources = sources
+        self.metaPath = meta_path
+        self.buildEngine = build_engine_func
+        self.timeout = timeout
+
+    @staticmethod
+    def loadMeta(meta_path):
+        # ETag / Last-Modified values returned by the server the last time each list was downloaded,
+        # and when each list was last checked (downloaded or found not modified)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except:
+            return {}
+
+    @staticmethod
+    def lastChecked(meta, path):
+        # lists checked before this was saved in metadata use their modification time instead
+        checked = meta.get(os.path.basename(path), {}).get("checked")
+        if checked is None:
+            checked = os.path.getmtime(path) if os.path.exists(path) else 0
+        return checked
+
+    def _saveMeta(self, meta):
+        try:
+            self._writeAtomic(self.metaPath, json.dumps(meta).encode("utf-8"))
+        except:
+            LOGGER.write(LoggerSettings.LogLevels.error, "RequestInterceptor", "Filter lists metadata could not be saved")
+
+    def _writeAtomic(self, path, content):
+        # never leave a half-written file behind: write to a temp file in the same folder, then replace
+        # if anything fails, previous file is kept as it was and the temp file is removed
+        tempPath = path + ".tmp"
+        try:
+            with open(tempPath, "wb") as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tempPath, path)
+        except:
+            try:
+                os.remove(tempPath)
+            except:
+                pass
+            raise
+
+    def refresh(self, url, path, meta):
+        # returns True if the list has been downloaded again (it changed), False otherwise
+        name = os.path.basename(path)
+        headers = {}
+        cached = meta.get(name, {})
+        if os.path.exists(path):
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        try:
+            response = requests.get(url, headers=headers, timeout=self.timeout)
+        except:
+            LOGGER.write(LoggerSettings.LogLevels.error, "RequestInterceptor", f"{name} failed to download")
+            return False
+
+        if response.status_code == 304:
+            # not modified: just mark the list as fresh, so it is not checked again until next update interval
+            # (in metadata: touching the list would make the file watcher reload it as if it had changed)
+            meta[name] = dict(cached, checked=time.time())
+            LOGGER.write(LoggerSettings.LogLevels.info, "RequestInterceptor", f"{name} is up to date")
+            return False
+
+        elif response.status_code == 200:
+            try:
+                self._writeAtomic(path, response.content)
+            except:
+                LOGGER.write(LoggerSettings.LogLevels.error, "RequestInterceptor", f"{name} could not be saved")
+                return False
+            meta[name] = {
+                "etag": response.headers.get("ETag", ""),
+                "last_modified": response.headers.get("Last-Modified", ""),
+                "checked": time.time()
+            }
+            LOGGER.write(LoggerSettings.LogLevels.info, "RequestInterceptor", f"{name} updated successfully!")
+            return True
+
+        LOGGER.write(LoggerSettings.LogLevels.error, "RequestInterceptor", f"{name} failed to download (status {response.status_code})")
+        return False
+
+    def run(self):
+
+        meta = self.loadMeta(self.metaPath)
+        changed = False
+        for url, path in self.sources:
+            changed = self.refresh(url, path, meta) or changed
+        self._saveMeta(meta)
+
+        # build the new engine here too, so the GUI thread only has to swap it
+        engine = None
+        if changed and self.buildEngine is not None:
+            try:
+                engine = self.buildEngine()
+            except:
+                LOGGER.write(LoggerSettings.LogLevels.error, "RequestInterceptor", "Filter engine could not be rebuilt with updated rules")
+        self.rulesUpdatedSig.emit(engine)
@@ -0,0 +1,71 @@
+from collections import deque
+
+
+class UrlMatcher:
+
+    # below this number of patterns, a plain loop of "in" checks (which run in C) is faster than walking the automaton
+    _linearScanLimit = 64
+
+    def __init__(self, patterns=None):
+
+        # keep "substring anywhere" semantics: a URL matches if it contains any of the given strings
+        # empty strings are discarded, since they would match (and therefore block) every single URL
+        self.patterns = sorted({pattern for pattern in (patterns or []) if pattern})
+
+        # Aho-Corasick automaton: goto transitions per state, failure links and "is output" flag per state
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [False]
+
+        if len(self.patterns) > self._linearScanLimit:
+            self._build()
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def _build(self):
+
+        # insert all patterns in a trie
+        for pattern in self.patterns:
+            state = 0
+            for ch in pattern:
+                nextState = self._goto[state].get(ch)
+                if nextState is None:
+                    nextState = len(self._goto)
+                    self._goto[state][ch] = nextState
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(False)
+                state = nextState
+            self._out[state] = True
+
+        # compute failure links (breadth-first), propagating outputs along them
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nextState in self._goto[state].items():
+                queue.append(nextState)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(ch, 0)
+                self._fail[nextState] = fail if fail != nextState else 0
+                self._out[nextState] = self._out[nextState] or self._out[self._fail[nextState]]
+
+    def match(self, url):
+
+        if len(self.patterns) <= self._linearScanLimit:
+            return any(pattern in url for pattern in self.patterns)
+
+        # single linear scan of the URL, whatever the number of patterns is
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        state = 0
+        for ch in url:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                return True
+        return False
@@ -0,0 +1,47 @@
+from ._lrucache import LruCache
+
+
+class VerdictCache(LruCache):
+
+    def __init__(self, maxSize=4096):
+        super().__init__(maxSize)
+
+        # bounded LRU cache of adblocker verdicts, keyed by (url, initiator origin, resource type)
+        self.hits = 0
+        self.misses = 0
+
+        # incremented on every clear(): verdicts computed before it (with the previous engine) must not be cached
+        self.generation = 0
+
+    def get(self, key):
+        # returns None if verdict is not cached (or True / False if it is)
+        with self._lock:
+            verdict = self._items.get(key)
+            if verdict is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._items.move_to_end(key)
+            return verdict
+
+    def put(self, key, verdict, generation=None):
+        # generation is the one read before computing the verdict (dropped if the cache was cleared meanwhile)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._items[key] = verdict
+            self._items.move_to_end(key)
+            if len(self._items) > self.maxSize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.generation += 1
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def hitRatio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
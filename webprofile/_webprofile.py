@@ -1,12 +1,14 @@
 import os
 
-from PyQt6.QtWebEngineCore import QWebEngineProfile
+from PyQt6.QtWebEngineCore import QWebEngineProfile, QWebEngineScript
 
 from settings import DefaultSettings
 
 
 class WebProfile(QWebEngineProfile):
 
+    cosmeticScriptName = "coward-cosmetic-generic"
+
     def __init__(self, cache_path, browser=None, cookie_filter=None, interceptor_manager=None):
 
         if cache_path is None:
@@ -28,6 +30,28 @@ class WebProfile(QWebEngineProfile):
         self.interceptor = interceptor_manager
         self.setUrlRequestInterceptor(self.interceptor)
 
+        # inject element-hiding (cosmetic) filters in all pages, and keep them updated
+        if self.interceptor is not None:
+            self.interceptor.cosmeticFiltersChangedSig.connect(self.updateCosmeticFilters)
+            self.updateCosmeticFilters()
+
+    def updateCosmeticFilters(self):
+
+        scripts = self.scripts()
+        for script in scripts.find(self.cosmeticScriptName):
+            scripts.remove(script)
+
+        source = self.interceptor.genericCosmeticScript()
+        if source:
+            # injected before any page content is parsed, so ads are never laid out nor painted
+            script = QWebEngineScript()
+            script.setName(self.cosmeticScriptName)
+            script.setSourceCode(source)
+            script.setInjectionPoint(QWebEngineScript.InjectionPoint.DocumentCreation)
+            script.setWorldId(QWebEngineScript.ScriptWorldId.ApplicationWorld)
+            script.setRunsOnSubFrames(True)
+            scripts.insert(script)
+
     def _setNormalPage(self, cache_path):
 
         # profile cache and storage settings
@@ -1,6 +1,6 @@
 import os
 
-from PyQt6.QtWebEngineCore import QWebEngineSettings
+from PyQt6.QtWebEngineCore import QWebEngineSettings, QWebEnginePage
 from PyQt6.QtWebEngineWidgets import QWebEngineView
 
 from logger import LOGGER, LoggerSettings
@@ -14,6 +14,9 @@ class WebView(QWebEngineView):
 
         self.fatal_error_page = os.path.join(DefaultSettings.Browser.htmlPath, DefaultSettings.Browser.fatalErrorPage)
 
+        # keep track of the last events before a page crashes
+        self.renderProcessTerminated.connect(self.onRenderProcessTerminated)
+
     def setUrl(self, url):
         self.load(url)
 
@@ -24,8 +27,14 @@ class WebView(QWebEngineView):
         except:
             # showing error page to allow to manually detect and filter problematic pages
             LOGGER.write(LoggerSettings.LogLevels.fatal, "WebView", f"Fatal error in page. Debug the linked URLs and add the problemmatic ones to DefaultSettings.AdBlocker.urlBlackList")
+            LOGGER.dumpFlightRecorder("Fatal error in page: " + self.url().toString())
             self.load(self.fatal_error_page)
 
+    def onRenderProcessTerminated(self, status, exitCode):
+        if status != QWebEnginePage.RenderProcessTerminationStatus.NormalTerminationStatus:
+            LOGGER.write(LoggerSettings.LogLevels.fatal, "WebView", f"Render process terminated ({status.name}, exit code {exitCode}): {self.url().toString()}")
+            LOGGER.dumpFlightRecorder("Render process terminated: " + self.url().toString())
+
     def applySettings(self, security_level, dark_mode):
 
         # Apply security level settings